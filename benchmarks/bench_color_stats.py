@@ -0,0 +1,71 @@
+"""Compare the packed-key color histogram against ``np.unique(axis=0)``.
+
+Usage: python benchmarks/bench_color_stats.py [--repeat N]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.color_stats import ColorStats
+
+RESOLUTIONS = {
+    '1080p': (1920, 1080),
+    '1440p': (2560, 1440),
+    '4K': (3840, 2160),
+}
+
+
+def make_screenshot(width: int, height: int, seed: int = 0) -> np.ndarray:
+    """Flat panels, anti-aliased text and a soft gradient, like a real capture."""
+    rng = np.random.default_rng(seed)
+    ramp = np.linspace(230, 255, width, dtype=np.float32)
+    image = np.repeat(np.repeat(ramp[None, :, None], height, axis=0), 3, axis=2).astype(np.uint8)
+    for _ in range(200):
+        x, y = int(rng.integers(0, width - 200)), int(rng.integers(0, height - 100))
+        color = tuple(int(c) for c in rng.integers(0, 256, 3))
+        cv2.rectangle(image, (x, y), (x + int(rng.integers(40, 400)), y + int(rng.integers(20, 200))), color, -1)
+        cv2.putText(image, 'Lorem ipsum', (x + 5, y + 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                    (20, 20, 20), 1, cv2.LINE_AA)
+    return image
+
+
+def legacy_color_stats(image: np.ndarray):
+    pixels = cv2.cvtColor(image, cv2.COLOR_BGR2RGB).reshape(-1, 3)
+    return len(np.unique(pixels, axis=0))
+
+
+def packed_color_stats(image: np.ndarray):
+    return ColorStats.from_bgr_image(image).unique_colors
+
+
+def best_time(func, image, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(image)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+    
+    print(f"{'resolution':<12}{'unique':>10}{'np.unique':>12}{'packed':>10}{'speedup':>10}")
+    for name, (width, height) in RESOLUTIONS.items():
+        image = make_screenshot(width, height)
+        legacy_time, legacy = best_time(legacy_color_stats, image, args.repeat)
+        packed_time, packed = best_time(packed_color_stats, image, args.repeat)
+        assert legacy == packed, "unique color counts differ"
+        print(f"{name:<12}{packed:>10}{legacy_time:>11.3f}s{packed_time:>9.3f}s{legacy_time / packed_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
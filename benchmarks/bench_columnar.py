@@ -0,0 +1,99 @@
+"""Size, write time and load-and-filter time of a large batch result set as JSON lines and as column chunks.
+
+Builds ``--records`` batch records from real analyses of synthetic
+screens (scores varied per record), writes them once as JSONL and once
+with ``ColumnarWriter``, then times the question a reviewer asks of a
+result set: which screens score below 0.5, and what are their records.
+JSONL has to parse every line; the columnar reader maps the score and
+path columns and decodes only the matching records.
+
+Usage: python benchmarks/bench_columnar.py [--records N] [--resolution NAME]
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from synthetic import RESOLUTIONS, make_ui
+from src.batch import iter_records
+from src.columnar_results import ColumnarResults, ColumnarWriter
+from src.element_list import json_default
+from src.suggestion_generator import SuggestionGenerator
+from src.ui_analyzer import UIAnalyzer
+
+
+def make_records(count: int, size, seed: int = 0):
+    analyzer, generator = UIAnalyzer(), SuggestionGenerator()
+    templates = [analyzer.full_analysis(make_ui(size, elements=24 + 8 * i, colors=2 + i, seed=i)) for i in range(4)]
+    rng = np.random.default_rng(seed)
+    for i in range(count):
+        path = f"screens/screen_{i:06d}.png"
+        analysis = dict(templates[i % len(templates)], image_path=path,
+                        overall_score=round(float(rng.uniform(0.3, 1.0)), 2))
+        yield {
+            'image_path': path, 'status': 'ok', 'elapsed': 0.4, 'cached': False,
+            'analysis': analysis,
+            'suggestions': generator.generate_suggestions(analysis),
+            'wireframe_suggestions': generator.generate_wireframe_suggestions(analysis)
+        }
+
+
+def folder_bytes(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob('*') if p.is_file())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=50000)
+    parser.add_argument('--resolution', choices=RESOLUTIONS, default='1080p')
+    args = parser.parse_args()
+    
+    records = list(make_records(args.records, RESOLUTIONS[args.resolution]))
+    elements = sum(r['analysis']['elements']['total_elements'] for r in records) / len(records)
+    print(f"cpu count: {os.cpu_count()}, {args.records} records, {elements:.0f} elements per record\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl, columnar = Path(tmp) / "results.jsonl", Path(tmp) / "results"
+        
+        start = time.perf_counter()
+        with open(jsonl, 'w', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, default=json_default) + "\n")
+        jsonl_write = time.perf_counter() - start
+        start = time.perf_counter()
+        with ColumnarWriter(columnar) as writer:
+            for record in records:
+                writer.write(record)
+        columnar_write = time.perf_counter() - start
+        del records
+        
+        start = time.perf_counter()
+        matches = [r for r in iter_records(str(jsonl)) if r['analysis']['overall_score'] < 0.5]
+        jsonl_filter = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        results = ColumnarResults(columnar)
+        rows = np.flatnonzero(results.column('overall_score') < 0.5)
+        paths = results.column('image_path')[rows]
+        columnar_filter = time.perf_counter() - start
+        columnar_matches = list(results.iter_records(rows))
+        columnar_records = time.perf_counter() - start
+        assert paths.tolist() == [r['image_path'] for r in matches]
+        assert [r['image_path'] for r in columnar_matches] == paths.tolist()
+        
+        print("| format | size MB | write s | filter s | filter + matching records s | matches |")
+        print("|---|---|---|---|---|---|")
+        print(f"| JSONL | {jsonl.stat().st_size / 2 ** 20:.0f} | {jsonl_write:.1f} | {jsonl_filter:.1f} "
+              f"| {jsonl_filter:.1f} | {len(matches)} |")
+        print(f"| columnar | {folder_bytes(columnar) / 2 ** 20:.0f} | {columnar_write:.1f} | {columnar_filter:.2f} "
+              f"| {columnar_records:.1f} | {len(paths)} |")
+
+
+if __name__ == "__main__":
+    main()
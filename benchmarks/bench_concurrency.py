@@ -0,0 +1,71 @@
+"""Latency of one analysis with its stages run sequentially and on a thread pool.
+
+``full_analysis`` runs the element, layout, color and spacing stages of one
+screenshot on a shared ``AnalysisContext``. With ``threads > 1`` the
+independent stages run on a shared thread pool; OpenCV and NumPy release
+the GIL in their kernels, so the speedup depends on the number of cores
+(on a single core the threaded run is at best as fast as the sequential
+one). Per-stage wall times come from the analyzer's profiler.
+
+Usage: python benchmarks/bench_concurrency.py [--resolution NAME ...] [--threads N ...] [--repeat N]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from synthetic import RESOLUTIONS, make_ui
+from src.ui_analyzer import UIAnalyzer
+
+STAGE_NAMES = ('detect_elements', 'analyze_layout', 'analyze_colors', 'analyze_spacing')
+
+
+def time_analysis(image, threads: int, repeat: int) -> dict:
+    analyzer = UIAnalyzer(profile=True, threads=threads)
+    walls, stages = [], {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = analyzer.full_analysis(image)
+        walls.append(time.perf_counter() - start)
+        for name in STAGE_NAMES:
+            stages.setdefault(name, []).append(result['timings']['stages'][name]['wall_ms'])
+    return {
+        'median': statistics.median(walls),
+        'best': min(walls),
+        'stages': {name: min(values) for name, values in stages.items()}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', action='append', choices=sorted(RESOLUTIONS),
+                        help="screenshot size (repeatable, default: 1080p and 4K)")
+    parser.add_argument('--threads', type=int, action='append',
+                        help="thread counts to compare (repeatable, default: 1 and 4)")
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    resolutions = args.resolution or ['1080p', '4K']
+    thread_counts = args.threads or [1, 4]
+    
+    print(f"cpu count: {os.cpu_count()}\n")
+    print(f"| resolution | threads | median ms | best ms | speedup | "
+          + " | ".join(f"{name} ms" for name in STAGE_NAMES) + " |")
+    print("|---|---|---|---|---|" + "---|" * len(STAGE_NAMES))
+    for resolution in resolutions:
+        image = make_ui(RESOLUTIONS[resolution], elements=48)
+        sequential = None
+        for threads in thread_counts:
+            timing = time_analysis(image, threads, args.repeat)
+            if sequential is None:
+                sequential = timing['median']
+            stage_ms = " | ".join(f"{timing['stages'][name]:.1f}" for name in STAGE_NAMES)
+            print(f"| {resolution} | {threads} | {timing['median'] * 1000:.1f} | {timing['best'] * 1000:.1f} "
+                  f"| {sequential / timing['median']:.2f}x | {stage_ms} |")
+
+
+if __name__ == "__main__":
+    main()
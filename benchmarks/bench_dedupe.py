@@ -0,0 +1,99 @@
+"""Batch time with and without near-duplicate detection on a corpus of repeated screens.
+
+Writes a corpus where every distinct screen appears several times with
+small differences (a notification badge, a cursor, a new timestamp, JPEG
+re-encoding), the way screenshots pile up across test runs, then measures
+``run_batch`` over it without and with ``dedupe``:
+
+- ``analyses``: images actually analyzed
+- ``hash s``: the hashing pass alone
+- ``max score error``: largest difference between a duplicate's shared
+  overall score and the score of its own full analysis
+
+Usage: python benchmarks/bench_dedupe.py [--resolution NAME] [--screens N] [--variants N] [--dedupe BITS]
+"""
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from synthetic import RESOLUTIONS, make_flow
+from src.batch import _init_worker, hash_one, run_batch
+from src.config import DUPLICATE_DISTANCE
+
+
+def variant(screen: np.ndarray, kind: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    image = screen.copy()
+    height, width = image.shape[:2]
+    if kind % 4 == 0:
+        cv2.circle(image, (width - 40, 30), 12, (40, 40, 220), -1)
+    elif kind % 4 == 1:
+        x, y = int(rng.integers(0, width - 20)), int(rng.integers(0, height - 30))
+        cursor = np.array([[x, y], [x, y + 24], [x + 7, y + 18], [x + 16, y + 18]], dtype=np.int32)
+        cv2.fillPoly(image, [cursor], (20, 20, 20))
+    elif kind % 4 == 2:
+        stamp = f"{int(rng.integers(0, 24)):02d}:{int(rng.integers(0, 60)):02d}"
+        cv2.putText(image, stamp, (20, height - 20), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (90, 90, 90), 1)
+    else:
+        ok, encoded = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 80])
+        image = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+    return image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', choices=RESOLUTIONS, default='720p')
+    parser.add_argument('--screens', type=int, default=6, help="distinct screens in the corpus")
+    parser.add_argument('--variants', type=int, default=4, help="near-duplicates written per screen")
+    parser.add_argument('--dedupe', type=int, default=DUPLICATE_DISTANCE, help="largest hash distance in bits")
+    args = parser.parse_args()
+    
+    screens = make_flow(RESOLUTIONS[args.resolution], args.screens)
+    print(f"cpu count: {os.cpu_count()}, resolution: {args.resolution}, "
+          f"{args.screens} screens x {1 + args.variants} copies\n")
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i, screen in enumerate(screens):
+            for kind in range(1 + args.variants):
+                image = screen if kind == 0 else variant(screen, kind - 1, seed=i * 100 + kind)
+                path = str(Path(tmp) / f"screen_{i:02d}_{kind}.png")
+                cv2.imwrite(path, image)
+                paths.append(path)
+        
+        _init_worker()
+        start = time.perf_counter()
+        for path in paths:
+            hash_one(path)
+        hash_seconds = time.perf_counter() - start
+        
+        rows, scores = [], {}
+        for dedupe in (None, args.dedupe):
+            output = str(Path(tmp) / f"results_{dedupe}.jsonl")
+            start = time.perf_counter()
+            summary = run_batch(paths, output, workers=1, dedupe=dedupe, log=io.StringIO())
+            seconds = time.perf_counter() - start
+            records = [json.loads(line) for line in open(output, encoding='utf-8')]
+            scores[dedupe] = {r['image_path']: r['analysis']['overall_score'] for r in records}
+            rows.append((dedupe, summary['succeeded'] - summary['duplicates'], summary['duplicates'], seconds))
+    
+    error = max(abs(scores[args.dedupe][path] - scores[None][path]) for path in paths)
+    print("| dedupe bits | images | analyses | duplicates | batch s | images/s |")
+    print("|---|---|---|---|---|---|")
+    for dedupe, analyses, duplicates, seconds in rows:
+        print(f"| {dedupe if dedupe is not None else 'off'} | {len(paths)} | {analyses} | {duplicates} "
+              f"| {seconds:.1f} | {len(paths) / seconds:.1f} |")
+    print(f"\nhash pass: {hash_seconds:.2f}s, max score error of shared analyses: {error:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Cost of comparing two versions of a screen against analyzing both in full.
+
+Edits a synthetic 1080p screen three ways and times, for each edit:
+
+- ``full x2``: ``UIAnalyzer.full_analysis`` of both versions
+- ``compare``: ``UIAnalyzer.compare`` of the two versions
+- ``compare (cached)``: the same with the old version's record already in
+  an ``AnalysisCache``, as when a CI job compares against a fixed baseline
+
+Accuracy is whether the compared new version's elements and scores equal
+those of its full analysis.
+
+Usage: python benchmarks/bench_diff.py [--resolution NAME] [--repeat N]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from synthetic import RESOLUTIONS, make_ui
+from src.analysis_cache import AnalysisCache
+from src.ui_analyzer import UIAnalyzer
+
+
+def small_edit(image):
+    # a notification badge
+    height, width = image.shape[:2]
+    cv2.circle(image, (width * 3 // 4, height // 3), max(width // 120, 4), (40, 40, 220), -1)
+
+
+def medium_edit(image):
+    # a new call-to-action button with a label
+    height, width = image.shape[:2]
+    x, y = width // 2, height // 2
+    cv2.rectangle(image, (x, y), (x + width // 10, y + height // 18), (200, 120, 20), -1)
+    cv2.putText(image, "Buy now", (x + 8, y + height // 28), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+
+def large_edit(image):
+    # the content area redesigned: a different card grid below the header
+    height, width = image.shape[:2]
+    top = height // 10
+    image[top:height - height // 10, width // 6:] = make_ui((width, height), elements=12, colors=3,
+                                                            seed=7)[top:height - height // 10, width // 6:]
+
+
+EDITS = (('small', small_edit), ('medium', medium_edit), ('large', large_edit))
+
+
+def exact(diff: dict, full: dict) -> bool:
+    def elements(analysis):
+        return sorted((e['bbox'], e['area']) for e in analysis['elements']['elements'])
+    
+    return (elements(diff['after']) == elements(full) and diff['after']['layout'] == full['layout']
+            and diff['after']['colors'] == full['colors'] and diff['after']['spacing'] == full['spacing'])
+
+
+def best_of(repeat: int, run, setup=lambda: None) -> float:
+    times = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', choices=RESOLUTIONS, default='1080p')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    before = make_ui(RESOLUTIONS[args.resolution], elements=48)
+    analyzer = UIAnalyzer()
+    print(f"cpu count: {os.cpu_count()}, resolution: {args.resolution}\n")
+    print("| edit | changed | re-analyzed | full x2 ms | compare ms | compare (cached) ms | exact |")
+    print("|---|---|---|---|---|---|---|")
+    with tempfile.TemporaryDirectory() as tmp:
+        def baseline_cached():
+            # a fresh cache holding only the old version's record
+            cached = UIAnalyzer(cache=AnalysisCache(tempfile.mkdtemp(dir=tmp)))
+            cached.compare(before, before)
+            return cached
+        
+        for name, edit in EDITS:
+            after = before.copy()
+            edit(after)
+            diff = analyzer.compare(before, after)
+            full_ms = best_of(args.repeat, lambda _: (analyzer.full_analysis(before),
+                                                      analyzer.full_analysis(after))) * 1000
+            compare_ms = best_of(args.repeat, lambda _: analyzer.compare(before, after)) * 1000
+            cached_ms = best_of(args.repeat, lambda cached: cached.compare(before, after), baseline_cached) * 1000
+            print(f"| {name} | {diff['changed_ratio']:.2%} | {diff['reanalyzed_ratio']:.1%} | {full_ms:.0f} "
+                  f"| {compare_ms:.0f} | {cached_ms:.0f} | {exact(diff, analyzer.full_analysis(after))} |")
+
+
+if __name__ == "__main__":
+    main()
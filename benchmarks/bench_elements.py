@@ -0,0 +1,91 @@
+"""Memory and serialization cost of detected elements as a structured array against the legacy list of dicts.
+
+Detects the elements of a dense screen (a grid of small outlined cells,
+like a spreadsheet or an icon wall), then measures for both
+representations:
+
+- ``bytes/element``: memory held per element (tracemalloc)
+- ``pickle``: size and time to pickle, as batch and service workers do
+  to send an analysis to the parent process
+- ``JSON``: time of ``json.dumps`` of the elements in the legacy format
+
+Usage: python benchmarks/bench_elements.py [--resolution NAME] [--cell PX]
+"""
+import argparse
+import json
+import os
+import pickle
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from synthetic import RESOLUTIONS
+from src.element_list import ElementList, json_default
+from src.ui_analyzer import UIAnalyzer
+
+
+def dense_screen(size, cell: int) -> np.ndarray:
+    width, height = size
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    side = cell * 2 // 3
+    for y in range(cell // 4, height - side, cell):
+        for x in range(cell // 4, width - side, cell):
+            image[y:y + side, x:x + side] = (120, 90, 60)
+            image[y + 2:y + side - 2, x + 2:x + side - 2] = (230, 230, 230)
+    return image
+
+
+def legacy_elements(boxes, areas):
+    # detect_elements before the structured array
+    return [{'bbox': (x, y, w, h), 'area': area, 'center': (x + w//2, y + h//2)}
+            for (x, y, w, h), area in zip(boxes, areas)]
+
+
+def best_of(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', choices=RESOLUTIONS, default='4K')
+    parser.add_argument('--cell', type=int, default=24, help="pitch of the grid in pixels")
+    args = parser.parse_args()
+    
+    image = dense_screen(RESOLUTIONS[args.resolution], args.cell)
+    ctx = UIAnalyzer().create_context(image)
+    boxes = [tuple(int(v) for v in box) for box in ctx.native_bounding_boxes]
+    areas = [float(area) for area in ctx.native_contour_areas]
+    count = len(boxes)
+    
+    builders = {
+        'list of dicts': lambda: legacy_elements(boxes, areas),
+        'ElementList': lambda: ElementList.from_columns(boxes, areas)
+    }
+    print(f"cpu count: {os.cpu_count()}, resolution: {args.resolution}, {count} elements\n")
+    print("| representation | build ms | bytes/element | pickle KB | pickle ms | JSON ms |")
+    print("|---|---|---|---|---|---|")
+    for name, build in builders.items():
+        build_seconds = best_of(build)
+        tracemalloc.start()
+        elements = build()
+        held = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        pickled = pickle.dumps(elements, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle_seconds = best_of(lambda: pickle.loads(pickle.dumps(elements, protocol=pickle.HIGHEST_PROTOCOL)))
+        json_seconds = best_of(lambda: json.dumps(elements, default=json_default))
+        print(f"| {name} | {build_seconds * 1000:.1f} | {held / count:.0f} | {len(pickled) / 1024:.0f} "
+              f"| {pickle_seconds * 1000:.1f} | {json_seconds * 1000:.1f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Time to analyze a screen recording as a user flow, against analyzing its distinct screens alone.
+
+Writes a synthetic recording that visits a few screens in a loop (with
+cross-fades between them), then measures:
+
+- ``decode + hash``: reading the sampled frames and hashing them, no analysis
+- ``flow``: ``UserFlowAnalyzer.analyze`` of the recording
+- ``screens only``: ``full_analysis`` of each distinct screen image, the
+  floor a flow analysis can reach
+- ``every frame``: the estimated cost of analyzing every sampled frame
+
+Usage: python benchmarks/bench_flow.py [--resolution NAME] [--seconds S] [--screens N] [--sample-fps FPS]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from synthetic import RESOLUTIONS, make_flow, write_recording
+from src.frame_source import SAMPLE_FPS, FrameSource
+from src.perceptual_hash import dhash
+from src.ui_analyzer import UIAnalyzer
+from src.user_flow import UserFlowAnalyzer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--resolution', choices=RESOLUTIONS, default='720p')
+    parser.add_argument('--seconds', type=float, default=120.0, help="length of the recording")
+    parser.add_argument('--screens', type=int, default=5, help="distinct screens in the recording")
+    parser.add_argument('--sample-fps', type=float, default=SAMPLE_FPS)
+    args = parser.parse_args()
+    
+    screens = make_flow(RESOLUTIONS[args.resolution], args.screens)
+    # every screen in turn, then back to the first, until the time is up
+    visits = [i % args.screens for i in range(max(round(args.seconds / 3.3), 1))]
+    analyzer = UIAnalyzer()
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "flow.mp4")
+        write_recording(path, screens, visits, seconds=3.0, fps=30, transition=0.3)
+        
+        start = time.perf_counter()
+        frames = FrameSource(path, args.sample_fps)
+        examined = sum(1 for frame in frames if dhash(frame.image) is not None)
+        decode_seconds = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        flow = UserFlowAnalyzer(analyzer, sample_fps=args.sample_fps).analyze(path)
+        flow_seconds = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    for screen in screens:
+        analyzer.full_analysis(screen)
+    screens_seconds = time.perf_counter() - start
+    
+    print(f"cpu count: {os.cpu_count()}, resolution: {args.resolution}, sample fps: {args.sample_fps}\n")
+    print("| seconds | frames | examined | distinct | timeline spans | decode + hash s | flow s "
+          "| screens only s | every frame s (est.) |")
+    print("|---|---|---|---|---|---|---|---|---|")
+    print(f"| {flow['duration']:.0f} | {frames.frames_read} | {examined} | {len(flow['screens'])} "
+          f"| {len(flow['timeline'])} | {decode_seconds:.1f} | {flow_seconds:.1f} | {screens_seconds:.1f} "
+          f"| {examined * screens_seconds / len(screens):.0f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Ingest and query time of the SQLite metrics store on a large synthetic corpus.
+
+Builds ``--records`` batch records from real analyses of synthetic
+screens, with scores drawn at random per record, ingests them into a
+fresh database with and without the elements table, and times indexed
+queries like "contrast below 0.5 and element density above 0.8".
+
+Usage: python benchmarks/bench_metrics_store.py [--records N] [--resolution NAME]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from synthetic import RESOLUTIONS, make_ui
+from src.metrics_store import MetricsStore
+from src.ui_analyzer import UIAnalyzer
+
+QUERIES = (
+    ('contrast < 0.5 and density > 0.8', [('contrast_score', '<', 0.5), ('element_density', '>', 0.8)]),
+    ('20 lowest overall scores', []),
+    ('grid-based, symmetry >= 0.9', [('layout_type', '=', 'grid-based'), ('symmetry_score', '>=', 0.9)])
+)
+
+
+def make_records(count: int, size, seed: int = 0):
+    analyzer = UIAnalyzer()
+    templates = [analyzer.full_analysis(make_ui(size, elements=24 + 8 * i, colors=2 + i, seed=i)) for i in range(4)]
+    rng = np.random.default_rng(seed)
+    scores = rng.random((count, 4)).round(2)
+    for i in range(count):
+        template = templates[i % len(templates)]
+        path = f"screens/screen_{i:06d}.png"
+        yield {'image_path': path, 'status': 'ok', 'analysis': dict(
+            template, image_path=path, overall_score=float(scores[i, 0]),
+            colors=dict(template['colors'], contrast_score=float(scores[i, 1])),
+            spacing=dict(template['spacing'], element_density=float(scores[i, 2])),
+            layout=dict(template['layout'], symmetry_score=float(scores[i, 3])))}
+
+
+def best_of(func, repeat=5):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--resolution', choices=RESOLUTIONS, default='1080p')
+    args = parser.parse_args()
+    
+    records = list(make_records(args.records, RESOLUTIONS[args.resolution]))
+    elements = sum(r['analysis']['elements']['total_elements'] for r in records) / len(records)
+    print(f"cpu count: {os.cpu_count()}, {args.records} records, {elements:.0f} elements per record\n")
+    query_rows = []
+    print("| elements table | ingest s | analyses/s | database MB |")
+    print("|---|---|---|---|")
+    with tempfile.TemporaryDirectory() as tmp:
+        for with_elements in (False, True):
+            path = str(Path(tmp) / f"metrics_{with_elements}.db")
+            with MetricsStore(path) as store:
+                start = time.perf_counter()
+                store.ingest(records, elements=with_elements)
+                ingest = time.perf_counter() - start
+                if with_elements:
+                    for name, conditions in QUERIES:
+                        options = {'columns': ('image_path', 'overall_score')}
+                        if not conditions:
+                            options.update(order_by='overall_score', limit=20)
+                        rows = store.query(conditions, **options)
+                        query_rows.append((name, len(rows), best_of(lambda: store.query(conditions, **options)),
+                                           best_of(lambda: store.count(conditions))))
+            size = sum(p.stat().st_size for p in Path(tmp).glob(f"metrics_{with_elements}.db*"))
+            print(f"| {'yes' if with_elements else 'no'} | {ingest:.1f} | {len(records) / ingest:,.0f} "
+                  f"| {size / 2 ** 20:.0f} |")
+    
+    print("\n| query | rows | query ms | count ms |")
+    print("|---|---|---|---|")
+    for name, rows, query_seconds, count_seconds in query_rows:
+        print(f"| {name} | {rows} | {query_seconds * 1000:.1f} | {count_seconds * 1000:.1f} |")
+
+if __name__ == "__main__":
+    main()
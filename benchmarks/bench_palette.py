@@ -0,0 +1,83 @@
+"""Compare median-cut palette extraction against the previous sampled K-means.
+
+Reports time per image, whether two runs give the same palette, and the
+mean RGB distance from every pixel to its closest palette color. The
+K-means column needs scikit-learn, which the app no longer depends on.
+
+Usage: python benchmarks/bench_palette.py [--repeat N]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bench_color_stats import make_screenshot
+from src.color_stats import ColorStats
+from src.palette import extract_palette
+
+RESOLUTIONS = {
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '4K': (3840, 2160),
+}
+
+
+def legacy_palette(image: np.ndarray, stats: ColorStats):
+    from sklearn.cluster import KMeans
+    
+    pixels = image.reshape(-1, 3)
+    sample = pixels[np.random.choice(len(pixels), min(1000, len(pixels)), replace=False)][:, ::-1]
+    kmeans = KMeans(n_clusters=5, random_state=42, n_init=10)
+    kmeans.fit(sample)
+    return [tuple(int(c) for c in color) for color in kmeans.cluster_centers_.astype(int)]
+
+
+def median_cut_palette(image: np.ndarray, stats: ColorStats):
+    return extract_palette(stats, 5)[0]
+
+
+def quantization_error(stats: ColorStats, palette) -> float:
+    colors = stats.colors.astype(np.float64)
+    centers = np.asarray(palette, dtype=np.float64)
+    distances = np.sqrt(np.square(colors[:, None, :] - centers[None, :, :]).sum(axis=2)).min(axis=1)
+    return float((distances * stats.counts).sum() / stats.total_pixels)
+
+
+def best_time(func, image, stats, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(image, stats)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    try:
+        import sklearn  # noqa: F401
+        methods = {'k-means': legacy_palette, 'median cut': median_cut_palette}
+    except ImportError:
+        print("scikit-learn not installed; timing median cut only\n")
+        methods = {'median cut': median_cut_palette}
+    
+    print(f"{'resolution':<12}{'method':<12}{'time':>10}{'stable':>8}{'error':>8}")
+    for name, (width, height) in RESOLUTIONS.items():
+        image = make_screenshot(width, height)
+        stats = ColorStats.from_bgr_image(image)
+        for label, func in methods.items():
+            elapsed, palette = best_time(func, image, stats, args.repeat)
+            stable = func(image, stats) == func(image, stats)
+            error = quantization_error(stats, palette)
+            print(f"{name:<12}{label:<12}{elapsed * 1000:>8.1f}ms{'yes' if stable else 'no':>8}{error:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Render time and memory per PDF report when exporting many reports.
+
+Analyzes one synthetic screenshot, then renders its report ``--reports``
+times in each mode:
+
+- ``bytes``: ``generate_pdf(report)`` returns each PDF as bytes
+- ``path``: ``generate_pdf(report, path)`` writes one file per report
+- ``sink``: ``generate_pdf(report, f)`` writes every report to one open file
+- ``cold``: like ``bytes`` but rebuilds the stylesheet for every report, as
+  the generator did before styles were shared
+
+Memory is the ``tracemalloc`` peak over a whole run; with reports written
+out as they are rendered it does not grow with ``--reports``.
+
+Usage: python benchmarks/bench_pdf.py [--reports N] [--mode NAME ...]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from synthetic import RESOLUTIONS, make_ui
+from src import pdf_report_generator
+from src.pdf_report_generator import PDFReportGenerator
+from src.suggestion_generator import SuggestionGenerator
+from src.ui_analyzer import UIAnalyzer
+
+MODES = ('bytes', 'path', 'sink', 'cold')
+
+
+def make_report() -> dict:
+    analysis = UIAnalyzer().full_analysis(make_ui(RESOLUTIONS['1080p'], elements=48))
+    generator = SuggestionGenerator()
+    return {
+        'analysis': analysis,
+        'suggestions': generator.generate_suggestions(analysis),
+        'wireframe_suggestions': generator.generate_wireframe_suggestions(analysis)
+    }
+
+
+def export(mode: str, report: dict, count: int, folder: Path):
+    generator = PDFReportGenerator()
+    if mode == 'sink':
+        with open(folder / "all.pdf", 'wb') as f:
+            for _ in range(count):
+                generator.generate_pdf(report, f)
+        return
+    for i in range(count):
+        if mode == 'path':
+            generator.generate_pdf(report, str(folder / f"report-{i}.pdf"))
+        else:
+            if mode == 'cold':
+                pdf_report_generator.build_stylesheet.cache_clear()
+                generator = PDFReportGenerator()
+            generator.generate_pdf(report)
+
+
+def measure(mode: str, report: dict, count: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        # warm up imports, fonts and the stylesheet
+        export(mode, report, 1, Path(tmp))
+        start = time.perf_counter()
+        export(mode, report, count, Path(tmp))
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        try:
+            export(mode, report, count, Path(tmp))
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return {'ms_per_report': elapsed / count * 1000, 'peak_mb': peak / 2 ** 20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reports', type=int, default=200)
+    parser.add_argument('--mode', action='append', choices=MODES, help="repeatable (default: all)")
+    args = parser.parse_args()
+    
+    report = make_report()
+    print(f"cpu count: {os.cpu_count()}, {args.reports} reports per mode\n")
+    print("| mode | ms/report | reports/s | peak MB |")
+    print("|---|---|---|---|")
+    for mode in args.mode or MODES:
+        result = measure(mode, report, args.reports)
+        print(f"| {mode} | {result['ms_per_report']:.2f} | {1000 / result['ms_per_report']:.0f} "
+              f"| {result['peak_mb']:.2f} |")
+
+
+if __name__ == "__main__":
+    main()
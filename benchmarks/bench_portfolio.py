@@ -0,0 +1,105 @@
+"""Build time and memory of a portfolio PDF as the number of screens grows.
+
+Renders one synthetic analysis (with its overall score varied) as every
+screen of a portfolio, in two modes:
+
+- ``streamed``: ``PortfolioReportGenerator.generate_pdf`` as shipped
+- ``in-memory``: the same flowables built up front as one plain list and
+  laid out with the stock canvas, as a single ``multiBuild`` call would
+
+Memory is the ``tracemalloc`` peak of one build, output included.
+
+Usage: python benchmarks/bench_portfolio.py [--screens N ...] [--mode NAME ...]
+"""
+import argparse
+import copy
+import io
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from synthetic import RESOLUTIONS, make_ui
+from src import portfolio_report
+from src.portfolio_report import PortfolioReportGenerator
+from src.suggestion_generator import SuggestionGenerator
+from src.ui_analyzer import UIAnalyzer
+
+MODES = ('streamed', 'in-memory')
+
+
+def make_analysis() -> tuple:
+    analysis = UIAnalyzer().full_analysis(make_ui(RESOLUTIONS['1080p'], elements=48))
+    return analysis, SuggestionGenerator().generate_suggestions(analysis)
+
+
+def make_records(analysis: dict, suggestions: list, count: int):
+    for i in range(count):
+        record = {'image_path': f"screens/screen-{i:04d}.png", 'status': 'ok',
+                  'analysis': copy.deepcopy(analysis), 'suggestions': suggestions}
+        record['analysis']['overall_score'] = (i * 37 % 100) / 100
+        yield record
+
+
+class InMemoryStory(portfolio_report.LazyStory):
+    """Every section materialized before the build starts."""
+    
+    def __init__(self, head, make_tail):
+        super().__init__(head, make_tail)
+        self._fill(float('inf'))
+    
+    def __getitem__(self, key):
+        if key == slice(None):
+            return InMemoryStory(self.head, self.make_tail)
+        return self._buffer[key]
+
+
+def build(mode: str, sample: tuple, count: int) -> dict:
+    generator = PortfolioReportGenerator()
+    if mode == 'in-memory':
+        portfolio_report.LazyStory, portfolio_report._StreamingCanvas, saved = (
+            InMemoryStory, portfolio_report.Canvas,
+            (portfolio_report.LazyStory, portfolio_report._StreamingCanvas))
+    try:
+        return generator.generate_pdf(make_records(*sample, count), io.BytesIO())
+    finally:
+        if mode == 'in-memory':
+            portfolio_report.LazyStory, portfolio_report._StreamingCanvas = saved
+
+
+def measure(mode: str, sample: tuple, count: int) -> dict:
+    start = time.perf_counter()
+    result = build(mode, sample, count)
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    try:
+        build(mode, sample, count)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'pages': result['pages'], 'seconds': elapsed, 'peak_mb': peak / 2 ** 20}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--screens', type=int, action='append', help="repeatable (default: 50 and 200)")
+    parser.add_argument('--mode', action='append', choices=MODES, help="repeatable (default: all)")
+    args = parser.parse_args()
+    
+    sample = make_analysis()
+    build('streamed', sample, 1)  # warm up imports and fonts
+    print(f"cpu count: {os.cpu_count()}\n")
+    print("| mode | screens | pages | seconds | ms/screen | peak MB |")
+    print("|---|---|---|---|---|---|")
+    for count in args.screens or [50, 200]:
+        for mode in args.mode or MODES:
+            result = measure(mode, sample, count)
+            print(f"| {mode} | {count} | {result['pages']} | {result['seconds']:.1f} "
+                  f"| {result['seconds'] / count * 1000:.0f} | {result['peak_mb']:.1f} |")
+
+
+if __name__ == "__main__":
+    main()
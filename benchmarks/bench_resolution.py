@@ -0,0 +1,141 @@
+"""Accuracy versus speed of resolution-adaptive analysis on Retina-style captures.
+
+Every setting analyzes the same synthetic 2x screenshots. Metric error is
+the mean absolute difference from the native-resolution result; element
+error compares detected element counts.
+
+Usage: python benchmarks/bench_resolution.py [--images N] [--width W] [--height H]
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src import ui_analyzer
+from src.ui_analyzer import UIAnalyzer
+
+# (label, UIAnalyzer arguments, element stage floor or None for the default)
+SETTINGS = [
+    ('native', {}, None),
+    ('dpr 2 (1x)', {'device_pixel_ratio': 2}, None),
+    ('max_side 2048', {'max_side': 2048}, None),
+    ('max_side 1280', {'max_side': 1280}, None),
+    ('max_side 1024', {'max_side': 1024}, None),
+    ('max_side 768', {'max_side': 768}, None),
+    ('max_side 512', {'max_side': 512}, None),
+    ('dpr 2, elements at 1x', {'device_pixel_ratio': 2}, 0.0),
+    ('max_side 1024, elements too', {'max_side': 1024}, 0.0),
+]
+
+METRICS = [
+    ('layout', 'grid_score'),
+    ('layout', 'alignment_score'),
+    ('layout', 'symmetry_score'),
+    ('colors', 'contrast_score'),
+    ('spacing', 'spacing_consistency'),
+    ('spacing', 'whitespace_ratio'),
+    (None, 'overall_score'),
+]
+
+
+def make_retina_screenshot(css_width: int, css_height: int, dpr: int = 2, seed: int = 0) -> np.ndarray:
+    """A card-and-toolbar layout drawn at ``dpr`` device pixels per CSS pixel."""
+    rng = np.random.default_rng(seed)
+    image = np.full((css_height * dpr, css_width * dpr, 3), 248, dtype=np.uint8)
+    
+    def rect(x, y, w, h, color, fill=True):
+        cv2.rectangle(image, (x * dpr, y * dpr), ((x + w) * dpr, (y + h) * dpr), color,
+                      -1 if fill else dpr)
+    
+    def text(x, y, label, color=(40, 40, 40)):
+        cv2.putText(image, label, (x * dpr, y * dpr), cv2.FONT_HERSHEY_SIMPLEX, 0.45 * dpr,
+                    color, dpr, cv2.LINE_AA)
+    
+    rect(0, 0, css_width, 56, (80, 62, 44))
+    text(24, 34, "Dashboard", (255, 255, 255))
+    rect(0, 56, 220, css_height - 56, (236, 232, 228))
+    for i in range(8):
+        text(24, 100 + i * 40, f"Menu item {i + 1}")
+    
+    card_w, gap = 260, 24
+    columns = max(1, (css_width - 220 - gap) // (card_w + gap))
+    for i in range(columns * 3):
+        x = 220 + gap + (i % columns) * (card_w + gap)
+        y = 56 + gap + (i // columns) * (180 + gap)
+        if y + 180 > css_height:
+            break
+        accent = tuple(int(c) for c in rng.integers(40, 220, 3))
+        rect(x, y, card_w, 180, (255, 255, 255))
+        rect(x, y, card_w, 180, (210, 210, 210), fill=False)
+        rect(x + 16, y + 16, 48, 48, accent)
+        text(x + 76, y + 40, f"Metric {i + 1}")
+        text(x + 16, y + 100, f"{int(rng.integers(100, 9999))} users")
+        rect(x + 16, y + 140, int(rng.integers(60, card_w - 32)), 8, accent)
+    return image
+
+
+def run_setting(images, params):
+    analyzer = UIAnalyzer(**params)
+    results = []
+    start = time.perf_counter()
+    for image in images:
+        results.append(analyzer._analyze(image, None))
+    return (time.perf_counter() - start) / len(images), results
+
+
+def time_structural(images, params):
+    """Time of the element, layout and spacing stages, which are the ones that change with scale."""
+    analyzer = UIAnalyzer(**params)
+    start = time.perf_counter()
+    for image in images:
+        ctx = analyzer.create_context(image)
+        analyzer.detect_elements(ctx)
+        analyzer.analyze_layout(ctx)
+        analyzer.analyze_spacing(ctx)
+    return (time.perf_counter() - start) / len(images)
+
+
+def metric(result, section, name):
+    return result[name] if section is None else result[section][name]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=3)
+    parser.add_argument('--width', type=int, default=1440, help="CSS width; the capture is twice as wide")
+    parser.add_argument('--height', type=int, default=900)
+    args = parser.parse_args()
+    
+    images = [make_retina_screenshot(args.width, args.height, seed=i) for i in range(args.images)]
+    native_time, native = run_setting(images, {})
+    native_structural = time_structural(images, {})
+    
+    header = ['setting', 'layout / elements scale', 'structural', 'speedup', 'full', 'elements']
+    header += [name.replace('_score', '').replace('_', ' ') for _, name in METRICS]
+    print("| " + " | ".join(header) + " |")
+    print("|" + "---|" * len(header))
+    default_floor = ui_analyzer.STAGE_MIN_SCALE['elements']
+    for label, params, element_floor in SETTINGS:
+        ui_analyzer.STAGE_MIN_SCALE['elements'] = default_floor if element_floor is None else element_floor
+        elapsed, results = (native_time, native) if not params else run_setting(images, params)
+        structural = native_structural if not params else time_structural(images, params)
+        scales = results[0]['analysis_scale']
+        count_error = np.mean([
+            abs(r['elements']['total_elements'] - n['elements']['total_elements']) / max(n['elements']['total_elements'], 1)
+            for r, n in zip(results, native)
+        ])
+        row = [label, f"{scales['layout']:.2f} / {scales['elements']:.2f}", f"{structural * 1000:.0f} ms",
+               f"{native_structural / structural:.1f}x", f"{elapsed * 1000:.0f} ms", f"{count_error:.0%}"]
+        for section, name in METRICS:
+            error = np.mean([abs(metric(r, section, name) - metric(n, section, name)) for r, n in zip(results, native)])
+            row.append(f"{error:.3f}")
+        print("| " + " | ".join(row) + " |")
+    ui_analyzer.STAGE_MIN_SCALE['elements'] = default_floor
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Cold-start time of the CLI and first-render time of the Streamlit app.
+
+Every measurement runs in a fresh interpreter. The CLI is timed end to end
+(``python src/main.py --help``); the app is timed from the first script run
+of ``streamlit.testing.v1.AppTest``, i.e. excluding Streamlit's own import.
+Exits with status 1 when a median exceeds its budget, so it can gate CI.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--cli-budget S] [--app-budget S]
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+HEAVY_MODULES = ('cv2', 'numpy', 'reportlab', 'sklearn')
+
+APP_PROBE = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+app = AppTest.from_file({app!r}).run(timeout=60)
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'errors': len(app.exception),
+                   'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def time_cli() -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, str(ROOT / 'src' / 'main.py'), '--help'],
+                   check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def time_app() -> dict:
+    probe = APP_PROBE.format(app=str(ROOT / 'ui' / 'app.py'), heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', probe], check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def time_eager_imports() -> float:
+    """What the CLI used to pay before it printed anything."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'import cv2, numpy'], check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--cli-budget', type=float, default=0.15, help="seconds, median of --runs")
+    parser.add_argument('--app-budget', type=float, default=0.5, help="seconds, median of --runs")
+    args = parser.parse_args()
+    
+    cli = [time_cli() for _ in range(args.runs)]
+    eager = [time_eager_imports() for _ in range(args.runs)]
+    app = [time_app() for _ in range(args.runs)]
+    app_times = [run['elapsed'] for run in app]
+    
+    rows = [
+        ('main.py --help', statistics.median(cli), max(cli), args.cli_budget),
+        ('import cv2, numpy', statistics.median(eager), max(eager), None),
+        ('app first render', statistics.median(app_times), max(app_times), args.app_budget),
+    ]
+    print(f"{'measurement':<20}{'median':>10}{'max':>10}{'budget':>10}")
+    over_budget = []
+    for name, median, worst, budget in rows:
+        print(f"{name:<20}{median:>9.3f}s{worst:>9.3f}s{(f'{budget:.2f}s' if budget else '-'):>10}")
+        if budget and median > budget:
+            over_budget.append(name)
+    print(f"\nheavy modules loaded by the first render: {', '.join(app[0]['loaded']) or 'none'}")
+    
+    if any(run['errors'] for run in app):
+        print("app raised an exception during the first render", file=sys.stderr)
+        sys.exit(1)
+    if over_budget:
+        print(f"over budget: {', '.join(over_budget)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Time to generate suggestions for a large corpus, one analysis at a time against the vectorized rule table.
+
+Draws ``--analyses`` analyses with random scores, then measures:
+
+- ``per analysis``: ``generate_suggestions`` called on each analysis dict
+- ``metric table``: collecting the rule metrics into one structured array
+- ``evaluate``: which rules fire and which template each uses, as arrays
+- ``generate_batch``: the suggestion dicts for every analysis
+- ``new threshold``: ``with_thresholds`` and ``generate_batch`` again, the
+  cost of regenerating the corpus after tuning a rule
+
+Usage: python benchmarks/bench_suggestions.py [--analyses N]
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.suggestion_generator import SuggestionGenerator
+
+
+def make_analyses(count: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    scores = rng.random((count, 7)).round(3).tolist()
+    return [{
+        'layout': {'grid_score': grid, 'alignment_score': alignment, 'layout_type': 'grid-based'},
+        'colors': {'contrast_score': contrast, 'color_diversity': diversity},
+        'spacing': {'spacing_consistency': consistency, 'whitespace_ratio': whitespace},
+        'overall_score': overall
+    } for grid, alignment, contrast, diversity, consistency, whitespace, overall in scores]
+
+
+def best_of(func, repeat=3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--analyses', type=int, default=100000)
+    args = parser.parse_args()
+    
+    analyses = make_analyses(args.analyses)
+    generator = SuggestionGenerator()
+    stricter = generator.with_thresholds(contrast_score=0.6)
+    
+    single_seconds, single = best_of(lambda: [generator.generate_suggestions(a) for a in analyses])
+    table_seconds, table = best_of(lambda: generator.metric_table(analyses))
+    evaluate_seconds, _ = best_of(lambda: generator.evaluate(table))
+    batch_seconds, batch = best_of(lambda: generator.generate_batch(table))
+    assert batch == single
+    threshold_seconds, _ = best_of(lambda: generator.with_thresholds(contrast_score=0.6).generate_batch(table))
+    changed = sum(a != b for a, b in zip(batch, stricter.generate_batch(table)))
+    
+    print(f"cpu count: {os.cpu_count()}, {args.analyses} analyses, "
+          f"{sum(map(len, batch)) / len(batch):.1f} suggestions per analysis\n")
+    print("| step | s | analyses/s |")
+    print("|---|---|---|")
+    for name, seconds in (('per analysis', single_seconds), ('metric table', table_seconds),
+                          ('evaluate', evaluate_seconds), ('generate_batch', batch_seconds),
+                          ('new threshold', threshold_seconds)):
+        print(f"| {name} | {seconds:.3f} | {args.analyses / seconds:,.0f} |")
+    print(f"\ncontrast_score < 0.6 instead of 0.5 changed the suggestions of {changed} analyses")
+
+
+if __name__ == "__main__":
+    main()
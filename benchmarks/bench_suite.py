@@ -0,0 +1,239 @@
+"""Per-stage timing and peak memory of the analysis pipeline on synthetic UIs.
+
+Each case draws a screenshot with ``synthetic.make_ui`` and times every
+``UIAnalyzer`` stage on a shared ``AnalysisContext`` (as ``full_analysis``
+runs them, so ``detect_elements`` pays for the edge map and contours),
+then ``full_analysis`` itself, ``SuggestionGenerator`` and
+``PDFReportGenerator.generate_pdf``. Times are the best of ``--repeat``
+runs; peak memory is measured in a separate pass with ``tracemalloc``.
+
+Results are compared against a baseline JSON file and the script exits
+with status 1 when a stage is slower or larger than the baseline by more
+than the thresholds stored in that file. Baselines are only comparable on
+the machine that recorded them.
+
+Usage: python benchmarks/bench_suite.py [--suite quick|full] [--case NAME ...] [--repeat N]
+                                        [--baseline FILE] [--update-baseline] [--output FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, Tuple
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from synthetic import RESOLUTIONS, make_ui
+from src.pdf_report_generator import PDFReportGenerator
+from src.suggestion_generator import SuggestionGenerator
+from src.ui_analyzer import UIAnalyzer
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+SCHEMA_VERSION = 1
+# A stage regresses when it exceeds the baseline by both the ratio and the
+# absolute delta; the delta keeps millisecond-scale stages from flapping.
+DEFAULT_THRESHOLDS = {
+    'time_ratio': 1.3,
+    'min_time_delta': 0.02,
+    'memory_ratio': 1.2,
+    'min_memory_delta_mb': 2.0,
+}
+STAGES = ('detect_elements', 'analyze_layout', 'analyze_colors', 'analyze_spacing',
+          'full_analysis', 'generate_suggestions', 'generate_pdf')
+
+
+def case(resolution, elements=24, colors=6, noise=0.0):
+    name = f"{resolution}-e{elements}-c{colors}-n{noise:g}"
+    return name, {'resolution': resolution, 'elements': elements, 'colors': colors, 'noise': noise}
+
+
+SUITES = {
+    'quick': dict([
+        case('720p'),
+        case('1080p'),
+        case('1080p', elements=200),
+        case('1080p', colors=32),
+        case('1080p', noise=4.0),
+    ]),
+}
+SUITES['full'] = dict(SUITES['quick'], **dict([
+    case('1440p'),
+    case('4K'),
+    case('4K', elements=400, noise=2.0),
+    case('5K'),
+    case('8K'),
+    case('tall-desktop', elements=120),
+    case('tall-mobile', elements=60),
+]))
+
+
+def environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'opencv': cv2.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def run_stages(image: np.ndarray) -> Iterator[Tuple[str, Callable]]:
+    """Yield ``(stage, callable)`` pairs; calling them in order runs the pipeline once."""
+    analyzer = UIAnalyzer()
+    generator = SuggestionGenerator()
+    ctx = analyzer.create_context(image)
+    state = {}
+    yield 'detect_elements', lambda: analyzer.detect_elements(ctx)
+    yield 'analyze_layout', lambda: analyzer.analyze_layout(ctx)
+    yield 'analyze_colors', lambda: analyzer.analyze_colors(ctx)
+    yield 'analyze_spacing', lambda: analyzer.analyze_spacing(ctx)
+    
+    def analysis():
+        state['analysis'] = analyzer.full_analysis(image)
+    yield 'full_analysis', analysis
+    
+    def suggestions():
+        state['suggestions'] = generator.generate_suggestions(state['analysis'])
+        state['wireframe'] = generator.generate_wireframe_suggestions(state['analysis'])
+    yield 'generate_suggestions', suggestions
+    yield 'generate_pdf', lambda: PDFReportGenerator().generate_pdf({
+        'analysis': state['analysis'],
+        'suggestions': state['suggestions'],
+        'wireframe_suggestions': state['wireframe'],
+    })
+
+
+def time_case(image: np.ndarray, repeat: int) -> dict:
+    best = {stage: float('inf') for stage in STAGES}
+    for _ in range(repeat):
+        for stage, func in run_stages(image):
+            start = time.perf_counter()
+            func()
+            best[stage] = min(best[stage], time.perf_counter() - start)
+    return best
+
+
+def measure_memory(image: np.ndarray) -> dict:
+    peaks = {}
+    tracemalloc.start()
+    try:
+        for stage, func in run_stages(image):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            func()
+            peaks[stage] = (tracemalloc.get_traced_memory()[1] - before) / 2 ** 20
+    finally:
+        tracemalloc.stop()
+    return peaks
+
+
+def run_suite(cases: dict, repeat: int, log=sys.stderr) -> dict:
+    results = {}
+    for name, params in cases.items():
+        print(f"running {name}", file=log)
+        image = make_ui(RESOLUTIONS[params['resolution']], elements=params['elements'],
+                        colors=params['colors'], noise=params['noise'])
+        seconds = time_case(image, repeat)
+        peaks = measure_memory(image)
+        results[name] = {
+            'params': params,
+            'stages': {
+                stage: {'seconds': round(seconds[stage], 4), 'peak_mb': round(peaks[stage], 2)}
+                for stage in STAGES
+            },
+        }
+    return results
+
+
+def compare(current: dict, baseline: dict) -> list:
+    """Regressions of ``current`` case results against a baseline document."""
+    thresholds = dict(DEFAULT_THRESHOLDS, **baseline.get('thresholds', {}))
+    regressions = []
+    for name, result in current.items():
+        base_stages = baseline.get('cases', {}).get(name, {}).get('stages', {})
+        for stage, values in result['stages'].items():
+            base = base_stages.get(stage)
+            if base is None:
+                continue
+            checks = (
+                ('seconds', thresholds['time_ratio'], thresholds['min_time_delta']),
+                ('peak_mb', thresholds['memory_ratio'], thresholds['min_memory_delta_mb']),
+            )
+            for metric, ratio, min_delta in checks:
+                now, before = values[metric], base[metric]
+                if now > before * ratio and now - before > min_delta:
+                    regressions.append((name, stage, metric, before, now))
+    return regressions
+
+
+def print_table(current: dict, baseline: dict):
+    cases = baseline.get('cases', {})
+    print("| case | stage | seconds | baseline | peak MB | baseline |")
+    print("|---|---|---|---|---|---|")
+    for name, result in current.items():
+        for stage, values in result['stages'].items():
+            base = cases.get(name, {}).get('stages', {}).get(stage, {})
+            print(f"| {name} | {stage} | {values['seconds']:.4f} | {base.get('seconds', '-')} "
+                  f"| {values['peak_mb']:.2f} | {base.get('peak_mb', '-')} |")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--suite', choices=sorted(SUITES), default='quick')
+    parser.add_argument('--case', action='append', default=[],
+                        help="run only this case (repeatable); see SUITES for names")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--baseline', type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="write the results into the baseline file instead of comparing")
+    parser.add_argument('--output', type=Path, help="also write the results document here")
+    args = parser.parse_args()
+    
+    cases = SUITES[args.suite]
+    if args.case:
+        unknown = [name for name in args.case if name not in SUITES['full']]
+        if unknown:
+            parser.error(f"unknown case: {', '.join(unknown)}")
+        cases = {name: SUITES['full'][name] for name in args.case}
+    
+    baseline = json.loads(args.baseline.read_text(encoding='utf-8')) if args.baseline.exists() else {}
+    document = {
+        'schema': SCHEMA_VERSION,
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'thresholds': baseline.get('thresholds', DEFAULT_THRESHOLDS),
+        'cases': run_suite(cases, args.repeat),
+    }
+    if args.output:
+        args.output.write_text(json.dumps(document, indent=2) + "\n", encoding='utf-8')
+    
+    print_table(document['cases'], baseline)
+    if args.update_baseline:
+        merged = dict(document, cases=dict(baseline.get('cases', {}), **document['cases']))
+        args.baseline.write_text(json.dumps(merged, indent=2) + "\n", encoding='utf-8')
+        print(f"\nbaseline written to {args.baseline}")
+        return
+    
+    if not baseline:
+        print(f"\nno baseline at {args.baseline}; run with --update-baseline to record one")
+        return
+    if baseline.get('environment') != document['environment']:
+        print("\nnote: the baseline was recorded in a different environment", file=sys.stderr)
+    regressions = compare(document['cases'], baseline)
+    for name, stage, metric, before, now in regressions:
+        print(f"REGRESSION {name} {stage} {metric}: {before} -> {now}", file=sys.stderr)
+    if regressions:
+        sys.exit(1)
+    print("\nno regressions")
+
+
+if __name__ == "__main__":
+    main()
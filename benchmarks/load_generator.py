@@ -0,0 +1,130 @@
+"""Load generator for the analysis service: latency percentiles and throughput.
+
+Sends ``--requests`` analysis requests of synthetic screenshots to a running
+``src/service.py`` (or, with ``--spawn N``, to a service with N worker
+processes started in this process). Requests are either closed-loop, with
+``--concurrency`` clients each sending the next request when the previous
+one returns, or open-loop at ``--rate`` requests per second whatever the
+service does, which is the way to see admission control and deadlines at
+work. A share of the requests is sent with batch priority.
+
+Latencies are measured per request from send to the last byte of the
+response, and reported as p50/p95/p99 per priority and status code.
+
+Usage: python benchmarks/load_generator.py [--spawn N | --host HOST --port PORT | --socket PATH]
+                                           [--requests N] [--concurrency N | --rate R] [--batch-share F]
+                                           [--deadline S] [--resolution NAME] [--images N]
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from synthetic import RESOLUTIONS, make_ui
+from src.service import DEFAULT_HOST, DEFAULT_PORT, AnalysisService, request
+
+
+def percentile(values: list, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)]
+
+
+async def send(target: str, body: bytes, args, results: list, priority: str):
+    start = time.perf_counter()
+    try:
+        status, _, _ = await request('POST', target, body, args.host, args.port, args.socket)
+    except OSError:
+        status = 'connection error'
+    results.append((priority, status, time.perf_counter() - start))
+
+
+async def run_load(args, images: list) -> tuple:
+    rng = random.Random(0)
+    jobs = []
+    for i in range(args.requests):
+        priority = 'batch' if rng.random() < args.batch_share else 'interactive'
+        target = f"/analyze?priority={priority}&name=load-{i}.png"
+        if args.deadline:
+            target += f"&deadline={args.deadline:g}"
+        jobs.append((target, images[i % len(images)], priority))
+    
+    results = []
+    start = time.perf_counter()
+    if args.rate:
+        tasks = []
+        for target, body, priority in jobs:
+            tasks.append(asyncio.create_task(send(target, body, args, results, priority)))
+            await asyncio.sleep(1 / args.rate)
+        await asyncio.gather(*tasks)
+    else:
+        remaining = iter(jobs)
+        
+        async def client():
+            for target, body, priority in remaining:
+                await send(target, body, args, results, priority)
+        await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    return results, time.perf_counter() - start
+
+
+async def main_async(args, images: list) -> tuple:
+    if not args.spawn:
+        return await run_load(args, images)
+    # a fresh service without the on-disk cache, so every request is analyzed
+    service = AnalysisService(workers=args.spawn, queue_size=args.queue_size)
+    server = await service.serve(args.host, args.port, args.socket)
+    try:
+        # the first request pays for starting the worker processes
+        await request('POST', '/analyze?name=warmup.png', images[0], args.host, args.port, args.socket)
+        return await run_load(args, images)
+    finally:
+        server.close()
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--socket', help="connect to this Unix socket instead of TCP")
+    parser.add_argument('--spawn', type=int, metavar='N',
+                        help="start a service with N worker processes instead of using a running one")
+    parser.add_argument('--queue-size', type=int, default=64, help="queue size of the spawned service")
+    parser.add_argument('--requests', type=int, default=40)
+    parser.add_argument('--concurrency', type=int, default=4, help="closed-loop clients (default: 4)")
+    parser.add_argument('--rate', type=float, help="open-loop arrival rate in requests per second")
+    parser.add_argument('--batch-share', type=float, default=0.5,
+                        help="fraction of requests sent with batch priority (default: 0.5)")
+    parser.add_argument('--deadline', type=float, help="deadline in seconds sent with every request")
+    parser.add_argument('--resolution', choices=sorted(RESOLUTIONS), default='720p')
+    parser.add_argument('--images', type=int, default=8, help="distinct screenshots to cycle through")
+    args = parser.parse_args()
+    
+    images = [cv2.imencode('.png', make_ui(RESOLUTIONS[args.resolution], seed=seed))[1].tobytes()
+              for seed in range(args.images)]
+    results, elapsed = asyncio.run(main_async(args, images))
+    
+    mode = f"open loop at {args.rate:g}/s" if args.rate else f"{args.concurrency} clients"
+    ok = sum(1 for _, status, _ in results if status == 200)
+    print(f"{len(results)} requests ({mode}) in {elapsed:.2f} s: "
+          f"{len(results) / elapsed:.2f} requests/s, {ok / elapsed:.2f} successful/s\n")
+    print("| priority | status | count | p50 ms | p95 ms | p99 ms | mean ms |")
+    print("|---|---|---|---|---|---|---|")
+    groups = {}
+    for priority, status, latency in results:
+        groups.setdefault((priority, str(status)), []).append(latency * 1000)
+        groups.setdefault(('all', str(status)), []).append(latency * 1000)
+    for (priority, status), latencies in sorted(groups.items()):
+        print(f"| {priority} | {status} | {len(latencies)} | {percentile(latencies, 50):.0f} "
+              f"| {percentile(latencies, 95):.0f} | {percentile(latencies, 99):.0f} "
+              f"| {statistics.mean(latencies):.0f} |")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""Parameterized synthetic UI screenshots for benchmarks.
+
+Extends the layout of ``create_sample_screenshot`` in
+``tests/run_sample_test.py`` (header, side navigation, a grid of content
+cards with text, footer) to any resolution, element count, number of accent
+colors and sensor-style noise level. Images are deterministic for a given
+seed.
+"""
+import math
+from typing import List, Sequence, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+
+# name -> (width, height) in device pixels
+RESOLUTIONS = {
+    '720p': (1280, 720),
+    '1080p': (1920, 1080),
+    '1440p': (2560, 1440),
+    '4K': (3840, 2160),
+    '5K': (5120, 2880),
+    '8K': (7680, 4320),
+    # full-page captures: a desktop page at 1x and a phone page at 3x
+    'tall-desktop': (1440, 12000),
+    'tall-mobile': (1170, 16000),
+}
+
+BACKGROUND = (255, 255, 255)
+HEADER = (44, 62, 80)
+NAVIGATION = (236, 240, 241)
+BORDER = (189, 195, 199)
+TEXT = (52, 73, 94)
+
+
+def _font(size: int):
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 only has the fixed-size bitmap font
+        return ImageFont.load_default()
+
+
+def accent_palette(colors: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    return [tuple(int(c) for c in rng.integers(30, 226, 3)) for _ in range(max(colors, 1))]
+
+
+def make_ui(size: Tuple[int, int], elements: int = 24, colors: int = 6, noise: float = 0.0,
+            seed: int = 0) -> np.ndarray:
+    """Draw a UI screenshot and return it as a BGR array like ``cv2.imread``.
+    
+    ``elements`` is the number of content cards, ``colors`` the number of
+    accent colors they cycle through and ``noise`` the standard deviation of
+    Gaussian noise added to every channel (0 for a lossless capture).
+    """
+    width, height = size
+    unit = max(width / 1440, 0.5)
+    rng = np.random.default_rng(seed)
+    palette = accent_palette(colors, seed)
+    
+    image = Image.new('RGB', (width, height), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    font = _font(max(int(14 * unit), 8))
+    title_font = _font(max(int(22 * unit), 10))
+    
+    header_h = int(72 * unit)
+    footer_h = int(96 * unit)
+    nav_w = int(min(220 * unit, width * 0.25))
+    gap = max(int(24 * unit), 4)
+    
+    draw.rectangle([0, 0, width, header_h], fill=HEADER)
+    draw.text((gap, header_h // 3), "Synthetic Dashboard", fill=(255, 255, 255), font=title_font)
+    draw.rectangle([0, header_h, nav_w, height - footer_h], fill=NAVIGATION, outline=BORDER)
+    for i in range(min(12, (height - header_h - footer_h) // max(int(40 * unit), 1) - 1)):
+        draw.text((gap, header_h + gap + i * int(40 * unit)), f"Menu item {i + 1}", fill=TEXT, font=font)
+    
+    content_x, content_y = nav_w + gap, header_h + gap
+    content_w = width - content_x - gap
+    content_h = height - footer_h - gap - content_y
+    card_w = max(int(260 * unit), 24)
+    columns = max(1, min(elements, (content_w + gap) // (card_w + gap)))
+    card_w = (content_w - (columns - 1) * gap) // columns
+    rows = max(1, math.ceil(elements / columns))
+    card_h = max(min(int(180 * unit), (content_h - (rows - 1) * gap) // rows), 12)
+    
+    for i in range(elements):
+        x = content_x + (i % columns) * (card_w + gap)
+        y = content_y + (i // columns) * (card_h + gap)
+        if y + card_h > height - footer_h:
+            break
+        accent = palette[i % len(palette)]
+        draw.rectangle([x, y, x + card_w, y + card_h], fill=BACKGROUND, outline=BORDER)
+        icon = min(int(48 * unit), card_h // 3)
+        draw.rectangle([x + gap // 2, y + gap // 2, x + gap // 2 + icon, y + gap // 2 + icon], fill=accent)
+        if card_h >= 2 * icon + gap:
+            draw.text((x + gap, y + card_h // 2), f"Metric {i + 1}", fill=TEXT, font=font)
+            bar = int(rng.integers(card_w // 4, max(card_w - gap, card_w // 4 + 1)))
+            draw.rectangle([x + gap // 2, y + card_h - gap, x + gap // 2 + bar, y + card_h - gap // 2], fill=accent)
+    
+    draw.rectangle([0, height - footer_h, width, height], fill=HEADER)
+    draw.text((gap, height - footer_h + footer_h // 3), "Footer Content", fill=(255, 255, 255), font=font)
+    
+    pixels = np.asarray(image)[:, :, ::-1]
+    if noise > 0:
+        grain = rng.normal(0.0, noise, pixels.shape).astype(np.float32)
+        pixels = np.clip(pixels + grain, 0, 255).astype(np.uint8)
+    return np.ascontiguousarray(pixels)
+
+
+def make_flow(size: Tuple[int, int], screens: int = 4, seed: int = 0) -> List[np.ndarray]:
+    """Distinct screens of a synthetic user flow: the same chrome with more and more content."""
+    return [make_ui(size, elements=3 + 5 * i, colors=2 + i % 5, seed=seed + i) for i in range(screens)]
+
+
+def write_recording(path: str, screens: Sequence[np.ndarray], visits: Sequence[int], seconds: float = 3.0,
+                    fps: int = 30, transition: float = 0.3):
+    """Write a screen recording that shows ``screens[i]`` for ``seconds`` for each ``i`` in ``visits``.
+    
+    Consecutive visits cross-fade over ``transition`` seconds. The codec
+    follows the extension: MPEG-4 for ``.mp4``, Motion JPEG otherwise.
+    """
+    height, width = screens[0].shape[:2]
+    fourcc = cv2.VideoWriter_fourcc(*('mp4v' if path.endswith('.mp4') else 'MJPG'))
+    writer = cv2.VideoWriter(path, fourcc, fps, (width, height))
+    try:
+        previous = None
+        for visit in visits:
+            screen = screens[visit]
+            if previous is not None:
+                steps = round(transition * fps)
+                for step in range(1, steps + 1):
+                    writer.write(cv2.addWeighted(previous, 1 - step / (steps + 1), screen, step / (steps + 1), 0))
+            for _ in range(round(seconds * fps)):
+                writer.write(screen)
+            previous = screen
+    finally:
+        writer.release()
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .config import CACHE_DIR, CACHE_MAX_BYTES
+    from .element_list import json_default
+except ImportError:
+    from config import CACHE_DIR, CACHE_MAX_BYTES
+    from element_list import json_default
+
+# Eviction trims the cache down to this fraction of max_bytes so that it
+# does not run again on the very next store.
+EVICTION_LOW_WATER = 0.9
+# Each process only sees its own writes, so the directory is measured again
+# after every this fraction of max_bytes stored by this process; N processes
+# sharing a cache overshoot the limit by at most N times that.
+RESCAN_FRACTION = 0.05
+# A lock file older than this is assumed to belong to a crashed process.
+STALE_LOCK_SECONDS = 60
+
+
+class AnalysisCache:
+    """Persistent, content-addressed store for ``full_analysis`` results.
+    
+    Entries are JSON files named after the SHA-256 of the image bytes plus
+    the analyzer fingerprint, so a changed analyzer or parameter set never
+    sees stale results. Writes go through a temporary file and an atomic
+    rename, which makes the cache safe to share between processes. When the
+    directory grows past ``max_bytes`` the least recently used entries are
+    removed; a hit refreshes the entry's modification time.
+    """
+    
+    def __init__(self, directory=None, max_bytes: int = CACHE_MAX_BYTES):
+        self.directory = Path(directory) if directory else CACHE_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._approx_bytes = None
+        self._unscanned_bytes = 0
+    
+    @staticmethod
+    def make_key(content: bytes, fingerprint: str) -> str:
+        return f"{hashlib.sha256(content).hexdigest()}-{fingerprint}"
+    
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+    
+    def get(self, key: str) -> Optional[Dict]:
+        path = self._path(key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            # evicted by another process between the read and the touch
+            pass
+        self.hits += 1
+        return value
+    
+    def put(self, key: str, value: Dict):
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(value, f, default=json_default)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.stores += 1
+        
+        size = path.stat().st_size
+        if self._approx_bytes is None or self._unscanned_bytes + size > self.max_bytes * RESCAN_FRACTION:
+            # picks up what other processes stored since the last scan
+            self._approx_bytes = self._total_bytes()
+            self._unscanned_bytes = 0
+        else:
+            self._approx_bytes += size
+            self._unscanned_bytes += size
+        if self._approx_bytes > self.max_bytes:
+            self._evict(keep=path)
+    
+    def _entries(self) -> List[Tuple[float, int, Path]]:
+        entries = []
+        if not self.directory.exists():
+            return entries
+        for path in self.directory.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+    
+    def _total_bytes(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+    
+    def _evict(self, keep: Optional[Path] = None):
+        lock_path = self.directory / '.evict.lock'
+        try:
+            fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > STALE_LOCK_SECONDS:
+                    os.remove(lock_path)
+            except OSError:
+                pass
+            # another process is already evicting
+            return
+        try:
+            os.close(fd)
+            entries = sorted(self._entries())
+            total = sum(size for _, size, _ in entries)
+            target = self.max_bytes * EVICTION_LOW_WATER
+            for _, size, path in entries:
+                if total <= target:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+            self._approx_bytes = total
+            self._unscanned_bytes = 0
+        finally:
+            try:
+                os.remove(lock_path)
+            except OSError:
+                pass
+    
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._approx_bytes = 0
+        self._unscanned_bytes = 0
+    
+    def stats(self) -> Dict:
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes
+        }
@@ -0,0 +1,177 @@
+import cv2
+import numpy as np
+import threading
+from typing import Dict, List, Tuple
+
+try:
+    from .color_stats import ColorStats
+    from .profiling import NULL_PROFILER
+except ImportError:
+    from color_stats import ColorStats
+    from profiling import NULL_PROFILER
+
+
+class locked_cached_property:
+    """Compute-once property that is safe to read from several threads.
+    
+    ``functools.cached_property`` up to Python 3.11 serializes every
+    computation of a property across all instances of a class, which would
+    make concurrent stages wait on each other's Canny or histogram pass.
+    This version takes a lock per instance and attribute instead, so
+    different intermediates are computed in parallel and each exactly once.
+    Once stored, the value is read straight from the instance ``__dict__``.
+    """
+    
+    def __init__(self, func):
+        self.func = func
+        self.name = func.__name__
+        self.__doc__ = func.__doc__
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        values = obj.__dict__
+        if self.name not in values:
+            with obj._lock_for(self.name):
+                if self.name not in values:
+                    values[self.name] = self.func(obj)
+        return values[self.name]
+
+
+class AnalysisContext:
+    """Per-image store for the intermediates shared by the analysis stages.
+    
+    Every property is computed on first access and then reused, so a full
+    analysis converts to grayscale, runs Canny and traces contours only once
+    no matter how many stages ask for them.
+    
+    ``at_scale()`` returns a downscaled view of the same image with its own
+    cached intermediates, forming an image pyramid below the native context.
+    ``native_bounding_boxes`` and ``native_contour_areas`` map results from
+    any level back to native pixel coordinates.
+    
+    Intermediates are computed inside spans of ``profiler`` (shared by all
+    levels), so a profiled analysis shows which stage paid for them. All
+    properties and pyramid levels may be requested from several threads at
+    once; each is still computed only once.
+    """
+    
+    def __init__(self, image: np.ndarray, min_contour_area: float = 100,
+                 device_pixel_ratio: float = 1.0, root: 'AnalysisContext' = None, profiler=None):
+        self.image = image
+        self.min_contour_area = min_contour_area
+        self.device_pixel_ratio = device_pixel_ratio
+        self.root = root if root is not None else self
+        self.profiler = profiler if profiler is not None else NULL_PROFILER
+        self._levels: Dict[float, 'AnalysisContext'] = {}
+        self._lock = threading.Lock()
+        self._attribute_locks: Dict[str, threading.Lock] = {}
+    
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._lock:
+            return self._attribute_locks.setdefault(name, threading.Lock())
+    
+    def release(self):
+        """Drop the cached intermediates of this context and of its pyramid levels.
+        
+        A root context refers to itself, so without this its arrays live
+        until the garbage collector next runs.
+        """
+        for level in self._levels.values():
+            level.release()
+        self._levels.clear()
+        for name, attribute in vars(type(self)).items():
+            if isinstance(attribute, locked_cached_property):
+                self.__dict__.pop(name, None)
+    
+    @property
+    def height(self) -> int:
+        return self.image.shape[0]
+    
+    @property
+    def width(self) -> int:
+        return self.image.shape[1]
+    
+    @property
+    def scale(self) -> float:
+        """Size of this level relative to the native image along the longer side."""
+        return max(self.width, self.height) / max(self.root.width, self.root.height)
+    
+    def at_scale(self, scale: float) -> 'AnalysisContext':
+        """Context for the native image resized by ``scale``, built once per scale."""
+        root = self.root
+        if scale >= 1.0:
+            return root
+        key = round(scale, 4)
+        with root._lock_for(f"level-{key}"):
+            if key not in root._levels:
+                size = (max(1, round(root.width * scale)), max(1, round(root.height * scale)))
+                with root.profiler.span('resize'):
+                    image = cv2.resize(root.image, size, interpolation=cv2.INTER_AREA)
+                root._levels[key] = AnalysisContext(image, root.min_contour_area * scale * scale,
+                                                    root.device_pixel_ratio, root=root, profiler=root.profiler)
+        return root._levels[key]
+    
+    @locked_cached_property
+    def gray(self) -> np.ndarray:
+        with self.profiler.span('gray'):
+            return cv2.cvtColor(self.image, cv2.COLOR_BGR2GRAY)
+    
+    @locked_cached_property
+    def color_stats(self) -> ColorStats:
+        with self.profiler.span('color_stats'):
+            return ColorStats.from_bgr_image(self.image)
+    
+    @locked_cached_property
+    def edges(self) -> np.ndarray:
+        with self.profiler.span('edges'):
+            return cv2.Canny(self.gray, 50, 150)
+    
+    @locked_cached_property
+    def contours(self) -> Tuple:
+        edges = self.edges
+        with self.profiler.span('contours'):
+            contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        return contours
+    
+    @locked_cached_property
+    def _significant_contours(self) -> Tuple[List[Tuple[int, int, int, int]], List[float]]:
+        contours = self.contours
+        boxes = []
+        areas = []
+        with self.profiler.span('contour_filter'):
+            for contour in contours:
+                area = cv2.contourArea(contour)
+                if area > self.min_contour_area:
+                    boxes.append(cv2.boundingRect(contour))
+                    areas.append(area)
+        return boxes, areas
+    
+    @property
+    def bounding_boxes(self) -> List[Tuple[int, int, int, int]]:
+        """Bounding boxes of the contours larger than ``min_contour_area``."""
+        return self._significant_contours[0]
+    
+    @property
+    def contour_areas(self) -> List[float]:
+        """Areas matching ``bounding_boxes`` one-to-one."""
+        return self._significant_contours[1]
+    
+    @locked_cached_property
+    def native_bounding_boxes(self) -> List[Tuple[int, int, int, int]]:
+        """``bounding_boxes`` in the coordinates of the native image."""
+        if self.root is self:
+            return self.bounding_boxes
+        fx = self.root.width / self.width
+        fy = self.root.height / self.height
+        return [(round(x * fx), round(y * fy), round(w * fx), round(h * fy)) for x, y, w, h in self.bounding_boxes]
+    
+    @locked_cached_property
+    def native_contour_areas(self) -> List[float]:
+        if self.root is self:
+            return self.contour_areas
+        factor = (self.root.width / self.width) * (self.root.height / self.height)
+        return [area * factor for area in self.contour_areas]
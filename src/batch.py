@@ -0,0 +1,369 @@
+import glob
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+try:
+    from .analysis_cache import AnalysisCache
+    from .columnar_results import ColumnarResults, ColumnarWriter, is_columnar
+    from .config import ALLOWED_EXTENSIONS, MAX_IMAGE_PIXELS
+    from .duplicate_index import DuplicateIndex
+    from .element_list import json_default
+    from .perceptual_hash import dhash
+    from .suggestion_generator import SuggestionGenerator
+    from .ui_analyzer import UIAnalyzer
+except ImportError:
+    from analysis_cache import AnalysisCache
+    from columnar_results import ColumnarResults, ColumnarWriter, is_columnar
+    from config import ALLOWED_EXTENSIONS, MAX_IMAGE_PIXELS
+    from duplicate_index import DuplicateIndex
+    from element_list import json_default
+    from perceptual_hash import dhash
+    from suggestion_generator import SuggestionGenerator
+    from ui_analyzer import UIAnalyzer
+
+# Jobs queued per worker; keeps the pool busy without materializing every future.
+PENDING_PER_WORKER = 4
+
+_worker_analyzer = None
+_worker_generator = None
+
+
+def collect_inputs(sources: Iterable[str], manifest: Optional[str] = None) -> Iterator[str]:
+    """Expand directories, glob patterns, plain paths and a manifest file into image paths.
+    
+    A manifest lists one path per line; blank lines and ``#`` comments are
+    ignored and relative entries are resolved against the manifest's folder.
+    Each image is yielded once, in the order it is first seen.
+    """
+    seen = set()
+    
+    def candidates():
+        for source in sources:
+            path = Path(source)
+            if path.is_dir():
+                yield from sorted(str(p) for p in path.rglob('*') if p.suffix.lower() in ALLOWED_EXTENSIONS)
+            elif glob.has_magic(source):
+                yield from sorted(p for p in glob.glob(source, recursive=True)
+                                  if Path(p).suffix.lower() in ALLOWED_EXTENSIONS)
+            else:
+                yield source
+        if manifest:
+            base = Path(manifest).parent
+            with open(manifest, encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if line and not line.startswith('#'):
+                        yield str(base / line) if not os.path.isabs(line) else line
+    
+    for path in candidates():
+        if path not in seen:
+            seen.add(path)
+            yield path
+
+
+def iter_records(output_path) -> Iterator[Dict]:
+    """Records of a JSONL results file or columnar result set, in the order they were written."""
+    if is_columnar(output_path):
+        yield from ColumnarResults(output_path).iter_records()
+        return
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                # a run killed mid-write can leave a truncated last line
+                continue
+
+
+def load_completed(output_path) -> Set[str]:
+    """Image paths that already have a successful record in a results file or columnar result set."""
+    if not output_path or not os.path.exists(output_path):
+        return set()
+    if is_columnar(output_path):
+        results = ColumnarResults(output_path)
+        return set(results.column('image_path')[results.column('status') == 'ok'].tolist())
+    return {record['image_path'] for record in iter_records(output_path) if record.get('status') == 'ok'}
+
+
+def _init_worker(use_cache: bool = False, cache_dir: Optional[str] = None,
+                 max_side: Optional[int] = None, device_pixel_ratio=None,
+                 profile: bool = False, profile_memory: bool = False, threads: int = 1,
+                 memory_budget_mb: Optional[float] = None, max_pixels: Optional[int] = MAX_IMAGE_PIXELS):
+    global _worker_analyzer, _worker_generator
+    _worker_analyzer = UIAnalyzer(cache=AnalysisCache(cache_dir) if use_cache else None,
+                                  max_side=max_side, device_pixel_ratio=device_pixel_ratio,
+                                  profile=profile, profile_memory=profile_memory, threads=threads,
+                                  memory_budget_mb=memory_budget_mb, max_pixels=max_pixels)
+    _worker_generator = SuggestionGenerator()
+
+
+def _trim_partial_line(output_path: str):
+    # a run killed mid-write leaves a truncated last line; appending onto it
+    # would make the first new record unreadable too
+    with open(output_path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(position - 4096, 0)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline >= 0:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            f.truncate(position)
+
+
+def _error_record(image_path: str, error: BaseException, elapsed: float = 0.0) -> Dict:
+    return {
+        'image_path': image_path,
+        'status': 'error',
+        'elapsed': round(elapsed, 4),
+        'error': f"{type(error).__name__}: {error}"
+    }
+
+
+def analyze_one(image_path: str) -> Dict:
+    """Analyze a single image inside a worker and return its JSONL record."""
+    if _worker_analyzer is None:
+        _init_worker()
+    
+    cache = _worker_analyzer.cache
+    hits_before = cache.hits if cache else 0
+    start = time.perf_counter()
+    try:
+        analysis = _worker_analyzer.full_analysis(image_path)
+        suggestions = _worker_generator.generate_suggestions(analysis)
+        return {
+            'image_path': image_path,
+            'status': 'ok',
+            'elapsed': round(time.perf_counter() - start, 4),
+            'cached': bool(cache and cache.hits > hits_before),
+            'analysis': analysis,
+            'suggestions': suggestions,
+            'wireframe_suggestions': _worker_generator.generate_wireframe_suggestions(analysis)
+        }
+    except Exception as e:
+        return _error_record(image_path, e, time.perf_counter() - start)
+
+
+def hash_one(image_path: str) -> Tuple[str, Optional[int]]:
+    """Difference hash of a single image inside a worker, or None when it cannot be read."""
+    if _worker_analyzer is None:
+        _init_worker()
+    try:
+        return image_path, dhash(_worker_analyzer.load_image(image_path))
+    except Exception:
+        # analyze_one reports the error when the image comes up for analysis
+        return image_path, None
+
+
+def _hash_error(image_path: str, error: BaseException) -> Tuple[str, None]:
+    return image_path, None
+
+
+def _iter_results(paths: Iterator[str], workers: int, init_args: Tuple, task=analyze_one,
+                  on_error=_error_record) -> Iterator:
+    """``task(path)`` for every path, in completion order, over a pool of ``workers`` processes.
+    
+    A job whose worker dies (killed for memory, or crashed in a native
+    decoder) yields ``on_error(path, error)`` instead of ending the run;
+    so does every other job the broken pool took down with it. The pool
+    is then replaced and the remaining paths carry on.
+    """
+    if workers <= 1:
+        _init_worker(*init_args)
+        for path in paths:
+            yield task(path)
+        return
+    
+    def new_pool():
+        return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=init_args)
+    
+    pool = new_pool()
+    pending = {}
+    # paths taken from the input that could not be submitted to a broken pool
+    retry = deque()
+    try:
+        while True:
+            broken = False
+            while len(pending) < workers * PENDING_PER_WORKER:
+                path = retry.popleft() if retry else next(paths, None)
+                if path is None:
+                    break
+                try:
+                    pending[pool.submit(task, path)] = path
+                except BrokenProcessPool:
+                    retry.appendleft(path)
+                    broken = True
+                    break
+            
+            if pending and not broken:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        broken = broken or isinstance(e, BrokenProcessPool)
+                        result = on_error(path, e)
+                    yield result
+            
+            if broken:
+                # every job still in flight failed with the pool
+                for future, path in pending.items():
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = on_error(path, e)
+                    yield result
+                pending.clear()
+                pool.shutdown()
+                pool = new_pool()
+            elif not pending:
+                return
+    finally:
+        pool.shutdown()
+
+
+def _group_duplicates(paths: Iterable[str], workers: int, init_args: Tuple,
+                      max_distance: int) -> Tuple[List[str], Dict[str, List[Tuple[str, int]]]]:
+    # first come, first analyzed: an image joins the nearest earlier image
+    # that has no representative of its own. Workers finish in any order, so
+    # the hashes are walked in input order to keep the grouping stable.
+    paths = list(paths)
+    hashes = dict(_iter_results(iter(paths), workers, init_args, task=hash_one, on_error=_hash_error))
+    index = DuplicateIndex(max_distance)
+    representatives, duplicates = [], {}
+    for path in paths:
+        key = hashes[path]
+        match = index.find(key) if key is not None else None
+        if match is None:
+            representatives.append(path)
+            if key is not None:
+                index.add(key, path)
+        else:
+            distance, representative = match
+            duplicates.setdefault(representative, []).append((path, distance))
+    return representatives, duplicates
+
+
+def run_batch(sources: List[str], output_path: Optional[str] = None, workers: Optional[int] = None,
+              manifest: Optional[str] = None, resume: bool = False, use_cache: bool = False,
+              cache_dir: Optional[str] = None, max_side: Optional[int] = None,
+              device_pixel_ratio=None, profile: bool = False, profile_memory: bool = False,
+              threads: int = 1, memory_budget_mb: Optional[float] = None,
+              max_pixels: Optional[int] = MAX_IMAGE_PIXELS, dedupe: Optional[int] = None,
+              output_format: str = 'jsonl', log=sys.stderr) -> Dict:
+    """Analyze many images and stream one JSON line per image as results complete.
+    
+    Records go to ``output_path`` (appended to when resuming) or to stdout.
+    With ``output_format='columnar'``, ``output_path`` is a directory that
+    ``ColumnarWriter`` fills with typed column chunks instead, for result
+    sets too large to parse as JSON; ``iter_records()`` reads either.
+    With ``resume`` the images already recorded as successful in
+    ``output_path`` are skipped. With ``use_cache`` every worker consults
+    the shared on-disk analysis cache before decoding an image. ``max_side``,
+    ``device_pixel_ratio``, ``profile``, ``profile_memory``, ``threads``,
+    ``memory_budget_mb`` and ``max_pixels`` are passed to every worker's
+    ``UIAnalyzer``; with profiling on, each analysis record carries its
+    ``timings`` block.
+    With ``dedupe`` set to a number of bits, every image is hashed first and
+    only the first of each group of near-duplicates (difference hashes at
+    most ``dedupe`` bits apart) is analyzed; the others get a copy of its
+    record marked ``duplicate_of`` with their ``hash_distance``. This reads
+    the whole input list before the first record is written.
+    If a worker process dies, the images it and its pool had in flight get
+    error records and the run continues on a new pool.
+    Returns the throughput summary, which is also written to ``log``.
+    """
+    workers = workers or os.cpu_count() or 1
+    completed = load_completed(output_path) if resume else set()
+    skipped = 0
+    
+    def pending_paths():
+        nonlocal skipped
+        for path in collect_inputs(sources, manifest):
+            if path in completed:
+                skipped += 1
+            else:
+                yield path
+    
+    init_args = (use_cache, cache_dir, max_side, device_pixel_ratio, profile, profile_memory, threads,
+                 memory_budget_mb, max_pixels)
+    if output_format == 'columnar':
+        if not output_path:
+            raise ValueError("columnar output needs an output path")
+        out = ColumnarWriter(output_path, append=resume)
+    else:
+        if resume and output_path and os.path.exists(output_path):
+            _trim_partial_line(output_path)
+        out = open(output_path, 'a' if resume else 'w', encoding='utf-8') if output_path else sys.stdout
+    succeeded = failed = cache_hits = duplicates_found = 0
+    start = time.perf_counter()
+    
+    def write(record):
+        nonlocal succeeded, failed, cache_hits
+        if isinstance(out, ColumnarWriter):
+            out.write(record)
+        else:
+            out.write(json.dumps(record, default=json_default) + "\n")
+            out.flush()
+        if record['status'] == 'ok':
+            succeeded += 1
+            cache_hits += record['cached']
+        else:
+            failed += 1
+            print(f"Error analyzing {record['image_path']}: {record['error']}", file=log)
+    
+    try:
+        if dedupe is None:
+            for record in _iter_results(pending_paths(), workers, init_args):
+                write(record)
+        else:
+            representatives, duplicates = _group_duplicates(pending_paths(), workers, init_args, dedupe)
+            orphans = []
+            for record in _iter_results(iter(representatives), workers, init_args):
+                write(record)
+                group = duplicates.get(record['image_path'], [])
+                if record['status'] != 'ok':
+                    # nothing to share; each duplicate gets its own attempt
+                    orphans.extend(path for path, _ in group)
+                    continue
+                for path, distance in group:
+                    duplicates_found += 1
+                    write(dict(record, image_path=path, elapsed=0.0, cached=False,
+                               duplicate_of=record['image_path'], hash_distance=distance,
+                               analysis=dict(record['analysis'], image_path=path)))
+            if orphans:
+                for record in _iter_results(iter(orphans), workers, init_args):
+                    write(record)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    
+    elapsed = time.perf_counter() - start
+    processed = succeeded + failed
+    summary = {
+        'processed': processed,
+        'succeeded': succeeded,
+        'failed': failed,
+        'skipped': skipped,
+        'cache_hits': cache_hits,
+        'duplicates': duplicates_found,
+        'workers': workers,
+        'elapsed_seconds': round(elapsed, 2),
+        'images_per_second': round(processed / elapsed, 2) if elapsed > 0 else 0.0
+    }
+    print(f"Batch complete: {processed} analyzed ({succeeded} ok, {failed} failed, {skipped} skipped, "
+          f"{cache_hits} from cache, {duplicates_found} duplicates) in {summary['elapsed_seconds']}s, {summary['images_per_second']} images/s "
+          f"with {workers} workers", file=log)
+    return summary
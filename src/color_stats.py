@@ -0,0 +1,103 @@
+import cv2
+import numpy as np
+from typing import Iterable, Tuple
+
+# Above this many pixels a dense 2**24-bin bincount beats sorting the keys.
+DENSE_HISTOGRAM_MIN_PIXELS = 1 << 21
+PACKED_RANGE = 1 << 24
+
+
+def pack_rgb(pixels: np.ndarray) -> np.ndarray:
+    """Pack an (n, 3) RGB array into uint32 keys of the form 0xRRGGBB."""
+    pixels = pixels.astype(np.uint32, copy=False)
+    return (pixels[:, 0] << 16) | (pixels[:, 1] << 8) | pixels[:, 2]
+
+
+def unpack_rgb(keys: np.ndarray) -> np.ndarray:
+    keys = np.asarray(keys, dtype=np.uint32)
+    return np.stack([(keys >> 16) & 0xFF, (keys >> 8) & 0xFF, keys & 0xFF], axis=1).astype(np.uint8)
+
+
+def pack_bgr_image(image: np.ndarray) -> np.ndarray:
+    """Pack a BGR image into 0xRRGGBB keys without building an RGB copy.
+    
+    Converting to BGRA lays every pixel out as four bytes, which read as a
+    little-endian uint32 is ``A << 24 | R << 16 | G << 8 | B``; masking off
+    alpha leaves the packed RGB key.
+    """
+    bgra = cv2.cvtColor(image, cv2.COLOR_BGR2BGRA)
+    keys = bgra.reshape(-1).view('<u4')
+    keys &= 0x00FFFFFF
+    return keys
+
+
+def count_keys(keys: np.ndarray, dense: bool = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the sorted distinct keys and their counts in a single pass.
+    
+    ``dense`` picks the 2**24-bin histogram (a fixed 128 MB of counts) or the
+    sort, whose memory follows the number of keys; by default the faster
+    one for ``len(keys)`` is used.
+    """
+    if dense is None:
+        dense = len(keys) >= DENSE_HISTOGRAM_MIN_PIXELS
+    if dense:
+        histogram = np.bincount(keys, minlength=PACKED_RANGE)
+        present = np.flatnonzero(histogram)
+        return present.astype(np.uint32), histogram[present]
+    distinct, counts = np.unique(keys, return_counts=True)
+    return distinct.astype(np.uint32, copy=False), counts
+
+
+class ColorStats:
+    """Exact color histogram of an image keyed by packed 24-bit RGB values."""
+    
+    def __init__(self, keys: np.ndarray, counts: np.ndarray):
+        self.keys = keys
+        self.counts = counts
+    
+    @classmethod
+    def from_bgr_image(cls, image: np.ndarray, dense: bool = None) -> 'ColorStats':
+        return cls(*count_keys(pack_bgr_image(image), dense))
+    
+    @classmethod
+    def from_pixels(cls, pixels: np.ndarray) -> 'ColorStats':
+        """Build from an (n, 3) RGB pixel array."""
+        return cls(*count_keys(pack_rgb(pixels)))
+    
+    @classmethod
+    def merge(cls, stats: Iterable['ColorStats'], subtract: Iterable['ColorStats'] = ()) -> 'ColorStats':
+        """Histogram of the union of the images behind ``stats`` (e.g. the bands of a page).
+        
+        The pixels counted by ``subtract`` (regions of those images) are
+        taken out again, and colors left with no pixels are dropped.
+        """
+        stats, subtract = list(stats), list(subtract)
+        keys = (np.unique(np.concatenate([s.keys for s in stats + subtract])) if stats or subtract
+                else np.empty(0, dtype=np.uint32))
+        totals = np.zeros(len(keys), dtype=np.int64)
+        # keys of each histogram are already distinct, so plain indexed adds are exact
+        for s in stats:
+            totals[np.searchsorted(keys, s.keys)] += s.counts
+        if subtract:
+            for s in subtract:
+                totals[np.searchsorted(keys, s.keys)] -= s.counts
+            present = totals > 0
+            keys, totals = keys[present], totals[present]
+        return cls(keys.astype(np.uint32, copy=False), totals)
+    
+    @property
+    def unique_colors(self) -> int:
+        return len(self.keys)
+    
+    @property
+    def total_pixels(self) -> int:
+        return int(self.counts.sum())
+    
+    @property
+    def color_diversity(self) -> float:
+        return min(self.unique_colors / 100.0, 1.0)
+    
+    @property
+    def colors(self) -> np.ndarray:
+        """Distinct colors as an (n, 3) uint8 RGB array, ordered like ``counts``."""
+        return unpack_rgb(self.keys)
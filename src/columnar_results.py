@@ -0,0 +1,265 @@
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .element_list import ELEMENT_DTYPE, ElementList, json_default
+except ImportError:
+    from element_list import ELEMENT_DTYPE, ElementList, json_default
+
+# Records buffered before a chunk is written; a run killed mid-chunk loses
+# at most this many records, which --resume then analyzes again.
+CHUNK_ROWS = 1024
+FORMAT_NAME = "zeno-columnar"
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+# Record fields stored as columns: (name, path into the record, dtype).
+# Missing values are NaN, -1 or '' (error records have no analysis); flags
+# are int8 so that -1 can mark them missing too.
+RECORD_COLUMNS = (
+    ('image_path', ('image_path',), 'U'),
+    ('status', ('status',), 'U'),
+    ('error', ('error',), 'U'),
+    ('elapsed', ('elapsed',), 'f8'),
+    ('cached', ('cached',), 'i1'),
+    ('duplicate_of', ('duplicate_of',), 'U'),
+    ('hash_distance', ('hash_distance',), 'i8'),
+    ('overall_score', ('analysis', 'overall_score'), 'f8'),
+    ('total_elements', ('analysis', 'elements', 'total_elements'), 'i8'),
+    ('layout_type', ('analysis', 'layout', 'layout_type'), 'U'),
+    ('grid_score', ('analysis', 'layout', 'grid_score'), 'f8'),
+    ('alignment_score', ('analysis', 'layout', 'alignment_score'), 'f8'),
+    ('symmetry_score', ('analysis', 'layout', 'symmetry_score'), 'f8'),
+    ('unique_colors', ('analysis', 'colors', 'unique_colors'), 'i8'),
+    ('contrast_score', ('analysis', 'colors', 'contrast_score'), 'f8'),
+    ('color_diversity', ('analysis', 'colors', 'color_diversity'), 'f8'),
+    ('spacing_consistency', ('analysis', 'spacing', 'spacing_consistency'), 'f8'),
+    ('nearest_gap_consistency', ('analysis', 'spacing', 'nearest_gap_consistency'), 'f8'),
+    ('median_nearest_gap', ('analysis', 'spacing', 'median_nearest_gap'), 'f8'),
+    ('whitespace_ratio', ('analysis', 'spacing', 'whitespace_ratio'), 'f8'),
+    ('element_density', ('analysis', 'spacing', 'element_density'), 'f8')
+)
+MISSING = {'U': '', 'f8': np.nan, 'i8': -1, 'i1': -1}
+
+
+def is_columnar(path) -> bool:
+    """Whether ``path`` is a columnar result set rather than a JSONL file."""
+    return os.path.isfile(os.path.join(path, META_FILE))
+
+
+def _is_missing(value, dtype: str) -> bool:
+    return value != value if dtype == 'f8' else value == MISSING[dtype]
+
+
+def _lookup(record: Dict, path: Tuple[str, ...]):
+    value = record
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def _pop(record: Dict, path: Tuple[str, ...]):
+    # removes the leaf from the (already copied) dicts along the path
+    *parents, leaf = path
+    for key in parents:
+        record = record.get(key)
+        if not isinstance(record, dict):
+            return
+    record.pop(leaf, None)
+
+
+def _ragged(parts: List[np.ndarray], dtype, shape=()) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(parts) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(part) for part in parts])
+    values = np.concatenate(parts) if parts else np.zeros((0,) + shape, dtype=dtype)
+    return values.astype(dtype, copy=False).reshape((-1,) + shape), offsets
+
+
+class ColumnarWriter:
+    """Stream batch records into a directory of column chunks that ``ColumnarResults`` memory-maps.
+    
+    Every ``chunk_rows`` records become one ``chunk-NNNNNN`` folder of
+    ``.npy`` files, written under a temporary name and renamed into place,
+    so readers and resumed runs only ever see complete chunks. Per record
+    it stores the ``RECORD_COLUMNS`` as typed columns, the elements as one
+    ``ELEMENT_DTYPE`` array, the palette as ``uint8`` colors with their
+    coverage, and everything else (suggestions, wireframe, timings, ...) as
+    compact JSON in a byte column, so records read back whole.
+    """
+    
+    def __init__(self, directory, append: bool = False, chunk_rows: int = CHUNK_ROWS):
+        self.directory = Path(directory)
+        self.chunk_rows = chunk_rows
+        if self.directory.exists() and not append:
+            if not is_columnar(self.directory) and any(self.directory.iterdir()):
+                raise ValueError(f"{directory} exists and is not a columnar result set")
+            shutil.rmtree(self.directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        meta = self.directory / META_FILE
+        if not meta.exists():
+            meta.write_text(json.dumps({'format': FORMAT_NAME, 'version': FORMAT_VERSION}), encoding='utf-8')
+        self._chunks = len(_chunk_dirs(self.directory))
+        self._rows = []
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def write(self, record: Dict):
+        self._rows.append(record)
+        if len(self._rows) >= self.chunk_rows:
+            self.flush()
+    
+    def flush(self):
+        if not self._rows:
+            return
+        rows, self._rows = self._rows, []
+        columns = {}
+        for name, path, dtype in RECORD_COLUMNS:
+            values = [_lookup(record, path) for record in rows]
+            values = [MISSING[dtype] if value is None else value for value in values]
+            columns[name] = np.array(values, dtype=str if dtype == 'U' else dtype)
+        
+        elements, colors, coverage, extra = [], [], [], []
+        for record in rows:
+            analysis = record.get('analysis') or {}
+            found = _lookup(analysis, ('elements', 'elements'))
+            if found is not None and not isinstance(found, ElementList):
+                found = ElementList.from_dicts(found)
+            elements.append(found.data if found is not None else np.zeros(0, dtype=ELEMENT_DTYPE))
+            palette = _lookup(analysis, ('colors', 'dominant_colors')) or []
+            colors.append(np.asarray(palette, dtype=np.uint8).reshape(-1, 3))
+            shares = _lookup(analysis, ('colors', 'dominant_color_coverage')) or []
+            coverage.append(np.asarray(shares, dtype=np.float64))
+            
+            rest = dict(record)
+            if 'analysis' in rest:
+                rest['analysis'] = {key: dict(value) if isinstance(value, dict) else value
+                                    for key, value in analysis.items()}
+                for path in (('analysis', 'elements', 'elements'), ('analysis', 'colors', 'dominant_colors'),
+                             ('analysis', 'colors', 'dominant_color_coverage')):
+                    _pop(rest, path)
+            for _, path, _ in RECORD_COLUMNS:
+                _pop(rest, path)
+            extra.append(np.frombuffer(json.dumps(rest, default=json_default).encode('utf-8'), dtype=np.uint8))
+        
+        columns['elements'], columns['elements.offsets'] = _ragged(elements, ELEMENT_DTYPE)
+        columns['dominant_colors'], columns['palette.offsets'] = _ragged(colors, np.uint8, (3,))
+        columns['dominant_color_coverage'], _ = _ragged(coverage, np.float64)
+        columns['extra'], columns['extra.offsets'] = _ragged(extra, np.uint8)
+        
+        final = self.directory / f"chunk-{self._chunks:06d}"
+        staging = self.directory / f"{final.name}.tmp"
+        if staging.exists():
+            shutil.rmtree(staging)
+        staging.mkdir()
+        for name, values in columns.items():
+            np.save(staging / f"{name}.npy", values)
+        os.replace(staging, final)
+        self._chunks += 1
+    
+    def close(self):
+        self.flush()
+
+
+def _chunk_dirs(directory: Path) -> List[Path]:
+    return sorted(path for path in directory.glob('chunk-*') if path.is_dir() and not path.suffix)
+
+
+class ColumnarResults:
+    """Memory-mapped reader over a result set written by ``ColumnarWriter``.
+    
+    ``column(name)`` returns one of ``RECORD_COLUMNS`` for every record, so
+    filters are NumPy expressions over typed arrays:
+    ``rows = np.flatnonzero(results.column('overall_score') < 0.5)``. Only
+    the columns asked for are read; ``elements(row)``, ``palette(row)``
+    and ``record(row)`` touch a single record's slices of the mapped files.
+    """
+    
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        if not is_columnar(self.directory):
+            raise ValueError(f"{directory} is not a columnar result set")
+        meta = json.loads((self.directory / META_FILE).read_text(encoding='utf-8'))
+        if meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"unsupported columnar format version {meta.get('version')}")
+        self._chunks = _chunk_dirs(self.directory)
+        self._maps = [{} for _ in self._chunks]
+        counts = [len(self._load(i, 'status')) for i in range(len(self._chunks))]
+        self._starts = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        self._columns = {}
+    
+    def __len__(self) -> int:
+        return int(self._starts[-1])
+    
+    def _load(self, chunk: int, name: str) -> np.ndarray:
+        maps = self._maps[chunk]
+        if name not in maps:
+            maps[name] = np.load(self._chunks[chunk] / f"{name}.npy", mmap_mode='r')
+        return maps[name]
+    
+    def column(self, name: str) -> np.ndarray:
+        """One of ``RECORD_COLUMNS`` across all chunks."""
+        if name not in self._columns:
+            if name not in {column for column, _, _ in RECORD_COLUMNS}:
+                raise KeyError(name)
+            parts = [self._load(i, name) for i in range(len(self._chunks))]
+            self._columns[name] = np.concatenate(parts) if parts else np.zeros(0)
+        return self._columns[name]
+    
+    def _locate(self, row: int) -> Tuple[int, int]:
+        if not 0 <= row < len(self):
+            raise IndexError(row)
+        chunk = int(np.searchsorted(self._starts, row, side='right')) - 1
+        return chunk, row - int(self._starts[chunk])
+    
+    def _slice(self, chunk: int, local: int, values: str, offsets: str) -> np.ndarray:
+        bounds = self._load(chunk, offsets)
+        return self._load(chunk, values)[bounds[local]:bounds[local + 1]]
+    
+    def elements(self, row: int) -> ElementList:
+        """Elements of a record, backed by the mapped file."""
+        return ElementList(self._slice(*self._locate(row), 'elements', 'elements.offsets'))
+    
+    def palette(self, row: int) -> Tuple[np.ndarray, np.ndarray]:
+        """``(k, 3)`` dominant RGB colors of a record and their coverage in percent."""
+        chunk, local = self._locate(row)
+        return (self._slice(chunk, local, 'dominant_colors', 'palette.offsets'),
+                self._slice(chunk, local, 'dominant_color_coverage', 'palette.offsets'))
+    
+    def record(self, row: int) -> Dict:
+        """The record as ``batch.analyze_one`` returned it, with elements as an ``ElementList``."""
+        chunk, local = self._locate(row)
+        record = json.loads(self._slice(chunk, local, 'extra', 'extra.offsets').tobytes().decode('utf-8'))
+        for name, path, dtype in RECORD_COLUMNS:
+            if path[0] == 'analysis' and 'analysis' not in record:
+                continue
+            value = self._load(chunk, name)[local].item()
+            if _is_missing(value, dtype):
+                continue
+            if dtype == 'i1':
+                value = bool(value)
+            target = record
+            for key in path[:-1]:
+                target = target.setdefault(key, {})
+            target[path[-1]] = value
+        analysis = record.get('analysis')
+        if analysis is not None:
+            analysis.setdefault('elements', {})['elements'] = self.elements(row)
+            colors, coverage = self.palette(row)
+            analysis.setdefault('colors', {})['dominant_colors'] = colors.tolist()
+            analysis['colors']['dominant_color_coverage'] = coverage.tolist()
+        return record
+    
+    def iter_records(self, rows: Optional[Iterable[int]] = None) -> Iterator[Dict]:
+        """Records of ``rows`` (all by default), in order."""
+        for row in range(len(self)) if rows is None else rows:
+            yield self.record(int(row))
@@ -7,12 +7,26 @@ SCREENSHOTS_DIR = DATA_DIR / "screenshots"
 MODELS_DIR = BASE_DIR / "models"
 OUTPUT_DIR = BASE_DIR / "output"
 
-SCREENSHOTS_DIR.mkdir(parents=True, exist_ok=True)
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-MODELS_DIR.mkdir(parents=True, exist_ok=True)
-
 ALLOWED_EXTENSIONS = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp'}
+# Screen recordings, analyzed as user flows along with animated GIF and WebP.
+VIDEO_EXTENSIONS = {'.mp4', '.mov', '.m4v', '.webm', '.avi', '.mkv'}
 MAX_IMAGE_SIZE = 10 * 1024 * 1024
+# Decoded pixels allowed per image; larger images are decoded at reduced
+# size (a 50 MP BGR image is 150 MB in memory).
+MAX_IMAGE_PIXELS = 50_000_000
+
+CACHE_DIR = OUTPUT_DIR / "cache"
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Largest difference-hash distance (of 256 bits) at which two screenshots
+# share one analysis. A cursor, a badge, a new timestamp or re-encoding
+# moved a synthetic 1080p screen by at most 4 bits; different screens from
+# the same template were 22 or more apart.
+DUPLICATE_DISTANCE = 8
+# In-memory results (analyses and PDF reports) shared by the web app's
+# sessions, keyed by upload content.
+RESULT_CACHE_MAX_ENTRIES = 256
+RESULT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+RESULT_CACHE_TTL = 60 * 60
 
 ANALYSIS_CATEGORIES = [
     "layout",
@@ -30,3 +44,12 @@ SUGGESTION_TYPES = [
     "modernization"
 ]
 
+
+def ensure_dir(path: Path) -> Path:
+    """Create ``path`` if needed and return it.
+    
+    Directories are created when first written to rather than at import
+    time, so importing the package stays free of side effects.
+    """
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,44 @@
+from typing import Any, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    from .config import DUPLICATE_DISTANCE
+    from .perceptual_hash import BKTree, dhash
+except ImportError:
+    from config import DUPLICATE_DISTANCE
+    from perceptual_hash import BKTree, dhash
+
+
+class DuplicateIndex:
+    """Analyses of screenshots, found again for any near-duplicate of them.
+    
+    Images are keyed by their difference hash in a ``BKTree``, so a lookup
+    within ``max_distance`` bits visits a small part of the index however
+    large it grows. Content-hash caching only finds byte-identical files;
+    this also finds the same screen with another cursor position,
+    notification badge, timestamp or encoding. Values are whatever the
+    caller stores: an analysis, or the path of the image that has one.
+    Images can be given as BGR arrays or as hashes from ``dhash``.
+    """
+    
+    def __init__(self, max_distance: int = DUPLICATE_DISTANCE):
+        self.max_distance = max_distance
+        self._tree = BKTree()
+    
+    def __len__(self) -> int:
+        return len(self._tree)
+    
+    def add(self, image: Union[np.ndarray, int], value: Any) -> int:
+        """Store ``value`` for ``image`` and return its hash."""
+        key = _key(image)
+        self._tree.add(key, value)
+        return key
+    
+    def find(self, image: Union[np.ndarray, int]) -> Optional[Tuple[int, Any]]:
+        """``(distance, value)`` of the nearest stored image within ``max_distance`` bits, or None."""
+        return self._tree.nearest(_key(image), self.max_distance)
+
+
+def _key(image) -> int:
+    return image if isinstance(image, int) else dhash(image)
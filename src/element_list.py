@@ -0,0 +1,147 @@
+import numpy as np
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple, Union
+
+# One record per detected element: bounding box, contour area and center,
+# 32 bytes against roughly 520 for the equivalent dict of tuples.
+ELEMENT_DTYPE = np.dtype([
+    ('x', np.int32), ('y', np.int32), ('w', np.int32), ('h', np.int32),
+    ('area', np.float64),
+    ('cx', np.int32), ('cy', np.int32)
+])
+
+
+def json_default(obj):
+    """``default`` for ``json.dump`` of analyses: element lists in their dict form, NumPy values as numbers."""
+    # ElementList and NumPy scalars and arrays all expose tolist()/item()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    return str(obj)
+
+
+class Element:
+    """Read-only view of one row of an ``ElementList``, indexable like the legacy element dict."""
+    
+    __slots__ = ('_row',)
+    
+    KEYS = ('bbox', 'area', 'center')
+    
+    def __init__(self, row: np.void):
+        self._row = row
+    
+    @property
+    def bbox(self) -> Tuple[int, int, int, int]:
+        row = self._row
+        return int(row['x']), int(row['y']), int(row['w']), int(row['h'])
+    
+    @property
+    def area(self) -> float:
+        return float(self._row['area'])
+    
+    @property
+    def center(self) -> Tuple[int, int]:
+        return int(self._row['cx']), int(self._row['cy'])
+    
+    def __getitem__(self, key: str):
+        if key not in self.KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+    
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in self.KEYS else default
+    
+    def keys(self) -> Tuple[str, ...]:
+        return self.KEYS
+    
+    def to_dict(self) -> Dict:
+        return {'bbox': self.bbox, 'area': self.area, 'center': self.center}
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Element):
+            other = other.to_dict()
+        return self.to_dict() == other
+    
+    def __repr__(self) -> str:
+        return f"Element({self.to_dict()})"
+
+
+class ElementList:
+    """Detected elements as one structured array (``ELEMENT_DTYPE``) shared by every analysis stage.
+    
+    Stages read whole columns (``boxes``, ``areas``, ``centers``) instead
+    of walking per-element dicts. Iterating or indexing yields ``Element``
+    views that answer ``e['bbox']``, ``e['area']`` and ``e['center']`` like
+    the dicts ``detect_elements`` used to return; ``to_dicts()`` (and
+    ``tolist()``, which ``json_default`` calls) builds those dicts only
+    when a caller asks for them.
+    """
+    
+    __slots__ = ('data',)
+    
+    def __init__(self, data: np.ndarray = None):
+        self.data = np.zeros(0, dtype=ELEMENT_DTYPE) if data is None else data
+    
+    @classmethod
+    def from_columns(cls, boxes, areas: Sequence[float]) -> 'ElementList':
+        """Elements from ``(n, 4)`` ``(x, y, w, h)`` boxes and their contour areas."""
+        boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+        data = np.empty(len(boxes), dtype=ELEMENT_DTYPE)
+        for i, name in enumerate('xywh'):
+            data[name] = boxes[:, i]
+        data['area'] = np.asarray(areas, dtype=np.float64).reshape(-1)
+        data['cx'] = boxes[:, 0] + boxes[:, 2] // 2
+        data['cy'] = boxes[:, 1] + boxes[:, 3] // 2
+        return cls(data)
+    
+    @classmethod
+    def from_dicts(cls, elements: Iterable[Dict]) -> 'ElementList':
+        """Elements from legacy dicts, e.g. read back from JSON; centers are recomputed from the boxes."""
+        elements = list(elements)
+        return cls.from_columns([e['bbox'] for e in elements], [e['area'] for e in elements])
+    
+    @property
+    def boxes(self) -> np.ndarray:
+        """``(n, 4)`` int64 array of ``(x, y, w, h)``."""
+        data = self.data
+        return np.stack([data['x'], data['y'], data['w'], data['h']], axis=1).astype(np.int64)
+    
+    @property
+    def areas(self) -> np.ndarray:
+        return self.data['area']
+    
+    @property
+    def centers(self) -> np.ndarray:
+        """``(n, 2)`` int64 array of ``(cx, cy)``."""
+        return np.stack([self.data['cx'], self.data['cy']], axis=1).astype(np.int64)
+    
+    def __len__(self) -> int:
+        return len(self.data)
+    
+    def __getitem__(self, index: Union[int, slice, np.ndarray]) -> Union[Element, 'ElementList']:
+        if isinstance(index, (int, np.integer)):
+            return Element(self.data[index])
+        return ElementList(self.data[index])
+    
+    def __iter__(self) -> Iterator[Element]:
+        for row in self.data:
+            yield Element(row)
+    
+    def to_dicts(self) -> List[Dict]:
+        """The legacy list of ``{'bbox', 'area', 'center'}`` dicts."""
+        data = self.data
+        return [
+            {'bbox': (x, y, w, h), 'area': area, 'center': (cx, cy)}
+            for x, y, w, h, area, cx, cy in zip(*(data[name].tolist() for name in ELEMENT_DTYPE.names))
+        ]
+    
+    def tolist(self) -> List[Dict]:
+        return self.to_dicts()
+    
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ElementList):
+            return np.array_equal(self.data, other.data)
+        if isinstance(other, (list, tuple)):
+            return self.to_dicts() == list(other)
+        return NotImplemented
+    
+    def __repr__(self) -> str:
+        return f"ElementList({len(self)} elements)"
@@ -0,0 +1,109 @@
+import io
+import math
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+
+import cv2
+import numpy as np
+from PIL import Image
+
+try:
+    from .config import VIDEO_EXTENSIONS
+    from .image_io import is_path, read_image_bytes
+except ImportError:
+    from config import VIDEO_EXTENSIONS
+    from image_io import is_path, read_image_bytes
+
+# Frames per second examined by default. Screens of a recorded flow stay up
+# far longer than this, and converting every frame of a long video would
+# cost more than analyzing its few distinct screens.
+SAMPLE_FPS = 4.0
+# Duration of GIF and WebP frames that do not give one, as browsers assume.
+DEFAULT_FRAME_MS = 100
+
+
+class Frame(NamedTuple):
+    index: int
+    timestamp: float
+    image: np.ndarray
+
+
+class FrameSource:
+    """Frames of a screen recording, an animated GIF or WebP, or a still image, decoded one at a time.
+    
+    Iterating yields ``Frame(index, timestamp, image)`` with BGR images for
+    at most ``sample_fps`` frames per second of the source (every frame
+    when it is None). ``index`` counts every frame of the source, and
+    ``timestamp`` is in seconds. Only the current frame is held in memory.
+    After iteration ``duration`` is the length of the source and
+    ``frames_read`` the number of frames decoded.
+    
+    Videos are read from a path with OpenCV's FFmpeg backend; frames that
+    are not sampled are only grabbed, never converted to BGR. GIF and WebP
+    come from a path, bytes or a file-like object and are decoded with
+    Pillow, since OpenCV reads only their first frame, if any.
+    """
+    
+    def __init__(self, source, sample_fps: Optional[float] = SAMPLE_FPS):
+        self.source = source
+        self.sample_fps = sample_fps
+        self.duration = 0.0
+        self.frames_read = 0
+    
+    @property
+    def is_video(self) -> bool:
+        return is_path(self.source) and Path(self.source).suffix.lower() in VIDEO_EXTENSIONS
+    
+    def __iter__(self) -> Iterator[Frame]:
+        self.duration = 0.0
+        self.frames_read = 0
+        frames = self._video_frames() if self.is_video else self._image_frames()
+        interval = 1.0 / self.sample_fps if self.sample_fps else 0.0
+        next_sample = 0.0
+        for index, timestamp, decode in frames:
+            self.frames_read += 1
+            # a small tolerance keeps 30 fps timestamps on a 4 fps clock
+            if timestamp + 1e-6 < next_sample:
+                continue
+            if interval:
+                next_sample = (math.floor(timestamp / interval + 1e-6) + 1) * interval
+            yield Frame(index, timestamp, decode())
+    
+    def _video_frames(self):
+        capture = cv2.VideoCapture(str(self.source))
+        if not capture.isOpened():
+            raise ValueError(f"Could not open video: {self.source}")
+        try:
+            fps = capture.get(cv2.CAP_PROP_FPS)
+            index = 0
+            while capture.grab():
+                # container timestamps are unreliable in some formats; the frame rate is not
+                timestamp = index / fps if fps > 0 else capture.get(cv2.CAP_PROP_POS_MSEC) / 1000
+                self.duration = timestamp + (1 / fps if fps > 0 else 0.0)
+                yield index, timestamp, lambda: _retrieve(capture, self.source)
+                index += 1
+        finally:
+            capture.release()
+        if index == 0:
+            raise ValueError(f"Could not read video: {self.source}")
+    
+    def _image_frames(self):
+        data = self.source if is_path(self.source) else io.BytesIO(read_image_bytes(self.source))
+        with Image.open(data) as image:
+            animated = getattr(image, 'is_animated', False)
+            timestamp = 0.0
+            for index in range(getattr(image, 'n_frames', 1)):
+                image.seek(index)
+                # WebP reports a frame's duration once it is decoded
+                image.load()
+                duration = (image.info.get('duration') or DEFAULT_FRAME_MS) if animated else 0
+                self.duration = timestamp + duration / 1000
+                yield index, timestamp, lambda: cv2.cvtColor(np.asarray(image.convert('RGB')), cv2.COLOR_RGB2BGR)
+                timestamp = self.duration
+
+
+def _retrieve(capture, source) -> np.ndarray:
+    ok, frame = capture.retrieve()
+    if not ok:
+        raise ValueError(f"Could not decode a frame of {source}")
+    return frame
@@ -0,0 +1,270 @@
+import io
+import os
+import struct
+from pathlib import Path
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def is_path(source) -> bool:
+    return isinstance(source, (str, Path))
+
+
+def read_image_bytes(source) -> bytes:
+    """Return the encoded bytes of a file path, bytes-like object or binary file-like object."""
+    if isinstance(source, bytes):
+        return source
+    if isinstance(source, (bytearray, memoryview)):
+        return bytes(source)
+    if is_path(source):
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Image not found: {source}")
+        with open(source, 'rb') as f:
+            return f.read()
+    if hasattr(source, 'getvalue'):
+        # BytesIO and Streamlit uploads: independent of the read position
+        return source.getvalue()
+    if hasattr(source, 'read'):
+        return source.read()
+    raise TypeError(f"Unsupported image source: {type(source).__name__}")
+
+
+def decode_image_bytes(data: bytes, source: str = "<bytes>", max_pixels: Optional[int] = None) -> np.ndarray:
+    """Decode encoded image bytes to a BGR array, reduced to fit ``max_pixels`` if given."""
+    factor = decode_reduction(io.BytesIO(data), max_pixels, source) if max_pixels else 1
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), REDUCED_MODES[factor])
+    if image is None:
+        image = _decode_with_pillow(io.BytesIO(data), factor)
+    if image is None:
+        raise ValueError(f"Could not load image: {source}")
+    return image
+
+
+def read_image_file(path, max_pixels: Optional[int] = None) -> np.ndarray:
+    """``cv2.imread`` with the same pixel budget as ``decode_image_bytes``."""
+    factor = 1
+    if max_pixels:
+        with open(path, 'rb') as f:
+            factor = decode_reduction(f, max_pixels, str(path))
+    image = cv2.imread(str(path), REDUCED_MODES[factor])
+    if image is None:
+        image = _decode_with_pillow(path, factor)
+    if image is None:
+        raise ValueError(f"Could not load image: {path}")
+    return image
+
+
+def _decode_with_pillow(f, factor: int = 1) -> Optional[np.ndarray]:
+    # OpenCV builds without a GIF decoder read nothing from GIFs; the first
+    # frame stands for an animated image here (see frame_source for all of them)
+    from PIL import Image
+    
+    try:
+        with Image.open(f) as image:
+            image = image.convert('RGB')
+            if factor > 1:
+                image = image.reduce(factor)
+            return cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
+    except (OSError, ValueError):
+        return None
+
+
+class ImageTooLargeError(ValueError):
+    """The image header reports more pixels than the budget allows, even at reduced size."""
+
+
+# Decoding modes by reduction factor. libjpeg scales during the inverse DCT,
+# so a reduced JPEG is never held at full size; for other formats OpenCV
+# decodes at full size and then resizes.
+REDUCED_MODES = {
+    1: cv2.IMREAD_COLOR,
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8
+}
+# Formats that are decoded at full size before the reduction are refused
+# above this multiple of the pixel budget.
+FULL_DECODE_LIMIT = 4
+
+
+def decode_reduction(f, max_pixels: int, source: str = "<bytes>") -> int:
+    """Reduction factor (1, 2, 4 or 8) that brings an encoded image within ``max_pixels``.
+    
+    Only the header is read. Raises ``ImageTooLargeError`` for images that would
+    still be too large at 1/8 scale or, for formats that cannot be decoded
+    at reduced size, whose full-size decode would exceed
+    ``FULL_DECODE_LIMIT`` times the budget. Images whose size cannot be
+    read from the header are left to the decoder.
+    """
+    header = _header_size(f)
+    if header is None:
+        return 1
+    kind, width, height = header
+    pixels = width * height
+    if pixels <= max_pixels:
+        return 1
+    if kind != 'jpeg' and pixels > max_pixels * FULL_DECODE_LIMIT:
+        raise ImageTooLargeError(f"Image too large: {source} is {width}x{height} pixels")
+    for factor in (2, 4, 8):
+        if (width // factor) * (height // factor) <= max_pixels:
+            return factor
+    raise ImageTooLargeError(f"Image too large: {source} is {width}x{height} pixels")
+
+
+def read_image_size(source) -> Optional[Tuple[int, int]]:
+    """``(width, height)`` of an encoded PNG, JPEG, GIF, BMP or WebP image, read from its header."""
+    if isinstance(source, np.ndarray):
+        return source.shape[1], source.shape[0]
+    if is_path(source):
+        if not os.path.exists(source):
+            return None
+        with open(source, 'rb') as f:
+            header = _header_size(f)
+    else:
+        header = _header_size(io.BytesIO(read_image_bytes(source)))
+    return header[1:] if header else None
+
+
+def _header_size(f) -> Optional[Tuple[str, int, int]]:
+    head = f.read(32)
+    if head.startswith(PNG_SIGNATURE) and head[12:16] == b'IHDR':
+        return ('png',) + struct.unpack('>II', head[16:24])
+    if head[:6] in (b'GIF87a', b'GIF89a'):
+        return ('gif',) + struct.unpack('<HH', head[6:10])
+    if head[:2] == b'BM' and len(head) >= 26:
+        if struct.unpack('<I', head[14:18])[0] == 12:
+            return ('bmp',) + struct.unpack('<HH', head[18:22])
+        width, height = struct.unpack('<ii', head[18:26])
+        # negative heights mark top-down bitmaps
+        return 'bmp', width, abs(height)
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return _webp_size(head)
+    if head[:2] == b'\xff\xd8':
+        f.seek(2)
+        return _jpeg_size(f)
+    return None
+
+
+def _webp_size(head: bytes) -> Optional[Tuple[str, int, int]]:
+    chunk = head[12:16]
+    if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a':
+        width, height = struct.unpack('<HH', head[26:30])
+        return 'webp', width & 0x3FFF, height & 0x3FFF
+    if chunk == b'VP8L' and head[20] == 0x2F:
+        bits = struct.unpack('<I', head[21:25])[0]
+        return 'webp', (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b'VP8X':
+        return 'webp', int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+    return None
+
+
+# SOFn markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) do not.
+JPEG_FRAME_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def _jpeg_size(f) -> Optional[Tuple[str, int, int]]:
+    while True:
+        byte = f.read(1)
+        if not byte:
+            return None
+        if byte != b'\xff':
+            continue
+        marker = f.read(1)
+        while marker == b'\xff':
+            # fill bytes before a marker
+            marker = f.read(1)
+        if not marker:
+            return None
+        code = marker[0]
+        if code == 0xD8 or code == 0x01 or 0xD0 <= code <= 0xD7:
+            # markers without a length field
+            continue
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        length = struct.unpack('>H', length)[0]
+        if code in JPEG_FRAME_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None
+            height, width = struct.unpack('>HH', frame[1:5])
+            return 'jpeg', width, height
+        if code == 0xDA:
+            # start of scan: the frame header was missing
+            return None
+        f.seek(length - 2, io.SEEK_CUR)
+
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+def _png_dpi(f) -> Optional[float]:
+    if f.read(8) != PNG_SIGNATURE:
+        return None
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return None
+        length, kind = struct.unpack('>I4s', header)
+        if kind == b'pHYs':
+            ppu_x, _, unit = struct.unpack('>IIB', f.read(9))
+            # unit 1 is pixels per meter; 0 only gives an aspect ratio
+            return ppu_x * 0.0254 if unit == 1 else None
+        if kind in (b'IDAT', b'IEND'):
+            # pHYs must precede the image data
+            return None
+        f.seek(length + 4, io.SEEK_CUR)
+
+
+def _jfif_dpi(f) -> Optional[float]:
+    header = f.read(18)
+    if len(header) < 18 or header[:4] != b'\xff\xd8\xff\xe0' or header[6:11] != b'JFIF\x00':
+        return None
+    unit = header[13]
+    density = struct.unpack('>H', header[14:16])[0]
+    if unit == 1:
+        return float(density)
+    if unit == 2:
+        return density * 2.54
+    return None
+
+
+def _header_dpi(f) -> Optional[float]:
+    dpi = _png_dpi(f)
+    if dpi is None:
+        f.seek(0)
+        dpi = _jfif_dpi(f)
+    return dpi
+
+
+def read_dpi(source) -> Optional[float]:
+    """Horizontal resolution stored in a PNG ``pHYs`` chunk or JPEG JFIF header, if any.
+    
+    Only the header is read, so this is cheap even for very large files.
+    """
+    if isinstance(source, np.ndarray):
+        return None
+    if is_path(source):
+        if not os.path.exists(source):
+            return None
+        with open(source, 'rb') as f:
+            return _header_dpi(f)
+    return _header_dpi(io.BytesIO(read_image_bytes(source)))
+
+
+def detect_device_pixel_ratio(source) -> float:
+    """Guess the device pixel ratio of a screenshot from its resolution metadata.
+    
+    macOS and iOS tag Retina captures with 72 dpi per point (144 dpi at 2x),
+    Windows uses 96 dpi per logical pixel. Untagged images count as 1x.
+    """
+    dpi = read_dpi(source)
+    if not dpi:
+        return 1.0
+    dpi = round(dpi)
+    for base in (72, 96):
+        if dpi % base == 0:
+            return float(min(max(dpi // base, 1), 4))
+    return float(min(max(round(dpi / 72), 1), 4))
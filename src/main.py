@@ -1,19 +1,31 @@
+import argparse
 import sys
 from pathlib import Path
 import json
-from ui_analyzer import UIAnalyzer
-from suggestion_generator import SuggestionGenerator
-from config import SCREENSHOTS_DIR, OUTPUT_DIR
+from config import DUPLICATE_DISTANCE, MAX_IMAGE_PIXELS, OUTPUT_DIR, VIDEO_EXTENSIONS, ensure_dir
 
+# The analysis stack (OpenCV, NumPy) is imported inside the functions that
+# need it so that `--help` and argument errors return immediately.
 
-def analyze_image(image_path: str, output_file: str = None):
-    analyzer = UIAnalyzer()
+
+def analyze_image(image_path: str, output_file: str = None, cache=None,
+                  max_side: int = None, device_pixel_ratio=None, profile: bool = False,
+                  profile_memory: bool = False, trace_file: str = None, threads: int = 1,
+                  memory_budget_mb: float = None, max_pixels: int = MAX_IMAGE_PIXELS):
+    from ui_analyzer import UIAnalyzer
+    from suggestion_generator import SuggestionGenerator
+    from profiling import Profiler
+    from element_list import json_default
+    
+    analyzer = UIAnalyzer(cache=cache, max_side=max_side, device_pixel_ratio=device_pixel_ratio, threads=threads,
+                          memory_budget_mb=memory_budget_mb, max_pixels=max_pixels)
     generator = SuggestionGenerator()
     
     print(f"Analyzing image: {image_path}")
     
     try:
-        analysis = analyzer.full_analysis(image_path)
+        profiler = Profiler(track_memory=profile_memory) if profile or profile_memory or trace_file else None
+        analysis = analyzer.full_analysis(image_path, profiler=profiler)
         suggestions = generator.generate_suggestions(analysis)
         wireframe_info = generator.generate_wireframe_suggestions(analysis)
         
@@ -25,9 +37,9 @@ def analyze_image(image_path: str, output_file: str = None):
         }
         
         if output_file:
-            output_path = OUTPUT_DIR / output_file
+            output_path = ensure_dir(OUTPUT_DIR) / output_file
             with open(output_path, 'w') as f:
-                json.dump(results, f, indent=2, default=str)
+                json.dump(results, f, indent=2, default=json_default)
             print(f"Results saved to: {output_path}")
         
         print("\n=== ANALYSIS RESULTS ===")
@@ -37,6 +49,12 @@ def analyze_image(image_path: str, output_file: str = None):
         print(f"\n=== SUGGESTIONS ===")
         print(generator.format_suggestions(suggestions))
         
+        if profiler is not None:
+            profiler.stop()
+            print_timings(analysis['timings'])
+            if trace_file:
+                write_trace(profiler, trace_file)
+        
         return results
         
     except Exception as e:
@@ -44,13 +62,237 @@ def analyze_image(image_path: str, output_file: str = None):
         return None
 
 
+def compare_images(before_path: str, after_path: str, output_file: str = None, cache=None,
+                   max_side: int = None, device_pixel_ratio=None, max_pixels: int = MAX_IMAGE_PIXELS):
+    from ui_analyzer import UIAnalyzer
+    from element_list import json_default
+    
+    analyzer = UIAnalyzer(cache=cache, max_side=max_side, device_pixel_ratio=device_pixel_ratio,
+                          max_pixels=max_pixels)
+    
+    print(f"Comparing: {before_path} -> {after_path}")
+    
+    try:
+        diff = analyzer.compare(before_path, after_path)
+        
+        if output_file:
+            output_path = ensure_dir(OUTPUT_DIR) / output_file
+            with open(output_path, 'w') as f:
+                json.dump(diff, f, indent=2, default=json_default)
+            print(f"Results saved to: {output_path}")
+        
+        print("\n=== VISUAL DIFF ===")
+        if diff['identical']:
+            print("No visual changes")
+            return diff
+        print(f"Changed: {diff['changed_ratio']:.2%} of pixels in {len(diff['changed_regions'])} region(s), "
+              f"{diff['reanalyzed_ratio']:.1%} re-analyzed")
+        if diff['shift'] != (0, 0):
+            print(f"Aligned with a shift of {diff['shift']}")
+        elements = diff['elements']
+        print(f"Elements: {len(elements['added'])} added, {len(elements['removed'])} removed, "
+              f"{len(elements['moved'])} moved, {len(elements['modified'])} modified, "
+              f"{elements['unchanged']} unchanged")
+        changed = {name: entry for name, entry in diff['metrics'].items() if entry['delta']}
+        if changed:
+            print(f"\n{'metric':<36}{'before':>10}{'after':>10}{'delta':>10}")
+            for name, entry in changed.items():
+                print(f"{name:<36}{entry['before']:>10}{entry['after']:>10}{entry['delta']:>+10}")
+        return diff
+        
+    except Exception as e:
+        print(f"Error comparing images: {str(e)}")
+        return None
+
+
+def analyze_flow(source_path: str, output_file: str = None, cache=None, max_side: int = None,
+                 device_pixel_ratio=None, max_pixels: int = MAX_IMAGE_PIXELS, sample_fps: float = None):
+    from ui_analyzer import UIAnalyzer
+    from suggestion_generator import SuggestionGenerator
+    from user_flow import UserFlowAnalyzer
+    from element_list import json_default
+    
+    analyzer = UIAnalyzer(cache=cache, max_side=max_side, device_pixel_ratio=device_pixel_ratio,
+                          max_pixels=max_pixels)
+    generator = SuggestionGenerator()
+    # 0 examines every frame
+    options = {} if sample_fps is None else {'sample_fps': sample_fps or None}
+    
+    print(f"Analyzing user flow: {source_path}")
+    
+    try:
+        flow = UserFlowAnalyzer(analyzer, generator, **options).analyze(source_path)
+        
+        if output_file:
+            output_path = ensure_dir(OUTPUT_DIR) / output_file
+            with open(output_path, 'w') as f:
+                json.dump(flow, f, indent=2, default=json_default)
+            print(f"Results saved to: {output_path}")
+        
+        print("\n=== USER FLOW ===")
+        print(f"{len(flow['screens'])} distinct screens in {flow['duration']:.1f}s "
+              f"({flow['frames_read']} frames read, {flow['transitions']} transitions skipped)")
+        scores = {screen['screen']: screen['analysis']['overall_score'] for screen in flow['screens']}
+        for span in flow['timeline']:
+            print(f"{span['start']:>8.1f}s - {span['end']:>7.1f}s  screen {span['screen'] + 1:<4}"
+                  f"score {scores[span['screen']]}/1.0")
+        print(f"\n=== FLOW SUGGESTIONS ===")
+        print(generator.format_suggestions(flow['flow_suggestions']))
+        return flow
+        
+    except Exception as e:
+        print(f"Error analyzing recording: {str(e)}")
+        return None
+
+
+def print_timings(timings: dict):
+    print("\n=== TIMINGS ===")
+    print(f"{'stage':<44}{'wall ms':>10}{'cpu ms':>10}{'peak MB':>10}")
+    for path, entry in timings['stages'].items():
+        name = '  ' * path.count('/') + path.rpartition('/')[2]
+        peak = f"{entry['peak_mb']:.2f}" if 'peak_mb' in entry else '-'
+        print(f"{name:<44}{entry['wall_ms']:>10.1f}{entry['cpu_ms']:>10.1f}{peak:>10}")
+    print(f"{'total':<44}{timings['total_ms']:>10.1f}")
+
+
+def write_trace(profiler, trace_file: str):
+    # .folded gives flamegraph.pl / speedscope input, anything else a Chrome trace
+    if trace_file.endswith('.folded'):
+        Path(trace_file).write_text(profiler.collapsed_stacks(), encoding='utf-8')
+    else:
+        profiler.write_chrome_trace(trace_file)
+    print(f"Trace written to: {trace_file}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Analyze UI screenshots.",
+        usage="python main.py <image_path> [output_file]\n"
+              "       python main.py --compare <before> <after> [output_file] [--tolerance RATIO]\n"
+              "       python main.py --flow <recording> [output_file] [--sample-fps FPS]\n"
+              "       python main.py --batch [inputs ...] [--manifest FILE] [-o results.jsonl] [--format columnar] [-j N] [--resume] [--dedupe [BITS]] [--portfolio PDF]"
+    )
+    parser.add_argument('paths', nargs='*',
+                        help="image path and optional output file, or with --batch any mix of "
+                             "image files, directories and glob patterns")
+    parser.add_argument('--batch', action='store_true',
+                        help="analyze many images and stream one JSON line per image")
+    parser.add_argument('--manifest', help="file listing one image path per line (batch mode)")
+    parser.add_argument('-o', '--output', help="JSONL results file in batch mode (default: stdout)")
+    parser.add_argument('--format', choices=('jsonl', 'columnar'), default='jsonl',
+                        help="batch output: JSON lines, or a directory of memory-mappable column chunks "
+                             "for large result sets (needs --output)")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="worker processes in batch mode (default: CPU count)")
+    parser.add_argument('--resume', action='store_true',
+                        help="skip images already recorded as successful in the output file")
+    parser.add_argument('--dedupe', type=int, nargs='?', const=DUPLICATE_DISTANCE, default=None, metavar='BITS',
+                        help="analyze near-duplicate screenshots once: images whose difference hashes are at "
+                             f"most BITS apart share the first one's record (batch mode, default: {DUPLICATE_DISTANCE})")
+    parser.add_argument('--portfolio', metavar='PDF',
+                        help="also write one PDF report over every analyzed image (batch mode, needs --output)")
+    parser.add_argument('--compare', action='store_true',
+                        help="compare two versions of a screen: paths are the before and after images "
+                             "and an optional output file")
+    parser.add_argument('--tolerance', type=float, default=0.0, metavar='RATIO',
+                        help="with --compare, exit with status 1 when more than this share of the pixels "
+                             "changed (default: 0)")
+    parser.add_argument('--flow', action='store_true',
+                        help="analyze an animated GIF or WebP as a user flow (implied for video files)")
+    parser.add_argument('--sample-fps', type=float, default=None,
+                        help="frames per second examined in a flow (default: 4, 0 for every frame)")
+    parser.add_argument('--cache-dir', help="analysis cache directory (default: output/cache)")
+    parser.add_argument('--no-cache', action='store_true', help="always re-run the analysis")
+    parser.add_argument('--max-side', type=int, default=None,
+                        help="run line, alignment and symmetry detection on a copy at most this many pixels long")
+    parser.add_argument('--dpr', type=device_pixel_ratio_arg, default=None,
+                        help="device pixel ratio of the screenshots, or 'auto' to read it from the image metadata")
+    parser.add_argument('-t', '--threads', type=int, default=1,
+                        help="threads used to run the analysis stages of one image concurrently (default: 1)")
+    parser.add_argument('--memory-budget', type=float, default=None, metavar='MB',
+                        help="analyze tall pages in horizontal bands whose working memory fits in MB megabytes")
+    parser.add_argument('--max-pixels', type=int, default=MAX_IMAGE_PIXELS,
+                        help="decode larger images at 1/2, 1/4 or 1/8 size and refuse those still too large "
+                             f"(default: {MAX_IMAGE_PIXELS})")
+    parser.add_argument('--profile', action='store_true',
+                        help="print per-stage wall and CPU time (in batch mode: add 'timings' to every record)")
+    parser.add_argument('--profile-memory', action='store_true',
+                        help="also record peak traced memory per stage; slows the analysis down")
+    parser.add_argument('--trace', metavar='FILE',
+                        help="write a Chrome trace (or folded stacks if FILE ends in .folded) of the analysis")
+    return parser
+
+
+def device_pixel_ratio_arg(value: str):
+    if value == 'auto':
+        return value
+    try:
+        ratio = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or 'auto', got {value!r}")
+    if ratio < 1:
+        raise argparse.ArgumentTypeError("device pixel ratio must be at least 1")
+    return ratio
+
+
 if __name__ == "__main__":
-    if len(sys.argv) < 2:
-        print("Usage: python main.py <image_path> [output_file]")
+    parser = build_parser()
+    args = parser.parse_args()
+    
+    if args.batch:
+        if not args.paths and not args.manifest:
+            parser.error("batch mode needs at least one input or --manifest")
+        if args.resume and not args.output:
+            parser.error("--resume needs --output")
+        if args.portfolio and not args.output:
+            parser.error("--portfolio needs --output")
+        if args.format == 'columnar' and not args.output:
+            parser.error("--format columnar needs --output")
+        from batch import run_batch
+        
+        output_path = str(ensure_dir(OUTPUT_DIR) / args.output) if args.output else None
+        summary = run_batch(args.paths, output_path, workers=args.workers,
+                            manifest=args.manifest, resume=args.resume,
+                            use_cache=not args.no_cache, cache_dir=args.cache_dir,
+                            max_side=args.max_side, device_pixel_ratio=args.dpr,
+                            profile=args.profile, profile_memory=args.profile_memory, threads=args.threads,
+                            memory_budget_mb=args.memory_budget, max_pixels=args.max_pixels,
+                            dedupe=args.dedupe, output_format=args.format)
+        if args.portfolio:
+            from batch import iter_records
+            from portfolio_report import PortfolioReportGenerator
+            
+            portfolio_path = str(OUTPUT_DIR / args.portfolio)
+            portfolio = PortfolioReportGenerator().generate_pdf(iter_records(output_path), portfolio_path)
+            print(f"Portfolio written to: {portfolio_path} ({portfolio['screens']} screens, "
+                  f"{portfolio['pages']} pages)", file=sys.stderr)
+        sys.exit(1 if summary['failed'] else 0)
+    
+    from analysis_cache import AnalysisCache
+    
+    if args.compare:
+        if not 2 <= len(args.paths) <= 3:
+            parser.error("--compare needs a before and an after image")
+        cache = None if args.no_cache else AnalysisCache(args.cache_dir)
+        diff = compare_images(args.paths[0], args.paths[1], args.paths[2] if len(args.paths) > 2 else None,
+                              cache=cache, max_side=args.max_side, device_pixel_ratio=args.dpr,
+                              max_pixels=args.max_pixels)
+        if diff is None:
+            sys.exit(2)
+        sys.exit(1 if diff['changed_ratio'] > args.tolerance else 0)
+    
+    if not 1 <= len(args.paths) <= 2:
+        parser.print_usage()
         sys.exit(1)
     
-    image_path = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
+    image_path = args.paths[0]
+    output_file = args.paths[1] if len(args.paths) > 1 else None
     
-    analyze_image(image_path, output_file)
-
+    cache = None if args.no_cache else AnalysisCache(args.cache_dir)
+    if args.flow or Path(image_path).suffix.lower() in VIDEO_EXTENSIONS:
+        flow = analyze_flow(image_path, output_file, cache=cache, max_side=args.max_side,
+                            device_pixel_ratio=args.dpr, max_pixels=args.max_pixels, sample_fps=args.sample_fps)
+        sys.exit(0 if flow is not None else 1)
+    analyze_image(image_path, output_file, cache=cache, max_side=args.max_side, device_pixel_ratio=args.dpr,
+                  profile=args.profile, profile_memory=args.profile_memory, trace_file=args.trace,
+                  threads=args.threads, memory_budget_mb=args.memory_budget, max_pixels=args.max_pixels)
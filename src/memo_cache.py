@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+try:
+    from .config import RESULT_CACHE_MAX_BYTES, RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL
+except ImportError:
+    from config import RESULT_CACHE_MAX_BYTES, RESULT_CACHE_MAX_ENTRIES, RESULT_CACHE_TTL
+
+_MISSING = object()
+
+
+class MemoCache:
+    """Thread-safe in-memory LRU store with a time-to-live, shared by every session of a process.
+    
+    Entries are evicted least recently used first once there are more than
+    ``max_entries`` of them or their sizes add up to more than
+    ``max_bytes``, and are dropped ``ttl`` seconds after they were stored.
+    Sizes are whatever the caller passes to ``put`` (encoded bytes for PDFs,
+    the JSON length for analyses).
+    
+    ``get_or_compute`` runs ``compute`` once per key even when several
+    threads (Streamlit sessions) ask for the same missing key at the same
+    time; the others wait for its result.
+    """
+    
+    def __init__(self, max_entries: int = RESULT_CACHE_MAX_ENTRIES, max_bytes: int = RESULT_CACHE_MAX_BYTES,
+                 ttl: Optional[float] = RESULT_CACHE_TTL, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _lookup(self, key: Hashable):
+        """Entry for ``key`` with the lock held, dropping it if it has expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, size, expires = entry
+        if expires is not None and self.clock() >= expires:
+            del self._entries[key]
+            self.bytes -= size
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+    
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[0]
+    
+    def put(self, key: Hashable, value: Any, size: int = 0):
+        if size > self.max_bytes:
+            # would evict everything else and then itself
+            return
+        expires = self.clock() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (value, size, expires)
+            self.bytes += size
+            while len(self._entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+    
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any],
+                       size_of: Optional[Callable[[Any], int]] = None):
+        """Cached value for ``key``, or the result of ``compute()``, stored with size ``size_of(result)``."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            # [lock, threads using it]; dropped when the last one is done
+            slot = self._key_locks.setdefault(key, [threading.Lock(), 0])
+            slot[1] += 1
+        try:
+            with slot[0]:
+                # another thread may have computed it while this one waited
+                with self._lock:
+                    entry = self._lookup(key)
+                if entry is not None:
+                    return entry[0]
+                value = compute()
+                self.put(key, value, size_of(value) if size_of else 0)
+                return value
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    del self._key_locks[key]
+    
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.bytes -= entry[1]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+    
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
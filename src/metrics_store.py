@@ -0,0 +1,257 @@
+import argparse
+import json
+import re
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from .batch import iter_records
+    from .columnar_results import RECORD_COLUMNS
+    from .element_list import ElementList
+except ImportError:
+    from batch import iter_records
+    from columnar_results import RECORD_COLUMNS
+    from element_list import ElementList
+
+# Analyses inserted per transaction.
+INSERT_BATCH = 2000
+# The analysis metrics of the columnar format, one indexed column each.
+METRIC_COLUMNS = tuple((name, path[1:], dtype) for name, path, dtype in RECORD_COLUMNS if path[0] == 'analysis')
+SQL_TYPES = {'f8': 'REAL', 'i8': 'INTEGER', 'U': 'TEXT'}
+# NumPy scalars in an analysis are not bindable, so every value is converted
+CONVERTERS = {'f8': float, 'i8': int, 'U': str}
+COLUMNS = ('image_path', 'width', 'height') + tuple(name for name, _, _ in METRIC_COLUMNS)
+OPERATORS = ('<=', '>=', '!=', '<', '>', '=')
+CONDITION = re.compile(r"^\s*(\w+)\s*(<=|>=|!=|<|>|=)\s*(.+?)\s*$")
+
+
+def _lookup(analysis: Dict, path: Tuple[str, ...]):
+    value = analysis
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def parse_condition(text: str) -> Tuple[str, str, object]:
+    """``'contrast_score<0.5'`` -> ``('contrast_score', '<', 0.5)``; numbers become floats."""
+    match = CONDITION.match(text)
+    if not match:
+        raise ValueError(f"not a condition: {text!r} (expected e.g. contrast_score<0.5)")
+    column, operator, value = match.groups()
+    try:
+        value = float(value)
+    except ValueError:
+        value = value.strip('\'"')
+    return column, operator, value
+
+
+class MetricsStore:
+    """SQLite store of analysis metrics for querying a whole corpus without re-reading results files.
+    
+    ``images`` holds one row per image path with an indexed column for each
+    of ``METRIC_COLUMNS`` (layout, color and spacing scores, element count,
+    overall score); ``elements`` holds each image's element boxes. Ingesting
+    an image again replaces its rows; analyses without an ``image_path``
+    are always added, with a NULL path. Inserts run in transactions of
+    ``INSERT_BATCH`` analyses, and the database uses write-ahead logging so
+    readers can query while a batch is ingested.
+    """
+    
+    def __init__(self, path: str = ':memory:'):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._create_schema()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def close(self):
+        self.connection.close()
+    
+    def _create_schema(self):
+        metrics = ",\n".join(f"    {name} {SQL_TYPES[dtype]}" for name, _, dtype in METRIC_COLUMNS)
+        with self.connection:
+            self.connection.execute(f"""CREATE TABLE IF NOT EXISTS images (
+    id INTEGER PRIMARY KEY,
+    image_path TEXT UNIQUE,
+    width INTEGER,
+    height INTEGER,
+{metrics}
+)""")
+            self.connection.execute("""CREATE TABLE IF NOT EXISTS elements (
+    image_id INTEGER NOT NULL REFERENCES images(id),
+    x INTEGER, y INTEGER, w INTEGER, h INTEGER,
+    area REAL,
+    cx INTEGER, cy INTEGER
+)""")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS elements_image ON elements(image_id)")
+            for name, _, _ in METRIC_COLUMNS:
+                self.connection.execute(f"CREATE INDEX IF NOT EXISTS images_{name} ON images({name})")
+    
+    def __len__(self) -> int:
+        return self.connection.execute("SELECT COUNT(*) FROM images").fetchone()[0]
+    
+    def ingest(self, analyses: Iterable[Dict], elements: bool = True) -> int:
+        """Store ``full_analysis`` results or batch records; error records are skipped.
+        
+        Returns the number of analyses stored. With ``elements=False`` only
+        the per-image metrics are kept.
+        """
+        stored = 0
+        batch = []
+        for analysis in analyses:
+            if 'analysis' in analysis:
+                if analysis.get('status', 'ok') != 'ok':
+                    continue
+                analysis = analysis['analysis']
+            if not analysis or 'overall_score' not in analysis:
+                continue
+            batch.append(analysis)
+            if len(batch) >= INSERT_BATCH:
+                stored += self._insert(batch, elements)
+                batch = []
+        if batch:
+            stored += self._insert(batch, elements)
+        return stored
+    
+    def _insert(self, analyses: List[Dict], elements: bool) -> int:
+        # the last analysis of an image wins, as it would across batches
+        latest = {}
+        for analysis in analyses:
+            path = analysis.get('image_path')
+            # analyses of bytes or arrays have no path, so each one is a separate image
+            latest[object() if path is None else str(path)] = analysis
+        analyses = [(key if isinstance(key, str) else None, analysis) for key, analysis in latest.items()]
+        placeholders = ", ".join("?" * (len(COLUMNS) + 1))
+        with self.connection:
+            # replace earlier results for the same images
+            paths = [(path,) for path, _ in analyses if path is not None]
+            self.connection.executemany(
+                "DELETE FROM elements WHERE image_id = (SELECT id FROM images WHERE image_path = ?)", paths)
+            self.connection.executemany("DELETE FROM images WHERE image_path = ?", paths)
+            first_id = (self.connection.execute("SELECT MAX(id) FROM images").fetchone()[0] or 0) + 1
+            rows = []
+            for image_id, (path, analysis) in enumerate(analyses, first_id):
+                dimensions = _lookup(analysis, ('elements', 'image_dimensions'))
+                size = [int(side) for side in dimensions] if dimensions else [None, None]
+                metrics = []
+                for _, key_path, dtype in METRIC_COLUMNS:
+                    value = _lookup(analysis, key_path)
+                    metrics.append(None if value is None else CONVERTERS[dtype](value))
+                rows.append([image_id, path] + size + metrics)
+            self.connection.executemany(f"INSERT INTO images (id, {', '.join(COLUMNS)}) VALUES ({placeholders})",
+                                        rows)
+            if elements:
+                self.connection.executemany("INSERT INTO elements VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                                            self._element_rows(analyses, first_id))
+        return len(rows)
+    
+    @staticmethod
+    def _element_rows(analyses: List[Tuple[str, Dict]], first_id: int) -> Iterator[Tuple]:
+        for image_id, (_, analysis) in enumerate(analyses, first_id):
+            found = _lookup(analysis, ('elements', 'elements'))
+            if found is None or len(found) == 0:
+                continue
+            if not isinstance(found, ElementList):
+                found = ElementList.from_dicts(found)
+            data = found.data
+            columns = [data[name].tolist() for name in data.dtype.names]
+            for row in zip(*columns):
+                yield (image_id,) + row
+    
+    def query(self, conditions: Sequence[Tuple[str, str, object]] = (), columns: Sequence[str] = COLUMNS,
+              order_by: Optional[str] = None, descending: bool = False, limit: Optional[int] = None) -> List[Dict]:
+        """Images matching every ``(column, operator, value)`` condition, as dicts of ``columns``.
+        
+        Column names and operators are checked against ``COLUMNS`` and
+        ``OPERATORS``; values are always bound as parameters.
+        """
+        for name in list(columns) + ([order_by] if order_by else []):
+            if name not in COLUMNS:
+                raise ValueError(f"unknown column {name!r}")
+        where, params = self._where(conditions)
+        sql = f"SELECT {', '.join(columns)} FROM images{where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}{' DESC' if descending else ''}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [dict(zip(columns, row)) for row in self.connection.execute(sql, params)]
+    
+    def count(self, conditions: Sequence[Tuple[str, str, object]] = ()) -> int:
+        where, params = self._where(conditions)
+        return self.connection.execute(f"SELECT COUNT(*) FROM images{where}", params).fetchone()[0]
+    
+    @staticmethod
+    def _where(conditions: Sequence[Tuple[str, str, object]]) -> Tuple[str, List]:
+        clauses, params = [], []
+        for column, operator, value in conditions:
+            if column not in COLUMNS:
+                raise ValueError(f"unknown column {column!r}")
+            if operator not in OPERATORS:
+                raise ValueError(f"unknown operator {operator!r}")
+            clauses.append(f"{column} {operator} ?")
+            params.append(value)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+    
+    def elements(self, image_path: str) -> ElementList:
+        """Elements stored for ``image_path`` (empty when it has none)."""
+        rows = self.connection.execute(
+            "SELECT x, y, w, h, area FROM elements JOIN images ON images.id = elements.image_id "
+            "WHERE images.image_path = ? ORDER BY elements.rowid", (image_path,)).fetchall()
+        boxes = np.array([row[:4] for row in rows], dtype=np.int64).reshape(-1, 4)
+        return ElementList.from_columns(boxes, [row[4] for row in rows])
+
+
+def _load_results(path: str) -> Iterator[Dict]:
+    # single analyses as main.py writes them, or batch results in either format
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            yield json.load(f)
+    else:
+        yield from iter_records(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Store analysis metrics in SQLite and query them.",
+        usage="python metrics_store.py ingest metrics.db results.jsonl [more results ...] [--no-elements]\n"
+              "       python metrics_store.py query metrics.db \"contrast_score<0.5\" \"element_density>0.8\" "
+              "[--columns ...] [--order-by COLUMN] [--desc] [--limit N]")
+    parser.add_argument('command', choices=('ingest', 'query'))
+    parser.add_argument('database', help="SQLite file (created when missing)")
+    parser.add_argument('arguments', nargs='*',
+                        help="ingest: JSONL or columnar batch results, or .json analyses; query: conditions")
+    parser.add_argument('--no-elements', action='store_true', help="store only the per-image metrics")
+    parser.add_argument('--columns', nargs='+', default=['image_path', 'overall_score'])
+    parser.add_argument('--order-by')
+    parser.add_argument('--desc', action='store_true')
+    parser.add_argument('--limit', type=int)
+    args = parser.parse_args()
+    
+    with MetricsStore(args.database) as store:
+        if args.command == 'ingest':
+            start = time.perf_counter()
+            stored = sum(store.ingest(_load_results(path), elements=not args.no_elements) for path in args.arguments)
+            print(f"Stored {stored} analyses in {time.perf_counter() - start:.1f}s "
+                  f"({len(store)} images in {args.database})")
+        else:
+            try:
+                rows = store.query([parse_condition(text) for text in args.arguments], args.columns,
+                                   args.order_by, args.desc, args.limit)
+            except ValueError as e:
+                parser.error(str(e))
+            for row in rows:
+                print(json.dumps(row))
+            print(f"{len(rows)} images", file=sys.stderr)
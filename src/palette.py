@@ -0,0 +1,113 @@
+import numpy as np
+from typing import List, Tuple
+
+try:
+    from .color_stats import ColorStats
+except ImportError:
+    from color_stats import ColorStats
+
+# Bits kept per channel when colors are binned before median cut; 5 bits
+# gives at most 32,768 bins however many distinct colors the image has.
+HISTOGRAM_BITS = 5
+# Weighted k-means passes over the bins after the median cut.
+REFINE_ITERATIONS = 4
+
+
+def _binned_histogram(stats: ColorStats) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean RGB color and pixel count of every non-empty histogram bin."""
+    colors = stats.colors.astype(np.int64)
+    counts = stats.counts.astype(np.float64)
+    shift = 8 - HISTOGRAM_BITS
+    binned = colors >> shift
+    bins = (binned[:, 0] << (2 * HISTOGRAM_BITS)) | (binned[:, 1] << HISTOGRAM_BITS) | binned[:, 2]
+    
+    size = 1 << (3 * HISTOGRAM_BITS)
+    weights = np.bincount(bins, weights=counts, minlength=size)
+    present = np.flatnonzero(weights)
+    sums = np.stack([np.bincount(bins, weights=colors[:, c] * counts, minlength=size)[present]
+                     for c in range(3)], axis=1)
+    weights = weights[present]
+    return sums / weights[:, None], weights
+
+
+def _median_cut(means: np.ndarray, weights: np.ndarray, k: int) -> np.ndarray:
+    """Label each bin with one of at most ``k`` boxes.
+    
+    The box with the largest pixel count times channel range is split at the
+    weighted median of its widest channel until there are ``k`` boxes or no
+    box holds more than one bin. Ties resolve by box order, so the result
+    only depends on the histogram.
+    """
+    def priority(members):
+        if len(members) < 2:
+            return 0.0
+        return weights[members].sum() * np.ptp(means[members], axis=0).max()
+    
+    boxes = [np.arange(len(means))]
+    priorities = [priority(boxes[0])]
+    while len(boxes) < k:
+        best = int(np.argmax(priorities))
+        if priorities[best] <= 0:
+            break
+        
+        members = boxes[best]
+        channel = int(np.ptp(means[members], axis=0).argmax())
+        members = members[np.argsort(means[members, channel], kind='stable')]
+        cumulative = np.cumsum(weights[members])
+        split = int(np.searchsorted(cumulative, cumulative[-1] / 2))
+        split = min(max(split, 1), len(members) - 1)
+        halves = [members[:split], members[split:]]
+        boxes[best:best + 1] = halves
+        priorities[best:best + 1] = [priority(half) for half in halves]
+    
+    labels = np.empty(len(means), dtype=np.int64)
+    for i, members in enumerate(boxes):
+        labels[members] = i
+    return labels
+
+
+def _weighted_centers(means: np.ndarray, weights: np.ndarray, labels: np.ndarray,
+                      previous: np.ndarray) -> np.ndarray:
+    membership = np.zeros((len(previous), len(means)))
+    membership[labels, np.arange(len(means))] = weights
+    mass = membership.sum(axis=1)
+    centers = previous.copy()
+    occupied = mass > 0
+    # a center that lost all its bins keeps its previous position
+    centers[occupied] = (membership[occupied] @ means) / mass[occupied, None]
+    return centers
+
+
+def _nearest(means: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    # |m - c|^2 without the |m|^2 term, which is the same for every center
+    distances = np.square(centers).sum(axis=1) - 2.0 * (means @ centers.T)
+    return distances.argmin(axis=1)
+
+
+def extract_palette(stats: ColorStats, k: int = 5) -> Tuple[List[Tuple[int, int, int]], List[float]]:
+    """Deterministic ``k``-color RGB palette and the share of pixels closest to each color.
+    
+    Median cut over a 15-bit histogram seeds a few passes of weighted k-means
+    over the same bins, so the cost depends on the number of bins rather
+    than the number of pixels. Colors are ordered by coverage, largest
+    first; images with fewer than ``k`` distinct colors return fewer.
+    """
+    if stats.unique_colors == 0:
+        return [], []
+    means, weights = _binned_histogram(stats)
+    labels = _median_cut(means, weights, k)
+    count = int(labels.max()) + 1
+    
+    centers = _weighted_centers(means, weights, labels, np.zeros((count, 3)))
+    for _ in range(REFINE_ITERATIONS):
+        new_labels = _nearest(means, centers)
+        if np.array_equal(new_labels, labels):
+            break
+        labels = new_labels
+        centers = _weighted_centers(means, weights, labels, centers)
+    
+    coverage = np.bincount(labels, weights=weights, minlength=count) / weights.sum()
+    order = np.argsort(-coverage, kind='stable')
+    order = order[coverage[order] > 0]
+    colors = [tuple(int(c) for c in np.clip(np.rint(centers[i]), 0, 255)) for i in order]
+    return colors, [float(coverage[i]) for i in order]
@@ -5,109 +5,97 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak,
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from datetime import datetime
-from typing import Dict, List
+from functools import lru_cache
+from typing import Dict, List, Optional
 import io
 
 
+# Paragraph styles added to ReportLab's sample stylesheet: name -> (parent, attributes).
+CUSTOM_STYLES = {
+    'CustomTitle': ('Heading1', {
+        'fontSize': 24,
+        'textColor': colors.HexColor('#2c3e50'),
+        'spaceAfter': 30,
+        'alignment': TA_CENTER
+    }),
+    'SectionHeader': ('Heading2', {
+        'fontSize': 16,
+        'textColor': colors.HexColor('#34495e'),
+        'spaceAfter': 12,
+        'spaceBefore': 20
+    }),
+    'SubSection': ('Heading3', {
+        'fontSize': 12,
+        'textColor': colors.HexColor('#7f8c8d'),
+        'spaceAfter': 8,
+        'spaceBefore': 12
+    }),
+    'BodyText': ('Normal', {
+        'fontSize': 10,
+        'spaceAfter': 6,
+        'alignment': TA_JUSTIFY
+    }),
+    'Footer': ('Normal', {
+        'fontSize': 8,
+        'alignment': TA_CENTER,
+        'textColor': colors.grey
+    })
+}
+
+# Styles are never modified after they are built, so every report (and
+# every thread) shares them.
+SUMMARY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
+    ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+])
+SIMPLE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('FONTSIZE', (0, 1), (-1, -1), 10),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+    ('TOPPADDING', (0, 0), (-1, -1), 8),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey)
+])
+SUMMARY_COLUMN_WIDTHS = [2*inch, 1.5*inch, 2.5*inch]
+SIMPLE_COLUMN_WIDTHS = [3*inch, 3*inch]
+
+
+@lru_cache(maxsize=1)
+def build_stylesheet() -> StyleSheet1:
+    """ReportLab's sample stylesheet plus ``CUSTOM_STYLES``, built once per process."""
+    styles = getSampleStyleSheet()
+    for name, (parent, attributes) in CUSTOM_STYLES.items():
+        if name not in styles.byName:
+            styles.add(ParagraphStyle(name=name, parent=styles[parent], **attributes))
+    return styles
+
+
 class PDFReportGenerator:
     def __init__(self):
-        pass
+        self.styles = build_stylesheet()
     
     def _get_styles(self):
-        styles = getSampleStyleSheet()
-        self._setup_custom_styles(styles)
-        # Double-check that all required styles exist
-        self._ensure_custom_styles(styles)
-        return styles
-    
-    def _ensure_custom_styles(self, styles):
-        """Force ensure all custom styles exist"""
-        custom_styles = {
-            'CustomTitle': {
-                'parent': styles['Heading1'],
-                'fontSize': 24,
-                'textColor': colors.HexColor('#2c3e50'),
-                'spaceAfter': 30,
-                'alignment': TA_CENTER
-            },
-            'SectionHeader': {
-                'parent': styles['Heading2'],
-                'fontSize': 16,
-                'textColor': colors.HexColor('#34495e'),
-                'spaceAfter': 12,
-                'spaceBefore': 20
-            },
-            'SubSection': {
-                'parent': styles['Heading3'],
-                'fontSize': 12,
-                'textColor': colors.HexColor('#7f8c8d'),
-                'spaceAfter': 8,
-                'spaceBefore': 12
-            },
-            'BodyText': {
-                'parent': styles['Normal'],
-                'fontSize': 10,
-                'spaceAfter': 6,
-                'alignment': TA_JUSTIFY
-            }
-        }
-        
-        for name, style_params in custom_styles.items():
-            if name not in styles.byName:
-                style = ParagraphStyle(name=name, **style_params)
-                try:
-                    styles.add(style)
-                except KeyError:
-                    # If it already exists, that's fine
-                    pass
+        return self.styles
     
-    def _setup_custom_styles(self, styles):
-        custom_styles = {
-            'CustomTitle': {
-                'parent': styles['Heading1'],
-                'fontSize': 24,
-                'textColor': colors.HexColor('#2c3e50'),
-                'spaceAfter': 30,
-                'alignment': TA_CENTER
-            },
-            'SectionHeader': {
-                'parent': styles['Heading2'],
-                'fontSize': 16,
-                'textColor': colors.HexColor('#34495e'),
-                'spaceAfter': 12,
-                'spaceBefore': 20
-            },
-            'SubSection': {
-                'parent': styles['Heading3'],
-                'fontSize': 12,
-                'textColor': colors.HexColor('#7f8c8d'),
-                'spaceAfter': 8,
-                'spaceBefore': 12
-            },
-            'BodyText': {
-                'parent': styles['Normal'],
-                'fontSize': 10,
-                'spaceAfter': 6,
-                'alignment': TA_JUSTIFY
-            }
-        }
+    def generate_pdf(self, report_data: Dict, output=None) -> Optional[bytes]:
+        """Render a report and return the PDF bytes.
         
-        for name, style_params in custom_styles.items():
-            # Check if style exists using byName dictionary
-            if name not in styles.byName:
-                style = ParagraphStyle(name=name, **style_params)
-                try:
-                    styles.add(style)
-                except KeyError:
-                    # Style might have been added by another thread/instance
-                    # Verify it exists now
-                    if name not in styles.byName:
-                        raise
-    
-    def generate_pdf(self, report_data: Dict) -> bytes:
-        styles = self._get_styles()
+        With ``output`` (a file path or a binary file-like object) the PDF
+        is written there instead and nothing is returned, which saves
+        holding a second copy of every report when exporting many of them.
+        """
+        styles = self.styles
         
-        buffer = io.BytesIO()
+        buffer = io.BytesIO() if output is None else output
         doc = SimpleDocTemplate(buffer, pagesize=letter,
                               rightMargin=72, leftMargin=72,
                               topMargin=72, bottomMargin=18)
@@ -138,17 +126,7 @@ class PDFReportGenerator:
             ['Unique Colors', str(analysis.get('colors', {}).get('unique_colors', 0)), '']
         ]
         
-        summary_table = Table(summary_data, colWidths=[2*inch, 1.5*inch, 2.5*inch])
-        summary_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.HexColor('#ecf0f1')),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-        ]))
+        summary_table = Table(summary_data, colWidths=SUMMARY_COLUMN_WIDTHS, style=SUMMARY_TABLE_STYLE)
         
         story.append(summary_table)
         story.append(Spacer(1, 0.3*inch))
@@ -184,6 +162,8 @@ class PDFReportGenerator:
         spacing_metrics = [
             ['Metric', 'Value'],
             ['Spacing Consistency', f"{spacing.get('spacing_consistency', 0):.2f}"],
+            ['Nearest Gap Consistency', f"{spacing.get('nearest_gap_consistency', 0):.2f}"],
+            ['Median Nearest Gap', f"{spacing.get('median_nearest_gap', 0):.1f} px"],
             ['Whitespace Ratio', f"{spacing.get('whitespace_ratio', 0):.2f}"],
             ['Element Density', f"{spacing.get('element_density', 0):.2f}"]
         ]
@@ -248,29 +228,14 @@ class PDFReportGenerator:
                     story.append(Spacer(1, 0.1*inch))
         
         story.append(Spacer(1, 0.3*inch))
-        story.append(Paragraph("<i>Report generated by AI UX/UI Design Assistant</i>", 
-                             ParagraphStyle(name='Footer', parent=styles['Normal'], 
-                                          fontSize=8, alignment=TA_CENTER, 
-                                          textColor=colors.grey)))
+        story.append(Paragraph("<i>Report generated by AI UX/UI Design Assistant</i>", styles['Footer']))
         
         doc.build(story)
-        buffer.seek(0)
-        return buffer.getvalue()
+        if output is None:
+            return buffer.getvalue()
     
     def _create_simple_table(self, data):
-        table = Table(data, colWidths=[3*inch, 3*inch])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#34495e')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 11),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 1, colors.grey)
-        ]))
-        return table
+        return Table(data, colWidths=SIMPLE_COLUMN_WIDTHS, style=SIMPLE_TABLE_STYLE)
     
     def _get_score_description(self, score):
         if score >= 0.8:
@@ -0,0 +1,336 @@
+import argparse
+import heapq
+import json
+import tempfile
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List
+from xml.sax.saxutils import escape
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.platypus import BaseDocTemplate, Frame, PageBreak, PageTemplate, Paragraph, Spacer, Table
+from reportlab.platypus.tableofcontents import TableOfContents
+
+try:
+    from .batch import iter_records
+    from .pdf_report_generator import (SIMPLE_COLUMN_WIDTHS, SIMPLE_TABLE_STYLE, SUMMARY_COLUMN_WIDTHS,
+                                       SUMMARY_TABLE_STYLE, PDFReportGenerator, build_stylesheet)
+except ImportError:
+    from batch import iter_records
+    from pdf_report_generator import (SIMPLE_COLUMN_WIDTHS, SIMPLE_TABLE_STYLE, SUMMARY_COLUMN_WIDTHS,
+                                      SUMMARY_TABLE_STYLE, PDFReportGenerator, build_stylesheet)
+
+# Screens listed per category in the "worst offenders" summary.
+WORST_OFFENDERS = 5
+# Suggestions printed per screen, most urgent first.
+SUGGESTIONS_PER_SCREEN = 5
+# (category, label, path into the analysis) of the scores compared across screens.
+SCORE_CATEGORIES = (
+    ('overall', 'Overall Score', ('overall_score',)),
+    ('grid', 'Grid Score', ('layout', 'grid_score')),
+    ('alignment', 'Alignment Score', ('layout', 'alignment_score')),
+    ('symmetry', 'Symmetry Score', ('layout', 'symmetry_score')),
+    ('contrast', 'Contrast Score', ('colors', 'contrast_score')),
+    ('spacing', 'Spacing Consistency', ('spacing', 'spacing_consistency')),
+)
+# Lower bounds of the score bands, as worded by PDFReportGenerator.
+SCORE_BANDS = ((0.8, 'Excellent'), (0.6, 'Good'), (0.4, 'Fair'), (0.0, 'Needs Improvement'))
+PRIORITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+
+def _lookup(analysis: Dict, path) -> float:
+    value = analysis
+    for key in path:
+        value = value.get(key, {}) if isinstance(value, dict) else {}
+    return float(value) if isinstance(value, (int, float)) else 0.0
+
+
+def screen_summary(record: Dict, index: int) -> Dict:
+    """The part of an analysis record a portfolio section needs (no element lists or histograms)."""
+    analysis = record.get('analysis', {})
+    suggestions = sorted(record.get('suggestions', []), key=lambda s: PRIORITY_ORDER.get(s.get('priority'), 3))
+    return {
+        'name': record.get('image_path') or analysis.get('image_path') or f"Screen {index}",
+        'scores': {category: _lookup(analysis, path) for category, _, path in SCORE_CATEGORIES},
+        'layout_type': analysis.get('layout', {}).get('layout_type', 'N/A'),
+        'total_elements': analysis.get('elements', {}).get('total_elements', 0),
+        'unique_colors': analysis.get('colors', {}).get('unique_colors', 0),
+        'whitespace_ratio': analysis.get('spacing', {}).get('whitespace_ratio', 0),
+        'suggestions': [
+            {'priority': s.get('priority', 'low'), 'category': s.get('category', 'general'), 'message': s.get('message', '')}
+            for s in suggestions[:SUGGESTIONS_PER_SCREEN]
+        ]
+    }
+
+
+class CorpusSummary:
+    """Score statistics over every screen, kept in memory independent of the number of screens."""
+    
+    def __init__(self, worst_count: int = WORST_OFFENDERS):
+        self.worst_count = worst_count
+        self.screens = 0
+        self.total = 0.0
+        self.lowest = None
+        self.highest = None
+        self.bands = {label: 0 for _, label in SCORE_BANDS}
+        # per category a max-heap (by negated score) of the worst screens seen so far
+        self.worst = {category: [] for category, _, _ in SCORE_CATEGORIES}
+    
+    def add(self, summary: Dict):
+        score = summary['scores']['overall']
+        self.screens += 1
+        self.total += score
+        self.lowest = score if self.lowest is None else min(self.lowest, score)
+        self.highest = score if self.highest is None else max(self.highest, score)
+        self.bands[next(label for bound, label in SCORE_BANDS if score >= bound)] += 1
+        for category, heap in self.worst.items():
+            entry = (-summary['scores'][category], -self.screens, summary['name'])
+            if len(heap) < self.worst_count:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
+    
+    def worst_screens(self, category: str) -> List:
+        """``(score, name)`` of the lowest scoring screens in ``category``, worst first."""
+        return [(-score, name) for score, _, name in sorted(self.worst[category], reverse=True)]
+
+
+class LazyStory:
+    """Story whose flowables are produced while the document is built, so they never all exist at once.
+    
+    ReportLab's ``build`` consumes a story through ``len``, indexing,
+    slicing, ``del`` and ``insert`` at its front; this class supports those
+    on a small buffer refilled from ``make_tail()`` a section at a time.
+    ``story[:]``, which ``multiBuild`` uses to start every pass, returns a
+    fresh story with a new tail. Iterating yields only ``head``, which is
+    where ``multiBuild`` looks for indexing flowables (the table of
+    contents).
+    """
+    
+    def __init__(self, head: List, make_tail: Callable[[], Iterator[List]]):
+        self.head = head
+        self.make_tail = make_tail
+        self._buffer = list(head)
+        self._tail = make_tail()
+    
+    def _fill(self, count: int):
+        while len(self._buffer) < count and self._tail is not None:
+            section = next(self._tail, None)
+            if section is None:
+                self._tail = None
+            else:
+                self._buffer.extend(section)
+    
+    def __iter__(self):
+        return iter(self.head)
+    
+    def __len__(self) -> int:
+        self._fill(1)
+        return len(self._buffer)
+    
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            if key.start is None and key.stop is None:
+                return LazyStory(self.head, self.make_tail)
+            self._fill(key.stop or 0)
+            return self._buffer[key]
+        self._fill(key + 1)
+        return self._buffer[key]
+    
+    def __setitem__(self, key, value):
+        self._buffer[key] = value
+    
+    def __delitem__(self, key):
+        if isinstance(key, slice):
+            self._fill(key.stop or 0)
+        self._buffer.__delitem__(key)
+    
+    def insert(self, index: int, flowable):
+        self._buffer.insert(index, flowable)
+
+
+class _StreamingCanvas(Canvas):
+    """Canvas that compresses every page as soon as it is finished.
+    
+    ``Canvas`` keeps the content of each finished page as text and only
+    compresses it when the file is saved; for a long document those page
+    streams are most of the memory the build needs.
+    """
+    
+    def showPage(self):
+        super().showPage()
+        page = self._doc.Pages.pages[-1]
+        dictionary = pdfdoc.PDFDictionary({'Filter': pdfdoc.PDFArray([pdfdoc.PDFName(pdfdoc.PDFZCompress.pdfname)])})
+        page.Contents = pdfdoc.PDFStream(dictionary, pdfdoc.PDFZCompress.encode(page.stream))
+        page.stream = None
+
+
+class _PortfolioDocTemplate(BaseDocTemplate):
+    def __init__(self, output, **kwargs):
+        super().__init__(output, **kwargs)
+        frame = Frame(self.leftMargin, self.bottomMargin, self.width, self.height, id='normal')
+        self.addPageTemplates([PageTemplate(id='page', frames=[frame], onPage=self._draw_page_number)])
+    
+    @staticmethod
+    def _draw_page_number(canvas, doc):
+        canvas.setFont('Helvetica', 8)
+        canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, 0.5 * inch, str(doc.page))
+    
+    def afterFlowable(self, flowable):
+        # section and screen headings feed the table of contents and the PDF outline
+        level = getattr(flowable, 'toc_level', None)
+        if level is None:
+            return
+        text = flowable.getPlainText()
+        key = f"section-{self.seq.nextf('portfolio-section')}"
+        self.canv.bookmarkPage(key)
+        self.canv.addOutlineEntry(text, key, level=level, closed=level > 0)
+        self.notify('TOCEntry', (level, text, self.page, key))
+
+
+class PortfolioReportGenerator:
+    """One PDF report over many analyses: contents, corpus summary, then a section per screen.
+    
+    ``generate_pdf`` reads the records once, keeping only a
+    ``screen_summary`` of each in a temporary spool file and the
+    ``CorpusSummary`` in memory. ReportLab then builds the document from a
+    ``LazyStory`` that renders the sections from the spool as pages are
+    laid out, in as many passes as the table of contents needs to settle
+    (usually two or three), so the flowables of at most a few screens
+    exist at a time. Only the finished, compressed page streams
+    accumulate until the file is written.
+    """
+    
+    def __init__(self, title: str = "Design Review Portfolio", worst_count: int = WORST_OFFENDERS):
+        self.title = title
+        self.worst_count = worst_count
+        self.styles = build_stylesheet()
+        self.toc_levels = [
+            ParagraphStyle(name='TOCLevel0', parent=self.styles['Normal'], fontName='Helvetica-Bold',
+                           fontSize=11, leading=16),
+            ParagraphStyle(name='TOCLevel1', parent=self.styles['Normal'], fontSize=9, leading=12,
+                           leftIndent=16)
+        ]
+        self._describe = PDFReportGenerator()._get_score_description
+    
+    def _heading(self, text: str, style: ParagraphStyle, level: int) -> Paragraph:
+        paragraph = Paragraph(text, style)
+        paragraph.toc_level = level
+        return paragraph
+    
+    def _front_matter(self, corpus: CorpusSummary, skipped: int) -> List:
+        styles = self.styles
+        contents = TableOfContents(levelStyles=self.toc_levels, dotsMinLevel=0)
+        report_date = datetime.now().strftime("%B %d, %Y at %I:%M %p")
+        story = [
+            Paragraph(self.title, styles['CustomTitle']),
+            Paragraph(f"<i>{corpus.screens} screens, generated on {report_date}</i>", styles['BodyText']),
+            Spacer(1, 0.3*inch),
+            Paragraph("Contents", styles['SectionHeader']),
+            contents,
+            PageBreak(),
+            self._heading("Portfolio Summary", styles['SectionHeader'], 0),
+        ]
+        mean = corpus.total / corpus.screens if corpus.screens else 0.0
+        overview = [
+            ['Screens', str(corpus.screens), f"{skipped} skipped" if skipped else ''],
+            ['Mean Score', f"{mean:.2f}/1.0", self._describe(mean)],
+            ['Lowest Score', f"{corpus.lowest or 0:.2f}/1.0", ''],
+            ['Highest Score', f"{corpus.highest or 0:.2f}/1.0", '']
+        ]
+        story.append(Table(overview, colWidths=SUMMARY_COLUMN_WIDTHS, style=SUMMARY_TABLE_STYLE))
+        story.append(Spacer(1, 0.2*inch))
+        
+        story.append(Paragraph("Score Distribution", styles['SubSection']))
+        distribution = [['Overall Score', 'Screens']]
+        for bound, label in SCORE_BANDS:
+            count = corpus.bands[label]
+            share = count / corpus.screens if corpus.screens else 0.0
+            distribution.append([f"{label} (from {bound:.1f})", f"{count} ({share:.0%})"])
+        story.append(Table(distribution, colWidths=SIMPLE_COLUMN_WIDTHS, style=SIMPLE_TABLE_STYLE))
+        story.append(Spacer(1, 0.2*inch))
+        
+        story.append(Paragraph("Worst Offenders", styles['SubSection']))
+        worst = [['Category', 'Screen', 'Score']]
+        for category, label, _ in SCORE_CATEGORIES:
+            for rank, (score, name) in enumerate(corpus.worst_screens(category)):
+                worst.append([label if rank == 0 else '', Paragraph(escape(name), styles['Normal']), f"{score:.2f}"])
+        story.append(Table(worst, colWidths=[1.8*inch, 3.4*inch, 0.8*inch], style=SIMPLE_TABLE_STYLE,
+                           repeatRows=1))
+        return story
+    
+    def _screen_section(self, number: int, summary: Dict) -> List:
+        styles = self.styles
+        scores = summary['scores']
+        overall = [
+            ['Overall Score', f"{scores['overall']:.2f}/1.0", self._describe(scores['overall'])],
+            ['Layout Type', str(summary['layout_type']).title(), ''],
+            ['Elements Detected', str(summary['total_elements']), ''],
+            ['Unique Colors', str(summary['unique_colors']), '']
+        ]
+        metrics = [['Metric', 'Score']]
+        metrics += [[label, f"{scores[category]:.2f}"] for category, label, _ in SCORE_CATEGORIES[1:]]
+        metrics.append(['Whitespace Ratio', f"{summary['whitespace_ratio']:.2f}"])
+        story = [
+            PageBreak(),
+            # no keepWithNext: the page break already keeps the heading with its section, and
+            # ReportLab remembers every keepWithNext flowable until the build finishes
+            self._heading(f"{number}. {escape(summary['name'])}", styles['SectionHeader'], 1),
+            Table(overall, colWidths=SUMMARY_COLUMN_WIDTHS, style=SUMMARY_TABLE_STYLE),
+            Spacer(1, 0.2*inch),
+            Table(metrics, colWidths=SIMPLE_COLUMN_WIDTHS, style=SIMPLE_TABLE_STYLE),
+            Spacer(1, 0.2*inch),
+            Paragraph("Top Suggestions", styles['SubSection'])
+        ]
+        for i, suggestion in enumerate(summary['suggestions'], 1):
+            category = suggestion['category'].replace('_', ' ').title()
+            story.append(Paragraph(f"<b>{i}. [{category}] ({suggestion['priority']})</b> {escape(suggestion['message'])}",
+                                   styles['BodyText']))
+        if not summary['suggestions']:
+            story.append(Paragraph("No specific suggestions at this time.", styles['BodyText']))
+        return story
+    
+    def generate_pdf(self, records: Iterable[Dict], output) -> Dict:
+        """Write the portfolio of ``records`` (batch result records) to ``output``, a path or binary file.
+        
+        Records without an ``analysis`` or with a status other than
+        ``'ok'`` are skipped. Returns counts of screens, skipped records,
+        pages and build passes.
+        """
+        corpus = CorpusSummary(self.worst_count)
+        skipped = 0
+        with tempfile.TemporaryFile('w+', encoding='utf-8') as spool:
+            for record in records:
+                if record.get('status', 'ok') != 'ok' or 'analysis' not in record:
+                    skipped += 1
+                    continue
+                summary = screen_summary(record, corpus.screens + 1)
+                corpus.add(summary)
+                spool.write(json.dumps(summary, default=str) + "\n")
+            
+            def sections():
+                spool.seek(0)
+                for number, line in enumerate(spool, 1):
+                    yield self._screen_section(number, json.loads(line))
+            
+            doc = _PortfolioDocTemplate(output, pagesize=letter, rightMargin=72, leftMargin=72,
+                                        topMargin=72, bottomMargin=54, title=self.title)
+            passes = doc.multiBuild(LazyStory(self._front_matter(corpus, skipped), sections),
+                                    canvasmaker=_StreamingCanvas)
+        return {'screens': corpus.screens, 'skipped': skipped, 'pages': doc.page, 'passes': passes}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render a portfolio PDF from batch results.",
+                                     usage="python portfolio_report.py results.jsonl [-o portfolio.pdf]")
+    parser.add_argument('results', help="JSONL file written by main.py --batch")
+    parser.add_argument('-o', '--output', default="portfolio.pdf")
+    parser.add_argument('--title', default="Design Review Portfolio")
+    args = parser.parse_args()
+    
+    result = PortfolioReportGenerator(title=args.title).generate_pdf(iter_records(args.results), args.output)
+    print(f"Portfolio written to: {args.output} ({result['screens']} screens, {result['pages']} pages, "
+          f"{result['skipped']} skipped)")
@@ -0,0 +1,200 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Optional
+
+
+class _NullSpan:
+    __slots__ = ()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullProfiler:
+    """Profiler used when instrumentation is off; every span is a shared no-op."""
+    
+    enabled = False
+    
+    def span(self, name: str) -> _NullSpan:
+        return _NULL_SPAN
+    
+    def stop(self):
+        pass
+    
+    def summary(self) -> Dict:
+        return {}
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class _Span:
+    __slots__ = ('profiler', 'name', 'path', 'parent', 'start', 'cpu_start', 'mem_start', 'peak')
+    
+    def __init__(self, profiler: 'Profiler', name: str):
+        self.profiler = profiler
+        self.name = name
+    
+    def __enter__(self):
+        profiler = self.profiler
+        stack = profiler._stack()
+        self.parent = stack[-1] if stack else None
+        self.path = f"{self.parent.path}/{self.name}" if self.parent else self.name
+        if profiler.track_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # the enclosing span keeps the peak reached so far before it is reset
+            if self.parent is not None:
+                self.parent.peak = max(self.parent.peak, peak)
+            tracemalloc.reset_peak()
+            self.mem_start = current
+            self.peak = current
+        stack.append(self)
+        self.cpu_start = time.thread_time()
+        self.start = time.perf_counter()
+        return self
+    
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        cpu = time.thread_time() - self.cpu_start
+        profiler = self.profiler
+        profiler._stack().pop()
+        record = {
+            'name': self.name,
+            'path': self.path,
+            'start': self.start - profiler.origin,
+            'wall': end - self.start,
+            'cpu': cpu,
+            'thread': threading.get_ident()
+        }
+        if profiler.track_memory:
+            self.peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            record['peak_bytes'] = self.peak - self.mem_start
+            if self.parent is not None:
+                self.parent.peak = max(self.parent.peak, self.peak)
+        profiler._finish(record)
+        return False
+
+
+class Profiler:
+    """Collects nested wall-time, CPU-time and allocation spans.
+    
+    Spans nest per thread, so ``analyze_layout/lines`` is recorded under the
+    stage that opened it, and stages running on pool threads stay top-level.
+    CPU time is the calling thread's. With
+    ``track_memory`` the peak of ``tracemalloc``-traced allocations is
+    recorded per span; tracing is started if needed and slows the analysis
+    down noticeably, so it is off by default. ``tracemalloc`` only sees
+    memory allocated through Python's allocator: NumPy arrays, including
+    the ones OpenCV returns, but not the ``cv::Mat`` buffers OpenCV
+    allocates for itself while a call runs. ``peak_mb`` is therefore a
+    lower bound, not the process's real peak. ``tracemalloc`` has a single
+    process-wide peak, so per-span peaks are only approximate while spans
+    run concurrently.
+    
+    Every ``hook`` is called with the finished span record, which makes it
+    easy to forward stage timings to logs or metrics.
+    """
+    
+    enabled = True
+    
+    def __init__(self, track_memory: bool = False, hooks: Optional[Iterable[Callable[[Dict], None]]] = None):
+        self.track_memory = track_memory
+        self.hooks = list(hooks or [])
+        self.records: List[Dict] = []
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._started_tracing = False
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+    
+    def _stack(self) -> List[_Span]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+    
+    def _finish(self, record: Dict):
+        with self._lock:
+            self.records.append(record)
+        for hook in self.hooks:
+            hook(record)
+    
+    def span(self, name: str) -> _Span:
+        return _Span(self, name)
+    
+    def stop(self):
+        """Stop ``tracemalloc`` if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+    
+    def summary(self) -> Dict:
+        """Per-path totals in milliseconds (and MB), the ``timings`` block of an analysis."""
+        stages = {}
+        for record in sorted(self.records, key=lambda r: r['start']):
+            entry = stages.setdefault(record['path'], {'wall_ms': 0.0, 'cpu_ms': 0.0, 'calls': 0})
+            entry['wall_ms'] += record['wall'] * 1000
+            entry['cpu_ms'] += record['cpu'] * 1000
+            entry['calls'] += 1
+            if 'peak_bytes' in record:
+                entry['peak_mb'] = max(entry.get('peak_mb', 0.0), record['peak_bytes'] / 2 ** 20)
+        for entry in stages.values():
+            for key in ('wall_ms', 'cpu_ms', 'peak_mb'):
+                if key in entry:
+                    entry[key] = round(entry[key], 3)
+        # elapsed time from the first span start to the last span end, which
+        # stays correct when stages overlap on several threads
+        total = 0.0
+        if self.records:
+            total = max(r['start'] + r['wall'] for r in self.records) - min(r['start'] for r in self.records)
+        return {
+            'total_ms': round(total * 1000, 3),
+            'stages': stages
+        }
+    
+    def chrome_trace(self) -> Dict:
+        """Spans in the Chrome trace event format (chrome://tracing, Perfetto, speedscope)."""
+        pid = os.getpid()
+        events = []
+        for record in self.records:
+            args = {'cpu_ms': round(record['cpu'] * 1000, 3)}
+            if 'peak_bytes' in record:
+                args['peak_mb'] = round(record['peak_bytes'] / 2 ** 20, 3)
+            events.append({
+                'name': record['name'],
+                'cat': record['path'].split('/')[0],
+                'ph': 'X',
+                'ts': round(record['start'] * 1e6, 1),
+                'dur': round(record['wall'] * 1e6, 1),
+                'pid': pid,
+                'tid': record['thread'],
+                'args': args
+            })
+        events.sort(key=lambda e: (e['tid'], e['ts']))
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+    
+    def write_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+    
+    def collapsed_stacks(self) -> str:
+        """Self time per stack in the folded format read by flamegraph.pl and speedscope."""
+        self_us = {}
+        for record in self.records:
+            self_us[record['path']] = self_us.get(record['path'], 0.0) + record['wall'] * 1e6
+        for record in self.records:
+            parent = record['path'].rpartition('/')[0]
+            if parent:
+                self_us[parent] = self_us.get(parent, 0.0) - record['wall'] * 1e6
+        return "\n".join(f"{path.replace('/', ';')} {max(int(us), 0)}" for path, us in self_us.items()) + "\n"
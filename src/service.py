@@ -0,0 +1,460 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    from .analysis_cache import AnalysisCache
+    from .config import MAX_IMAGE_PIXELS, MAX_IMAGE_SIZE
+    from .element_list import json_default
+    from .pdf_report_generator import PDFReportGenerator
+    from .suggestion_generator import SuggestionGenerator
+    from .ui_analyzer import UIAnalyzer
+except ImportError:
+    from analysis_cache import AnalysisCache
+    from config import MAX_IMAGE_PIXELS, MAX_IMAGE_SIZE
+    from element_list import json_default
+    from pdf_report_generator import PDFReportGenerator
+    from suggestion_generator import SuggestionGenerator
+    from ui_analyzer import UIAnalyzer
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Lower values are served first.
+PRIORITIES = {'interactive': 0, 'batch': 1}
+DEFAULT_QUEUE_SIZE = 64
+# Share of the queue batch jobs may not take, so interactive requests are
+# still admitted while a batch client keeps the queue full.
+INTERACTIVE_RESERVE = 0.25
+# Seconds a job may wait and run unless the request asks for less.
+DEFAULT_DEADLINE = 120.0
+# Weight of the newest job in the running mean of service times.
+SERVICE_TIME_SMOOTHING = 0.2
+MAX_HEADER_BYTES = 16 * 1024
+
+# Job kinds and the content type of their responses.
+JOB_KINDS = {'/analyze': ('analyze', 'application/json'), '/report': ('report', 'application/pdf')}
+
+_worker_analyzer = None
+_worker_generator = None
+
+
+class ServiceOverloadedError(Exception):
+    """The job was not admitted; ``retry_after`` is the suggested wait in seconds."""
+    
+    def __init__(self, message: str, retry_after: int = 1):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class DeadlineExceededError(Exception):
+    """The job's deadline passed before it finished."""
+
+
+class _HttpError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[Dict] = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def _init_worker(use_cache: bool = False, cache_dir: Optional[str] = None,
+                 max_side: Optional[int] = None, memory_budget_mb: Optional[float] = None,
+                 max_pixels: Optional[int] = MAX_IMAGE_PIXELS):
+    global _worker_analyzer, _worker_generator
+    _worker_analyzer = UIAnalyzer(cache=AnalysisCache(cache_dir) if use_cache else None, max_side=max_side,
+                                  memory_budget_mb=memory_budget_mb, max_pixels=max_pixels)
+    _worker_generator = SuggestionGenerator()
+
+
+def run_job(kind: str, data: bytes, name: Optional[str] = None):
+    """Analyze encoded image bytes inside a worker.
+    
+    Returns the analysis record for ``'analyze'`` jobs and the PDF report
+    bytes for ``'report'`` jobs. Unreadable images raise ``ValueError``.
+    """
+    if _worker_analyzer is None:
+        _init_worker()
+    
+    analysis = _worker_analyzer.full_analysis(data, image_path=name)
+    record = {
+        'analysis': analysis,
+        'suggestions': _worker_generator.generate_suggestions(analysis),
+        'wireframe_suggestions': _worker_generator.generate_wireframe_suggestions(analysis)
+    }
+    if kind == 'report':
+        return PDFReportGenerator().generate_pdf(record)
+    return record
+
+
+class Job:
+    __slots__ = ('kind', 'data', 'name', 'priority', 'deadline', 'future', 'queued')
+    
+    def __init__(self, kind: str, data: bytes, name: Optional[str], priority: int, deadline: float,
+                 future: asyncio.Future):
+        self.kind = kind
+        self.data = data
+        self.name = name
+        self.priority = priority
+        self.deadline = deadline
+        self.future = future
+        # still counted in AnalysisService._queued; whoever takes it off first uncounts it
+        self.queued = True
+
+
+class AnalysisService:
+    """Runs analysis jobs from a bounded priority queue on a pool of worker processes.
+    
+    One dispatcher coroutine per worker takes the most urgent job (lowest
+    priority, then oldest) and runs it with ``run_job`` on ``executor``, a
+    ``ProcessPoolExecutor`` of ``workers`` processes by default.
+    
+    Admission control rejects a job with ``ServiceOverloadedError`` when the
+    queue is full (batch jobs leave ``INTERACTIVE_RESERVE`` of it to
+    interactive ones) or when the jobs ahead of it, at the mean service time
+    seen so far, would not finish before its deadline. A job whose deadline
+    passes while queued is dropped without running; one that is already
+    running finishes in its worker, but its result is discarded.
+    
+    If a worker process dies (killed for memory, or crashed in a native
+    decoder), the jobs running on the pool fail and an owned pool is
+    replaced, so later jobs are not affected.
+    """
+    
+    def __init__(self, workers: Optional[int] = None, queue_size: int = DEFAULT_QUEUE_SIZE,
+                 default_deadline: float = DEFAULT_DEADLINE, executor: Optional[Executor] = None,
+                 use_cache: bool = False, cache_dir: Optional[str] = None, max_side: Optional[int] = None,
+                 memory_budget_mb: Optional[float] = None, max_pixels: Optional[int] = MAX_IMAGE_PIXELS):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.default_deadline = default_deadline
+        self.executor = executor
+        self._owns_executor = executor is None
+        self._init_args = (use_cache, cache_dir, max_side, memory_budget_mb, max_pixels)
+        self._queue = None
+        self._dispatchers = []
+        self._sequence = itertools.count()
+        self._queued = {priority: 0 for priority in PRIORITIES.values()}
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.expired = 0
+        self.pool_restarts = 0
+        self.service_time = None
+    
+    def _new_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=self._init_args)
+    
+    def _replace_broken_executor(self, broken: Executor):
+        # every dispatcher with a job on the broken pool gets here; only the first replaces it
+        if self._owns_executor and self.executor is broken:
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.executor = self._new_executor()
+            self.pool_restarts += 1
+    
+    def start(self):
+        """Create the worker pool and dispatchers; must be called inside the event loop."""
+        if self._dispatchers:
+            return
+        if self.executor is None:
+            self.executor = self._new_executor()
+        self._queue = asyncio.PriorityQueue()
+        self._dispatchers = [asyncio.create_task(self._dispatch()) for _ in range(self.workers)]
+    
+    async def close(self):
+        for task in self._dispatchers:
+            task.cancel()
+        await asyncio.gather(*self._dispatchers, return_exceptions=True)
+        self._dispatchers = []
+        if self._owns_executor and self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+    
+    def estimated_wait(self, priority: int) -> float:
+        """Seconds until a new job of ``priority`` would start, from the mean service time."""
+        if self.service_time is None:
+            return 0.0
+        ahead = self.running + sum(count for p, count in self._queued.items() if p <= priority)
+        return max(ahead - self.workers + 1, 0) * self.service_time / self.workers
+    
+    def _admit(self, priority: int, timeout: float):
+        queued = sum(self._queued.values())
+        limit = self.queue_size
+        if priority != PRIORITIES['interactive']:
+            limit -= math.ceil(self.queue_size * INTERACTIVE_RESERVE)
+        retry_after = max(math.ceil(queued * (self.service_time or 1.0) / self.workers), 1)
+        if queued >= limit:
+            raise ServiceOverloadedError("Queue is full", retry_after)
+        if self.service_time is not None and self.estimated_wait(priority) + self.service_time > timeout:
+            raise ServiceOverloadedError("Deadline cannot be met at the current load", retry_after)
+    
+    async def submit(self, kind: str, data: bytes, name: Optional[str] = None,
+                     priority: str = 'interactive', deadline: Optional[float] = None):
+        """Queue a job and wait for its result (see ``run_job``).
+        
+        ``deadline`` is in seconds from now and defaults to
+        ``default_deadline``. Raises ``ServiceOverloadedError`` if the job is
+        not admitted and ``DeadlineExceededError`` if it does not finish in
+        time; errors raised by the job itself are re-raised here.
+        """
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority: {priority}")
+        self.start()
+        timeout = self.default_deadline if deadline is None else deadline
+        level = PRIORITIES[priority]
+        try:
+            self._admit(level, timeout)
+        except ServiceOverloadedError:
+            self.rejected += 1
+            raise
+        
+        loop = asyncio.get_running_loop()
+        job = Job(kind, data, name, level, loop.time() + timeout, loop.create_future())
+        self._queued[level] += 1
+        self._queue.put_nowait((level, next(self._sequence), job))
+        try:
+            return await asyncio.wait_for(asyncio.shield(job.future), timeout)
+        except asyncio.TimeoutError:
+            # a queued job is skipped by the dispatchers once its future is done,
+            # but admission stops counting it now
+            job.future.cancel()
+            self._unqueue(job)
+            self.expired += 1
+            raise DeadlineExceededError(f"No result within {timeout:g}s")
+    
+    def _unqueue(self, job: Job):
+        if job.queued:
+            job.queued = False
+            self._queued[job.priority] -= 1
+    
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            _, _, job = await self._queue.get()
+            self._unqueue(job)
+            if job.future.done() or loop.time() >= job.deadline:
+                continue
+            self.running += 1
+            start = loop.time()
+            executor = self.executor
+            try:
+                try:
+                    future = loop.run_in_executor(executor, run_job, job.kind, job.data, job.name)
+                except BrokenProcessPool:
+                    # the pool broke before this job reached it, so it can run on a new one
+                    self._replace_broken_executor(executor)
+                    executor = self.executor
+                    future = loop.run_in_executor(executor, run_job, job.kind, job.data, job.name)
+                result = await future
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                if isinstance(e, BrokenProcessPool):
+                    self._replace_broken_executor(executor)
+                self.failed += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                self.completed += 1
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self.running -= 1
+                elapsed = loop.time() - start
+                if self.service_time is None:
+                    self.service_time = elapsed
+                else:
+                    self.service_time += SERVICE_TIME_SMOOTHING * (elapsed - self.service_time)
+    
+    def stats(self) -> Dict:
+        return {
+            'workers': self.workers,
+            'queued': {name: self._queued[level] for name, level in PRIORITIES.items()},
+            'running': self.running,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected,
+            'expired': self.expired,
+            'pool_restarts': self.pool_restarts,
+            'service_seconds': round(self.service_time, 4) if self.service_time is not None else None
+        }
+    
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one HTTP/1.1 request and close the connection."""
+        try:
+            try:
+                status, body, content_type, headers = await self._handle_request(reader)
+            except _HttpError as e:
+                status, content_type, headers = e.status, 'application/json', e.headers
+                body = json.dumps({'error': str(e)}).encode('utf-8')
+            writer.write(_encode_response(status, body, content_type, headers))
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+    
+    async def _handle_request(self, reader: asyncio.StreamReader) -> Tuple[int, bytes, str, Dict]:
+        method, target, headers = await _read_head(reader)
+        url = urlsplit(target)
+        if url.path == '/health':
+            if method != 'GET':
+                raise _HttpError(405, "Use GET", {'Allow': 'GET'})
+            return 200, json.dumps(self.stats()).encode('utf-8'), 'application/json', {}
+        if url.path not in JOB_KINDS:
+            raise _HttpError(404, f"Unknown path: {url.path}")
+        if method != 'POST':
+            raise _HttpError(405, "Use POST", {'Allow': 'POST'})
+        
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            length = int(headers.get('content-length', ''))
+        except ValueError:
+            raise _HttpError(411, "Content-Length required")
+        if length < 0:
+            raise _HttpError(400, "Content-Length must not be negative")
+        if length > MAX_IMAGE_SIZE:
+            raise _HttpError(413, f"Image larger than {MAX_IMAGE_SIZE} bytes")
+        priority = query.get('priority', 'interactive')
+        if priority not in PRIORITIES:
+            raise _HttpError(400, f"priority must be one of: {', '.join(PRIORITIES)}")
+        try:
+            deadline = float(query['deadline']) if 'deadline' in query else None
+        except ValueError:
+            deadline = -1
+        if deadline is not None and not deadline > 0:
+            raise _HttpError(400, "deadline must be a positive number of seconds")
+        data = await reader.readexactly(length)
+        
+        kind, content_type = JOB_KINDS[url.path]
+        try:
+            result = await self.submit(kind, data, query.get('name'), priority, deadline)
+        except ServiceOverloadedError as e:
+            raise _HttpError(503, str(e), {'Retry-After': str(e.retry_after)})
+        except DeadlineExceededError as e:
+            raise _HttpError(504, str(e))
+        except ValueError as e:
+            # raised by the decoder for unreadable or oversized images
+            raise _HttpError(422, str(e))
+        except Exception as e:
+            raise _HttpError(500, f"{type(e).__name__}: {e}")
+        if kind == 'report':
+            return 200, result, content_type, {}
+        return 200, json.dumps(result, default=json_default).encode('utf-8'), content_type, {}
+    
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                    unix_socket: Optional[str] = None) -> asyncio.AbstractServer:
+        """Start listening on ``host:port`` or on ``unix_socket`` and return the server."""
+        self.start()
+        if unix_socket:
+            return await asyncio.start_unix_server(self.handle_connection, path=unix_socket)
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Tuple[str, str, Dict[str, str]]:
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.LimitOverrunError:
+        raise _HttpError(431, "Request header too large")
+    if len(head) > MAX_HEADER_BYTES:
+        raise _HttpError(431, "Request header too large")
+    lines = head.decode('latin-1').split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise _HttpError(400, "Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    return method, target, headers
+
+
+def _encode_response(status: int, body: bytes, content_type: str, headers: Dict) -> bytes:
+    head = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}",
+            f"Content-Type: {content_type}",
+            f"Content-Length: {len(body)}",
+            "Connection: close"]
+    head += [f"{key}: {value}" for key, value in headers.items()]
+    return ("\r\n".join(head) + "\r\n\r\n").encode('latin-1') + body
+
+
+async def request(method: str, target: str, body: bytes = b"", host: str = DEFAULT_HOST,
+                  port: int = DEFAULT_PORT, unix_socket: Optional[str] = None) -> Tuple[int, Dict[str, str], bytes]:
+    """Minimal HTTP client for the service; returns ``(status, headers, body)``."""
+    if unix_socket:
+        reader, writer = await asyncio.open_unix_connection(unix_socket)
+    else:
+        reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write((f"{method} {target} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n"
+                      f"Connection: close\r\n\r\n").encode('latin-1') + body)
+        await writer.drain()
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode('latin-1').split("\r\n")
+        status = int(lines[0].split(" ", 2)[1])
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        return status, headers, await reader.readexactly(int(headers.get('content-length', 0)))
+    finally:
+        writer.close()
+
+
+async def _serve_forever(service: AnalysisService, host: str, port: int, unix_socket: Optional[str]):
+    server = await service.serve(host, port, unix_socket)
+    where = unix_socket or f"http://{host}:{port}"
+    print(f"Analysis service listening on {where} with {service.workers} workers", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        description="Serve UI analyses over HTTP.",
+        usage="python service.py [--host HOST] [--port PORT | --socket PATH] [-j N] [--queue-size N]"
+    )
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--socket', help="listen on this Unix socket instead of TCP")
+    parser.add_argument('-j', '--workers', type=int, default=None,
+                        help="worker processes (default: CPU count)")
+    parser.add_argument('--queue-size', type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"jobs waiting for a worker before new ones are refused (default: {DEFAULT_QUEUE_SIZE})")
+    parser.add_argument('--deadline', type=float, default=DEFAULT_DEADLINE,
+                        help=f"seconds a request may take unless it asks for less (default: {DEFAULT_DEADLINE:g})")
+    parser.add_argument('--cache-dir', help="analysis cache directory (default: output/cache)")
+    parser.add_argument('--no-cache', action='store_true', help="always re-run the analysis")
+    parser.add_argument('--max-side', type=int, default=None,
+                        help="run line, alignment and symmetry detection on a copy at most this many pixels long")
+    parser.add_argument('--memory-budget', type=float, default=None, metavar='MB',
+                        help="analyze tall pages in horizontal bands whose working memory fits in MB megabytes")
+    parser.add_argument('--max-pixels', type=int, default=MAX_IMAGE_PIXELS,
+                        help=f"decode larger images at reduced size (default: {MAX_IMAGE_PIXELS})")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_parser().parse_args()
+    service = AnalysisService(workers=args.workers, queue_size=args.queue_size, default_deadline=args.deadline,
+                              use_cache=not args.no_cache, cache_dir=args.cache_dir, max_side=args.max_side,
+                              memory_budget_mb=args.memory_budget, max_pixels=args.max_pixels)
+    try:
+        asyncio.run(_serve_forever(service, args.host, args.port, args.socket))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,217 @@
+import numpy as np
+from typing import List, Tuple
+
+# Upper bound on the number of float64 distances held in memory at once.
+BLOCK_ELEMENTS = 1 << 20
+# Above this many points the all-pairs statistics are estimated from a
+# fixed-size, seeded sample of pairs so that cost stays linear.
+MAX_EXACT_POINTS = 2048
+SAMPLED_PAIRS = 1 << 21
+# Candidates a point may take from its 3x3 block of cells. Points in more
+# crowded blocks (clustered elements) are looked up on a finer grid, so a
+# dense cluster never makes all of its pairs explicit.
+MAX_CELL_CANDIDATES = 64
+# Finest grid, in cells along the longer side; keeps cell keys inside int64.
+MAX_CELLS_PER_AXIS = 1 << 30
+
+
+def pairwise_distance_stats(points: np.ndarray, seed: int = 0) -> Tuple[float, float]:
+    """Mean and standard deviation of the distances between all pairs of points.
+    
+    Exact for up to ``MAX_EXACT_POINTS`` points, computed in row blocks so no
+    more than ``BLOCK_ELEMENTS`` distances exist at a time. Larger inputs use a
+    deterministic random sample of ``SAMPLED_PAIRS`` pairs.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    n = len(points)
+    if n < 2:
+        return 0.0, 0.0
+    
+    if n > MAX_EXACT_POINTS:
+        rng = np.random.default_rng(seed)
+        first = rng.integers(0, n, SAMPLED_PAIRS)
+        second = rng.integers(0, n - 1, SAMPLED_PAIRS)
+        second += second >= first
+        dists = np.hypot(*(points[first] - points[second]).T)
+        return float(dists.mean()), float(dists.std())
+    
+    total = 0.0
+    total_sq = 0.0
+    rows = max(1, BLOCK_ELEMENTS // n)
+    for start in range(0, n - 1, rows):
+        stop = min(start + rows, n)
+        diff = points[start:stop, None, :] - points[None, start:, :]
+        dists = np.hypot(diff[..., 0], diff[..., 1])
+        # keep only pairs (i, j) with j > i
+        dists[:, :stop - start] = np.triu(dists[:, :stop - start], k=1)
+        total += dists.sum()
+        total_sq += np.square(dists).sum()
+    
+    pairs = n * (n - 1) / 2
+    mean = total / pairs
+    variance = max(total_sq / pairs - mean * mean, 0.0)
+    return float(mean), float(np.sqrt(variance))
+
+
+class SpatialGrid:
+    """Adaptive grid hash over 2-D points for nearest-neighbor queries.
+    
+    The cell size is chosen so each cell holds a handful of points on
+    average; a query only inspects the 3x3 block of cells around a point,
+    which keeps the work linear in the number of points. Points whose block
+    holds more than ``MAX_CELL_CANDIDATES`` points (clustered elements) are
+    looked up again on a grid with half the cell size, down to the level
+    where their block is small enough, so dense clusters stay near-linear
+    too. Points with no neighbor inside their block are looked up again on
+    coarser grids. Coincident points are each other's nearest neighbors.
+    """
+    
+    def __init__(self, points: np.ndarray, points_per_cell: float = 4.0):
+        self.points = np.asarray(points, dtype=np.float64)
+        n = len(self.points)
+        self.origin = self.points.min(axis=0) if n else np.zeros(2)
+        extent = (self.points.max(axis=0) - self.origin) if n else np.zeros(2)
+        area = max(float(extent[0]), 1.0) * max(float(extent[1]), 1.0)
+        # the second term keeps cells sensible when all points lie on a line
+        self.cell_size = max(np.sqrt(area * points_per_cell / max(n, 1)),
+                             float(extent.max()) * points_per_cell / max(n, 1), 1.0)
+        # finest cell size whose cell coordinates still fit comfortably in an int64 key
+        self._min_cell_size = float(extent.max()) / MAX_CELLS_PER_AXIS
+    
+    def _level(self, points: np.ndarray, cell_size: float) -> Tuple:
+        cells = np.floor((points - self.origin) / cell_size).astype(np.int64) + 1
+        # one spare column on each side so neighbor keys never wrap around
+        stride = int(cells[:, 1].max()) + 2
+        keys = cells[:, 0] * stride + cells[:, 1]
+        order = np.argsort(keys, kind='stable')
+        return cell_size, cells, stride, order, keys[order]
+    
+    @staticmethod
+    def _block_ranges(level: Tuple, idx: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+        _, cells, stride, _, sorted_keys = level
+        ranges = []
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                keys = (cells[idx, 0] + dx) * stride + cells[idx, 1] + dy
+                ranges.append((np.searchsorted(sorted_keys, keys, 'left'),
+                               np.searchsorted(sorted_keys, keys, 'right')))
+        return ranges
+    
+    @staticmethod
+    def _search_blocks(points: np.ndarray, level: Tuple, idx: np.ndarray, ranges, nearest: np.ndarray,
+                       distance: np.ndarray):
+        # candidates are expanded in chunks of about BLOCK_ELEMENTS pairs
+        order = level[3]
+        sizes = [hi - lo for lo, hi in ranges]
+        ends = np.cumsum(sum(sizes))
+        start = 0
+        while start < len(idx):
+            done = ends[start - 1] if start else 0
+            stop = max(int(np.searchsorted(ends, done + BLOCK_ELEMENTS, 'right')), start + 1)
+            rows = []
+            cols = []
+            for (lo, _), size in zip(ranges, sizes):
+                counts = size[start:stop]
+                total = int(counts.sum())
+                if total == 0:
+                    continue
+                # expand every [lo, hi) range into explicit positions
+                offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                rows.append(np.repeat(idx[start:stop], counts))
+                cols.append(order[np.repeat(lo[start:stop], counts) + offsets])
+            start = stop
+            if not rows:
+                continue
+            rows = np.concatenate(rows)
+            cols = np.concatenate(cols)
+            keep = rows != cols
+            rows, cols = rows[keep], cols[keep]
+            if not len(rows):
+                continue
+            dists = np.hypot(*(points[rows] - points[cols]).T)
+            ranked = np.lexsort((dists, rows))
+            first = np.ones(len(ranked), dtype=bool)
+            first[1:] = rows[ranked[1:]] != rows[ranked[:-1]]
+            best = ranked[first]
+            better = dists[best] < distance[rows[best]]
+            nearest[rows[best][better]] = cols[best][better]
+            distance[rows[best][better]] = dists[best][better]
+    
+    def _nearest_unique(self, points: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        n = len(points)
+        nearest = np.full(n, -1, dtype=np.int64)
+        distance = np.full(n, np.inf)
+        levels = []
+        # points missed on each level: their neighbor may lie outside the block
+        missed = []
+        pending = np.arange(n)
+        cell_size = self.cell_size
+        while len(pending):
+            level = self._level(points, cell_size)
+            levels.append(level)
+            ranges = self._block_ranges(level, pending)
+            finest = cell_size / 2 < self._min_cell_size
+            small = (sum(hi - lo for lo, hi in ranges) <= MAX_CELL_CANDIDATES) | finest
+            idx = pending[small]
+            self._search_blocks(points, level, idx, [(lo[small], hi[small]) for lo, hi in ranges],
+                                nearest, distance)
+            # a neighbor closer than one cell is guaranteed to be inside the 3x3 block
+            missed.append(idx[distance[idx] > cell_size])
+            pending = pending[~small]
+            cell_size /= 2
+        
+        # A point missed on a level has no neighbor within its cell size, so
+        # it is looked up again on coarser levels, past the starting one for
+        # outliers, until a neighbor is found inside the block. Such points
+        # are isolated at that scale, so few of them share any crowded block.
+        carried = np.empty(0, dtype=np.int64)
+        depth = len(levels) - 1
+        while depth >= 0 or len(carried):
+            if depth < 0:
+                cell_size = levels[0][0] * 2 ** -depth
+                level = self._level(points, cell_size)
+            else:
+                level = levels[depth]
+            if len(carried):
+                self._search_blocks(points, level, carried, self._block_ranges(level, carried), nearest, distance)
+                carried = carried[distance[carried] > level[0]]
+            if depth >= 0:
+                carried = np.concatenate([carried, missed[depth]])
+            depth -= 1
+        return nearest, distance
+    
+    def nearest_neighbors(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Index of and distance to each point's nearest other point."""
+        n = len(self.points)
+        nearest = np.full(n, -1, dtype=np.int64)
+        distance = np.full(n, np.inf)
+        if n < 2:
+            return nearest, distance
+        
+        unique, first, inverse, counts = np.unique(self.points, axis=0, return_index=True, return_inverse=True,
+                                                   return_counts=True)
+        inverse = inverse.reshape(-1)
+        if len(unique) > 1:
+            unique_nearest, unique_distance = self._nearest_unique(unique)
+            nearest = first[unique_nearest[inverse]]
+            distance = unique_distance[inverse]
+        
+        # each copy of a repeated point takes the next copy as its neighbor
+        by_point = np.argsort(inverse, kind='stable')
+        group = inverse[by_point]
+        start = (np.cumsum(counts) - counts)[group]
+        following = np.arange(1, n + 1)
+        following = np.where(following < start + counts[group], following, start)
+        repeated = counts[group] > 1
+        nearest[by_point[repeated]] = by_point[following[repeated]]
+        distance[by_point[repeated]] = 0.0
+        return nearest, distance
+
+
+def box_gaps(boxes: np.ndarray, other: np.ndarray) -> np.ndarray:
+    """Edge-to-edge distance between paired ``(x, y, w, h)`` boxes; 0 when they touch."""
+    boxes = np.asarray(boxes, dtype=np.float64)
+    other = np.asarray(other, dtype=np.float64)
+    dx = np.maximum(boxes[:, 0], other[:, 0]) - np.minimum(boxes[:, 0] + boxes[:, 2], other[:, 0] + other[:, 2])
+    dy = np.maximum(boxes[:, 1], other[:, 1]) - np.minimum(boxes[:, 1] + boxes[:, 3], other[:, 1] + other[:, 3])
+    return np.hypot(np.maximum(dx, 0.0), np.maximum(dy, 0.0))
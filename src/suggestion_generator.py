@@ -1,9 +1,112 @@
-from typing import Dict, List
-import random
+import operator
+import struct
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Analysis metrics rules can test: column name (as in the columnar results
+# and the metrics store) -> (path into the analysis, value when missing).
+RULE_METRICS = {
+    'overall_score': (('overall_score',), 0.5),
+    'grid_score': (('layout', 'grid_score'), 0.0),
+    'alignment_score': (('layout', 'alignment_score'), 0.0),
+    'symmetry_score': (('layout', 'symmetry_score'), 0.0),
+    'contrast_score': (('colors', 'contrast_score'), 0.0),
+    'color_diversity': (('colors', 'color_diversity'), 0.0),
+    'spacing_consistency': (('spacing', 'spacing_consistency'), 0.0),
+    'nearest_gap_consistency': (('spacing', 'nearest_gap_consistency'), 0.0),
+    'median_nearest_gap': (('spacing', 'median_nearest_gap'), 0.0),
+    'whitespace_ratio': (('spacing', 'whitespace_ratio'), 0.0),
+    'element_density': (('spacing', 'element_density'), 0.0)
+}
+# operator functions compare a float or a whole NumPy column alike
+COMPARATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+PRIORITY_RANK = {'high': 3, 'medium': 2, 'low': 1}
+# Added when no rule fires.
+FALLBACK_SUGGESTION = {
+    'type': 'best_practice',
+    'category': 'general',
+    'priority': 'low',
+    'message': "Design looks good! Consider A/B testing to optimize further",
+    'score_impact': 0.05
+}
+
+
+class SuggestionRule(NamedTuple):
+    """One row of the rule table: suggest when ``metric <comparator> threshold``.
+    
+    The message is ``message``, or a template of the generator's
+    ``templates[templates]`` set picked per analysis.
+    """
+    metric: str
+    comparator: str
+    threshold: float
+    type: str
+    category: str
+    priority: str
+    score_impact: float
+    templates: Optional[str] = None
+    message: Optional[str] = None
+
+
+SUGGESTION_RULES = (
+    SuggestionRule('grid_score', '<', 0.5, 'improvement', 'layout', 'high', 0.15, templates='layout'),
+    SuggestionRule('alignment_score', '<', 0.5, 'improvement', 'layout', 'medium', 0.1,
+                   message="Elements could be better aligned for a cleaner look"),
+    SuggestionRule('contrast_score', '<', 0.5, 'accessibility', 'color_scheme', 'high', 0.2, templates='color_scheme'),
+    SuggestionRule('color_diversity', '>', 0.8, 'improvement', 'color_scheme', 'medium', 0.1,
+                   message="Consider reducing the number of colors for a more cohesive design"),
+    SuggestionRule('spacing_consistency', '<', 0.6, 'improvement', 'spacing', 'high', 0.15, templates='spacing'),
+    SuggestionRule('whitespace_ratio', '<', 0.2, 'improvement', 'spacing', 'medium', 0.1,
+                   message="Adding more whitespace could improve readability and visual appeal"),
+    SuggestionRule('overall_score', '<', 0.5, 'best_practice', 'general', 'medium', 0.1, templates='best_practices')
+)
+
+_MASK = 0xffffffffffffffff
+_GOLDEN = 0x9e3779b97f4a7c15
+
+
+def _mix(values):
+    """splitmix64 finalizer, for a ``uint64`` array or a single int alike."""
+    values = ((values ^ (values >> 30)) * 0xbf58476d1ce4e5b9) & _MASK
+    values = ((values ^ (values >> 27)) * 0x94d049bb133111eb) & _MASK
+    return values ^ (values >> 31)
+
+
+def _bits(value: float) -> int:
+    # the float64 bit pattern, as the batch path reads it with .view(np.uint64)
+    return struct.unpack('<Q', struct.pack('<d', value))[0]
+
+
+def _lookup(analysis: Dict, path: Tuple[str, ...]):
+    value = analysis
+    for key in path:
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
 
 
 class SuggestionGenerator:
-    def __init__(self):
+    """Suggestions from a table of ``SuggestionRule``, evaluated over many analyses at once.
+    
+    ``generate_batch`` takes a metric column per rule metric (a structured
+    array from ``metric_table``, or e.g. ``ColumnarResults.column`` arrays)
+    and compares whole columns against each threshold, so regenerating a
+    corpus after ``with_thresholds`` costs one pass of NumPy comparisons.
+    Template messages are picked by hashing the analysis' rule metrics
+    with ``seed``: the same metrics always get the same suggestions, in a
+    batch or through ``generate_suggestions``.
+    """
+    
+    def __init__(self, rules: Sequence[SuggestionRule] = SUGGESTION_RULES, seed: int = 0):
+        for rule in rules:
+            if rule.metric not in RULE_METRICS:
+                raise ValueError(f"unknown rule metric {rule.metric!r}")
+            if rule.comparator not in COMPARATORS:
+                raise ValueError(f"unknown comparator {rule.comparator!r}")
+        self.rules = tuple(rules)
+        self.seed = seed
         self.improvement_templates = {
             'layout': [
                 "Consider using a grid system to improve alignment and consistency",
@@ -59,91 +162,186 @@ class SuggestionGenerator:
             "Provide clear feedback for user actions",
             "Use familiar UI patterns that users recognize"
         ]
+        
+        self.templates = dict(self.improvement_templates, best_practices=self.best_practices)
+        # metrics the rules read, in table order; template choices hash these
+        self.metrics = tuple(dict.fromkeys(rule.metric for rule in self.rules))
+        # rule indices in output order: by priority, then table order
+        self._order = sorted(range(len(self.rules)), key=lambda i: -PRIORITY_RANK[self.rules[i].priority])
+        self._prototypes = self._build_prototypes()
+    
+    def with_thresholds(self, **thresholds: float) -> 'SuggestionGenerator':
+        """A generator with the same seed whose rules on each named metric use the new threshold."""
+        unknown = set(thresholds) - set(self.metrics)
+        if unknown:
+            raise ValueError(f"no rules on {', '.join(sorted(unknown))}")
+        rules = [rule._replace(threshold=thresholds[rule.metric]) if rule.metric in thresholds else rule
+                 for rule in self.rules]
+        return SuggestionGenerator(rules, self.seed)
+    
+    def metric_table(self, analyses: Iterable[Dict]) -> np.ndarray:
+        """Structured float64 array with one row per ``full_analysis`` result and a field per rule metric."""
+        analyses = list(analyses)
+        table = np.empty(len(analyses), dtype=[(name, np.float64) for name in self.metrics])
+        for name in self.metrics:
+            path, default = RULE_METRICS[name]
+            values = [_lookup(analysis, path) for analysis in analyses]
+            table[name] = [default if value is None else value for value in values]
+        return table
+    
+    def _columns(self, metrics) -> Dict[str, np.ndarray]:
+        columns = {}
+        for name in self.metrics:
+            values = np.asarray(metrics[name], dtype=np.float64)
+            # missing values (NaN in columnar results) read as the rule default, like absent keys;
+            # adding 0.0 folds -0.0 into 0.0 so both hash alike
+            columns[name] = np.where(np.isnan(values), RULE_METRICS[name][1], values) + 0.0
+        return columns
+    
+    def _keys(self, columns: Dict[str, np.ndarray], count: int) -> np.ndarray:
+        keys = np.full(count, self.seed & _MASK, dtype=np.uint64)
+        for name in self.metrics:
+            keys = _mix(keys ^ columns[name].view(np.uint64))
+        return keys
+    
+    def _key(self, values: Iterable[float]) -> int:
+        key = self.seed & _MASK
+        for value in values:
+            key = _mix(key ^ _bits(value))
+        return key
+    
+    @staticmethod
+    def _template_index(keys, salt: int, count: int):
+        # keys is a uint64 array (whose arithmetic wraps) or an int from _key; both give the same index
+        return _mix((keys + ((salt + 1) * _GOLDEN & _MASK)) & _MASK) % count
+    
+    def evaluate(self, metrics) -> Tuple[np.ndarray, np.ndarray]:
+        """Which rules fire for each analysis, and the template each would use.
+        
+        ``metrics`` maps every name in ``self.metrics`` to a column of
+        values (a ``metric_table`` array works). Returns ``(fired, choice)``,
+        both ``(analyses, rules)``: ``fired`` is boolean, ``choice`` indexes
+        the rule's template set (0 for rules with a fixed message).
+        """
+        columns = self._columns(metrics)
+        count = len(next(iter(columns.values()))) if columns else 0
+        fired = np.zeros((count, len(self.rules)), dtype=bool)
+        choice = np.zeros((count, len(self.rules)), dtype=np.int64)
+        keys = self._keys(columns, count)
+        for i, rule in enumerate(self.rules):
+            fired[:, i] = COMPARATORS[rule.comparator](columns[rule.metric], rule.threshold)
+            if rule.templates is not None:
+                choice[:, i] = self._template_index(keys, i, len(self.templates[rule.templates]))
+        return fired, choice
+    
+    def _build_prototypes(self) -> List[List[Dict]]:
+        # each rule's possible suggestions, copied into the results
+        prototypes = []
+        for rule in self.rules:
+            messages = self.templates[rule.templates] if rule.templates is not None else [rule.message]
+            prototypes.append([{
+                'type': rule.type,
+                'category': rule.category,
+                'priority': rule.priority,
+                'message': message,
+                'score_impact': rule.score_impact
+            } for message in messages])
+        return prototypes
+    
+    def generate_batch(self, metrics) -> List[List[Dict]]:
+        """``generate_suggestions`` for every row of ``metrics`` (see ``evaluate``)."""
+        fired, choice = self.evaluate(metrics)
+        order = self._order
+        fired, choice = fired[:, order], choice[:, order]
+        prototypes = [self._prototypes[i] for i in order]
+        results = [[] for _ in range(len(fired))]
+        # nonzero walks row by row, and each row's rules in output order
+        rows, slots = np.nonzero(fired)
+        for row, slot, pick in zip(rows.tolist(), slots.tolist(), choice[rows, slots].tolist()):
+            results[row].append(dict(prototypes[slot][pick]))
+        for suggestions in results:
+            if not suggestions:
+                suggestions.append(dict(FALLBACK_SUGGESTION))
+        return results
     
     def generate_suggestions(self, analysis: Dict) -> List[Dict]:
+        """The suggestions ``generate_batch`` gives this analysis, without building arrays for one row."""
+        values = {}
+        for name in self.metrics:
+            path, default = RULE_METRICS[name]
+            value = _lookup(analysis, path)
+            value = default if value is None or value != value else float(value)
+            values[name] = value + 0.0
+        key = self._key(values.values())
+        suggestions = []
+        for i in self._order:
+            rule = self.rules[i]
+            if COMPARATORS[rule.comparator](values[rule.metric], rule.threshold):
+                prototypes = self._prototypes[i]
+                pick = self._template_index(key, i, len(prototypes)) if rule.templates is not None else 0
+                suggestions.append(dict(prototypes[pick]))
+        return suggestions or [dict(FALLBACK_SUGGESTION)]
+    
+    def generate_flow_suggestions(self, flow: Dict) -> List[Dict]:
+        screens = flow.get('screens', [])
+        timeline = flow.get('timeline', [])
         suggestions = []
         
-        layout = analysis.get('layout', {})
-        colors = analysis.get('colors', {})
-        spacing = analysis.get('spacing', {})
-        overall_score = analysis.get('overall_score', 0.5)
-        
-        if layout.get('grid_score', 0) < 0.5:
-            suggestions.append({
-                'type': 'improvement',
-                'category': 'layout',
-                'priority': 'high',
-                'message': random.choice(self.improvement_templates['layout']),
-                'score_impact': 0.15
-            })
-        
-        if layout.get('alignment_score', 0) < 0.5:
+        revisits = len(timeline) - len(screens)
+        if revisits > 0:
             suggestions.append({
                 'type': 'improvement',
-                'category': 'layout',
-                'priority': 'medium',
-                'message': "Elements could be better aligned for a cleaner look",
+                'category': 'user_flow',
+                'priority': 'high' if revisits > 2 else 'medium',
+                'message': f"Users went back to a screen they had already seen {revisits} time(s); "
+                           "consider whether the flow can move forward without backtracking",
                 'score_impact': 0.1
             })
         
-        if colors.get('contrast_score', 0) < 0.5:
+        layout_types = {screen['analysis']['layout']['layout_type'] for screen in screens}
+        if len(layout_types) > 2:
             suggestions.append({
-                'type': 'accessibility',
-                'category': 'color_scheme',
-                'priority': 'high',
-                'message': random.choice(self.improvement_templates['color_scheme']),
-                'score_impact': 0.2
-            })
-        
-        if colors.get('color_diversity', 0) > 0.8:
-            suggestions.append({
-                'type': 'improvement',
-                'category': 'color_scheme',
+                'type': 'best_practice',
+                'category': 'user_flow',
                 'priority': 'medium',
-                'message': "Consider reducing the number of colors for a more cohesive design",
+                'message': f"Screens in this flow use {len(layout_types)} different layouts; "
+                           "keeping one layout makes the flow easier to follow",
                 'score_impact': 0.1
             })
         
-        if spacing.get('spacing_consistency', 0) < 0.6:
-            suggestions.append({
-                'type': 'improvement',
-                'category': 'spacing',
-                'priority': 'high',
-                'message': random.choice(self.improvement_templates['spacing']),
-                'score_impact': 0.15
-            })
+        scores = sorted(screen['analysis']['overall_score'] for screen in screens)
+        if scores:
+            median = scores[len(scores) // 2]
+            weakest = min(screens, key=lambda screen: screen['analysis']['overall_score'])
+            if weakest['analysis']['overall_score'] < median - 0.2:
+                suggestions.append({
+                    'type': 'improvement',
+                    'category': 'user_flow',
+                    'priority': 'high',
+                    'message': f"Screen {weakest['screen'] + 1} (at {weakest['first_seen']:.1f}s) scores well "
+                               "below the rest of the flow",
+                    'score_impact': 0.15
+                })
         
-        if spacing.get('whitespace_ratio', 0) < 0.2:
+        if len(screens) > 7:
             suggestions.append({
                 'type': 'improvement',
-                'category': 'spacing',
+                'category': 'user_flow',
                 'priority': 'medium',
-                'message': "Adding more whitespace could improve readability and visual appeal",
+                'message': self._flow_template(screens),
                 'score_impact': 0.1
             })
         
-        if overall_score < 0.5:
-            suggestions.append({
-                'type': 'best_practice',
-                'category': 'general',
-                'priority': 'medium',
-                'message': random.choice(self.best_practices),
-                'score_impact': 0.1
-            })
-        
-        if not suggestions:
-            suggestions.append({
-                'type': 'best_practice',
-                'category': 'general',
-                'priority': 'low',
-                'message': "Design looks good! Consider A/B testing to optimize further",
-                'score_impact': 0.05
-            })
-        
-        suggestions.sort(key=lambda x: {'high': 3, 'medium': 2, 'low': 1}[x['priority']], reverse=True)
+        suggestions.sort(key=lambda x: PRIORITY_RANK[x['priority']], reverse=True)
         
         return suggestions
     
+    def _flow_template(self, screens: List[Dict]) -> str:
+        # hashed from the screens' scores like analysis templates, so a flow always gets the same one
+        key = self._key(float(screen['analysis']['overall_score']) + 0.0 for screen in screens)
+        templates = self.templates['user_flow']
+        return templates[self._template_index(key, 0, len(templates))]
+    
     def generate_wireframe_suggestions(self, analysis: Dict) -> Dict:
         layout_type = analysis.get('layout', {}).get('layout_type', 'freeform')
         elements = analysis.get('elements', {}).get('total_elements', 0)
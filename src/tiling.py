@@ -0,0 +1,164 @@
+import base64
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Rows shared by neighbouring bands. Elements shorter than this are always
+# seen whole by one band; taller ones are stitched across the seam.
+TILE_OVERLAP = 128
+# Bands are never shorter than this, whatever the memory budget.
+MIN_TILE_HEIGHT = 256
+# Working memory of one band per pixel (grayscale, edges, the closed images
+# of line detection, packed color keys and their sort, symmetry halves).
+# tracemalloc, which only sees the NumPy arrays among these, measures 11-16
+# bytes; the rest is headroom for the temporary cv::Mat buffers OpenCV
+# allocates inside each call, which tracemalloc does not see.
+WORKING_BYTES_PER_PIXEL = 20
+# Boxes this close to a cut edge of a band count as cut by it, since Canny
+# sees a replicated border there instead of the neighbouring rows.
+SEAM_MARGIN = 2
+
+
+class Tile(NamedTuple):
+    """A horizontal band of the page.
+    
+    Rows ``start:end`` are analyzed; only rows ``own_start:own_end`` are
+    counted towards page statistics, so overlapping rows are counted once.
+    """
+    index: int
+    start: int
+    end: int
+    own_start: int
+    own_end: int
+
+
+def tile_height_for_budget(width: int, budget_bytes: float, overlap: int = TILE_OVERLAP) -> int:
+    """Tallest band (without its overlap) whose working set fits in ``budget_bytes``."""
+    rows = int(budget_bytes // (max(width, 1) * WORKING_BYTES_PER_PIXEL))
+    return max(rows - 2 * overlap, MIN_TILE_HEIGHT)
+
+
+def plan_tiles(height: int, tile_height: int, overlap: int = TILE_OVERLAP) -> List[Tile]:
+    """Bands covering ``height`` rows, each extended by ``overlap`` rows on both sides.
+    
+    Band boundaries fall on multiples of ``tile_height``, so an edit that
+    keeps the page height leaves the bands it does not touch unchanged.
+    """
+    tiles = []
+    for index, own_start in enumerate(range(0, height, tile_height)):
+        own_end = min(own_start + tile_height, height)
+        tiles.append(Tile(index, max(own_start - overlap, 0), min(own_end + overlap, height), own_start, own_end))
+    return tiles
+
+
+def encode_array(array: np.ndarray) -> Dict:
+    """JSON-friendly form of a 1-d array for tile records."""
+    array = np.ascontiguousarray(array)
+    return {'dtype': array.dtype.str, 'data': base64.b64encode(array.tobytes()).decode('ascii')}
+
+
+def decode_array(value: Dict) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(value['data']), dtype=np.dtype(value['dtype']))
+
+
+def _cut_edges(tile: Tile, y: int, h: int, page_height: int) -> Tuple[bool, bool]:
+    top = tile.start > 0 and y <= tile.start + SEAM_MARGIN
+    bottom = tile.end < page_height and y + h >= tile.end - SEAM_MARGIN
+    return top, bottom
+
+
+def _contains(outer: np.ndarray, inner: np.ndarray) -> np.ndarray:
+    """Matrix of ``inner[j]`` lying within ``outer[i]`` (give or take ``SEAM_MARGIN``)."""
+    if len(outer) == 0 or len(inner) == 0:
+        return np.zeros((len(outer), len(inner)), dtype=bool)
+    ox, oy, ow, oh = (outer[:, i, None] for i in range(4))
+    ix, iy, iw, ih = (inner[None, :, i] for i in range(4))
+    m = SEAM_MARGIN
+    return (ix >= ox - m) & (iy >= oy - m) & (ix + iw <= ox + ow + m) & (iy + ih <= oy + oh + m)
+
+
+def stitch_elements(tiles: Sequence[Tile], boxes_per_tile: Sequence, areas_per_tile: Sequence,
+                    page_height: int, min_area: float = 0,
+                    trace: Optional[Callable[[Tuple[int, int, int, int], List], Optional[List]]] = None
+                    ) -> Tuple[List[Tuple[int, int, int, int]], List[float]]:
+    """Combine per-band contour boxes (in page coordinates) into the elements of the whole page.
+    
+    Bands pass their significant contours plus every contour touching
+    their top or bottom row, whatever its area. A box that no band edge
+    cuts is kept by the first band that sees it whole. Boxes cut by a seam
+    are grouped with the overlapping cut boxes of the neighbouring band.
+    
+    Within a band the cut outline of an element is open, so neither its
+    area nor what it encloses is known. Each group's box (or the whole box
+    that contains it, when another band saw the element uncut) is handed
+    to ``trace`` with the ``(box, area)`` elements found inside it so far;
+    ``trace`` returns the elements the page really has there, or None to
+    keep the group as a box with the area each band saw in the rows it
+    owns. Without ``trace`` every group is kept that way.
+    """
+    kept_boxes, kept_areas = [], []
+    pieces = []
+    previous = None
+    for tile, boxes, areas in zip(tiles, boxes_per_tile, areas_per_tile):
+        for (x, y, w, h), area in zip(boxes, areas):
+            top, bottom = _cut_edges(tile, y, h, page_height)
+            if top or bottom:
+                owned = min(y + h, tile.own_end) - max(y, tile.own_start)
+                pieces.append((tile.index, (x, y, w, h), area * max(owned, 0) / max(h, 1), top, bottom))
+            elif area > min_area and (previous is None or y + h >= previous.end - SEAM_MARGIN):
+                kept_boxes.append((x, y, w, h))
+                kept_areas.append(area)
+        previous = tile
+    
+    # union-find over cut pieces that meet across a seam
+    parent = list(range(len(pieces)))
+    
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    for i, (tile_i, (xi, yi, wi, hi), _, _, bottom_i) in enumerate(pieces):
+        if not bottom_i:
+            continue
+        for j, (tile_j, (xj, yj, wj, hj), _, top_j, _) in enumerate(pieces):
+            if tile_j == tile_i + 1 and top_j and xi <= xj + wj and xj <= xi + wi and yi <= yj + hj and yj <= yi + hi:
+                parent[find(j)] = find(i)
+    
+    groups = {}
+    for i, (_, (x, y, w, h), share, _, _) in enumerate(pieces):
+        group = groups.setdefault(find(i), [x, y, x + w, y + h, 0.0])
+        group[0], group[1] = min(group[0], x), min(group[1], y)
+        group[2], group[3] = max(group[2], x + w), max(group[3], y + h)
+        group[4] += share
+    stitched = np.array([(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1, _ in groups.values()],
+                        dtype=np.int64).reshape(-1, 4)
+    # a group inside a whole box is that element seen cut from another band,
+    # where the rest of the whole box may have looked like separate elements
+    containers = _contains(np.array(kept_boxes, dtype=np.int64).reshape(-1, 4), stitched)
+    
+    elements = dict(zip(kept_boxes, kept_areas))
+    regions = {}
+    for index, (box, group) in enumerate(zip(stitched, groups.values())):
+        if containers[:, index].any():
+            regions.setdefault(kept_boxes[int(np.argmax(containers[:, index]))], None)
+        else:
+            regions[tuple(int(v) for v in box)] = group[4]
+    for region, area in regions.items():
+        traced = None
+        if trace is not None:
+            boxes = list(elements)
+            inside = _contains(np.array([region], dtype=np.int64), np.array(boxes, dtype=np.int64).reshape(-1, 4))[0]
+            candidates = [(box, elements[box]) for box, hit in zip(boxes, inside) if hit]
+            traced = trace(region, candidates)
+        if traced is None:
+            if area is not None and area > min_area:
+                elements[region] = float(area)
+            continue
+        for box, _ in candidates:
+            del elements[box]
+        elements.update(traced)
+    
+    boxes = sorted(elements, key=lambda b: (b[1], b[0]))
+    return boxes, [elements[box] for box in boxes]
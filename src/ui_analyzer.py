@@ -1,108 +1,321 @@
 import cv2
+import functools
+import hashlib
+import json
+import math
 import numpy as np
 import os
-from typing import Dict, List, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
 from pathlib import Path
 
+try:
+    from .analysis_context import AnalysisContext
+    from .color_stats import ColorStats
+    from .element_list import ElementList
+    from .config import MAX_IMAGE_PIXELS
+    from .image_io import (decode_image_bytes, detect_device_pixel_ratio, is_path, read_image_bytes,
+                           read_image_file, read_image_size)
+    from .palette import extract_palette
+    from .profiling import NULL_PROFILER, Profiler
+    from .spatial_index import SpatialGrid, box_gaps, pairwise_distance_stats
+    from .tiling import (SEAM_MARGIN, TILE_OVERLAP, Tile, decode_array, encode_array, plan_tiles,
+                         stitch_elements, tile_height_for_budget)
+    from .visual_diff import (ALIGN_MIN_CHANGED, INCREMENTAL_MAX_SHARE, block_regions, changed_blocks,
+                              estimate_shift, match_elements, metric_deltas)
+except ImportError:
+    from analysis_context import AnalysisContext
+    from color_stats import ColorStats
+    from element_list import ElementList
+    from config import MAX_IMAGE_PIXELS
+    from image_io import (decode_image_bytes, detect_device_pixel_ratio, is_path, read_image_bytes,
+                          read_image_file, read_image_size)
+    from palette import extract_palette
+    from profiling import NULL_PROFILER, Profiler
+    from spatial_index import SpatialGrid, box_gaps, pairwise_distance_stats
+    from tiling import (SEAM_MARGIN, TILE_OVERLAP, Tile, decode_array, encode_array, plan_tiles,
+                        stitch_elements, tile_height_for_budget)
+    from visual_diff import (ALIGN_MIN_CHANGED, INCREMENTAL_MAX_SHARE, block_regions, changed_blocks,
+                             estimate_shift, match_elements, metric_deltas)
+
+# Bump whenever a change to the analysis would alter its results, so cached
+# analyses from older versions are no longer reused.
+ANALYZER_VERSION = "2"
+
+# In resolution-adaptive mode the symmetry score, a mean over the whole
+# image, is computed on a pyramid level no larger than this.
+SYMMETRY_MAX_SIDE = 512
+# Lowest pyramid scale each stage may run at in resolution-adaptive mode.
+# Downscaling merges and splits small glyph contours, so element counts
+# drift by 10-30% at any reduced level while Canny and contour tracing are
+# cheap at native size; line and alignment scores stay stable at every
+# level (see docs/performance.md). Lowering the element floor trades count
+# accuracy for speed; boxes and areas are mapped back to native pixels.
+STAGE_MIN_SCALE = {
+    'elements': 1.0,
+    'layout': 0.0,
+    'colors': 1.0
+}
+# Result keys and the stage methods that produce them, in merge order.
+STAGES = (
+    ('elements', 'detect_elements'),
+    ('layout', 'analyze_layout'),
+    ('colors', 'analyze_colors'),
+    ('spacing', 'analyze_spacing')
+)
+
+_thread_pools: Dict[int, ThreadPoolExecutor] = {}
+_thread_pools_lock = threading.Lock()
+
+
+def shared_thread_pool(workers: int) -> ThreadPoolExecutor:
+    """Process-wide thread pool with ``workers`` threads, created on first use.
+    
+    Analyzers with the same thread count share one pool, so concurrent
+    analyses (several app sessions, say) queue on it instead of each
+    starting their own threads.
+    """
+    with _thread_pools_lock:
+        pool = _thread_pools.get(workers)
+        if pool is None:
+            pool = _thread_pools[workers] = ThreadPoolExecutor(max_workers=workers,
+                                                               thread_name_prefix='analysis')
+        return pool
+
+
+def _stage(name: str):
+    """Run an analysis stage on a context, inside a span of the context's profiler."""
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, image, *args, **kwargs):
+            ctx = self.create_context(image)
+            with ctx.profiler.span(name):
+                return method(self, ctx, *args, **kwargs)
+        return wrapper
+    return decorate
+
 
 class UIAnalyzer:
-    def __init__(self):
+    def __init__(self, cache=None, max_side: int = None, device_pixel_ratio=None,
+                 profile: bool = False, profile_memory: bool = False, profile_hooks=None,
+                 threads: int = 1, tile_height: int = None, memory_budget_mb: float = None,
+                 max_pixels: int = MAX_IMAGE_PIXELS):
         self.min_contour_area = 100
-        
-    def load_image(self, image_path: str) -> np.ndarray:
-        if not os.path.exists(image_path):
-            raise FileNotFoundError(f"Image not found: {image_path}")
-        
-        image = cv2.imread(image_path)
-        if image is None:
-            raise ValueError(f"Could not load image: {image_path}")
-        
-        return image
+        self.cache = cache
+        # Resolution-adaptive mode: structural stages run on a downscaled
+        # pyramid level whose longer side is at most max_side, and Retina
+        # captures are first reduced to 1x. device_pixel_ratio is a number,
+        # 'auto' to read it from the image's dpi metadata, or None to ignore it.
+        self.max_side = max_side
+        self.device_pixel_ratio = device_pixel_ratio
+        # Instrumentation: with profile on, every result gets a 'timings'
+        # block; profile_memory adds tracemalloc peaks (slow) and each of
+        # profile_hooks is called with every finished span.
+        self.profile = profile or profile_memory or bool(profile_hooks)
+        self.profile_memory = profile_memory
+        self.profile_hooks = list(profile_hooks or [])
+        # With more than one thread the four stages of full_analysis run
+        # concurrently on shared_thread_pool(threads). OpenCV and NumPy
+        # release the GIL, so latency approaches that of the slowest stage;
+        # results are identical to a sequential run.
+        self.threads = max(int(threads or 1), 1)
+        # Tiled mode for tall pages: full_analysis processes overlapping
+        # horizontal bands of tile_height rows, or bands sized so that one
+        # band's working memory fits in memory_budget_mb, one at a time.
+        self.tile_height = tile_height
+        self.memory_budget_mb = memory_budget_mb
+        # Pixel budget checked against the image header before decoding:
+        # larger images are decoded at 1/2, 1/4 or 1/8 size, and refused
+        # when even that does not fit. None decodes everything at full size.
+        self.max_pixels = max_pixels
+        
+    def load_image(self, source) -> np.ndarray:
+        """Decode a file path, encoded bytes or binary file-like object to a BGR array.
+        
+        An already decoded ndarray is returned unchanged. Images over
+        ``max_pixels`` are decoded at reduced size (see ``decode_scale``).
+        """
+        if isinstance(source, np.ndarray):
+            return source
+        if not is_path(source):
+            return self.decode_image(read_image_bytes(source))
+        
+        if not os.path.exists(source):
+            raise FileNotFoundError(f"Image not found: {source}")
+        
+        return read_image_file(source, self.max_pixels)
     
-    def detect_elements(self, image: np.ndarray) -> Dict:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        edges = cv2.Canny(gray, 50, 150)
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    def decode_image(self, data: bytes, source: str = "<bytes>") -> np.ndarray:
+        return decode_image_bytes(data, source, self.max_pixels)
+    
+    def decode_scale(self, source, decoded: np.ndarray) -> float:
+        """Size of ``decoded`` relative to the encoded image ``source`` (1.0 unless reduced at load)."""
+        if isinstance(source, np.ndarray):
+            return 1.0
+        size = read_image_size(source)
+        if not size:
+            return 1.0
+        # by area, since EXIF orientation may have swapped width and height
+        return min(math.sqrt(decoded.shape[0] * decoded.shape[1] / (size[0] * size[1])), 1.0)
+    
+    def fingerprint(self) -> str:
+        """Short hash of the analyzer version and every parameter that affects results."""
+        params = {
+            'version': ANALYZER_VERSION,
+            'min_contour_area': self.min_contour_area,
+            'max_side': self.max_side,
+            'device_pixel_ratio': self.device_pixel_ratio,
+            'max_pixels': self.max_pixels
+        }
+        if self.tile_height or self.memory_budget_mb:
+            params['tiling'] = [self.tile_height, self.memory_budget_mb, TILE_OVERLAP]
+        return hashlib.sha1(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+    
+    def create_context(self, image, device_pixel_ratio: float = 1.0, profiler=None,
+                       decode_scale: float = 1.0) -> AnalysisContext:
+        if isinstance(image, AnalysisContext):
+            return image
+        # an image reduced at load is treated like a pyramid level of the original
+        return AnalysisContext(image, self.min_contour_area * decode_scale * decode_scale,
+                               device_pixel_ratio, profiler=profiler)
+    
+    def create_profiler(self):
+        """A fresh ``Profiler`` configured like this analyzer, or the no-op profiler when profiling is off."""
+        if not self.profile:
+            return NULL_PROFILER
+        return Profiler(track_memory=self.profile_memory, hooks=self.profile_hooks)
+    
+    @property
+    def adaptive(self) -> bool:
+        return self.max_side is not None or self.device_pixel_ratio is not None
+    
+    def working_scale(self, image) -> float:
+        """Pyramid scale the structural stages run at; 1.0 means native resolution."""
+        root = self.create_context(image).root
+        if self.device_pixel_ratio == 'auto':
+            dpr = root.device_pixel_ratio
+        else:
+            dpr = self.device_pixel_ratio or 1.0
+        scale = 1.0 / max(dpr, 1.0)
+        if self.max_side:
+            scale = min(scale, self.max_side / max(root.width, root.height))
+        return min(scale, 1.0)
+    
+    def stage_scale(self, image, stage: str) -> float:
+        """Pyramid scale a stage ('elements', 'layout', 'symmetry' or 'colors') runs at."""
+        ctx = self.create_context(image).root
+        working = self.working_scale(ctx)
+        if stage == 'symmetry':
+            if not self.adaptive:
+                return 1.0
+            return min(working, SYMMETRY_MAX_SIDE / max(ctx.width, ctx.height))
+        return min(max(working, STAGE_MIN_SCALE[stage]), 1.0)
+    
+    def _stage_context(self, image, stage: str) -> AnalysisContext:
+        ctx = self.create_context(image)
+        return ctx.at_scale(self.stage_scale(ctx, stage))
+    
+    @_stage('detect_elements')
+    def detect_elements(self, image) -> Dict:
+        ctx = self.create_context(image).root
+        work = self._stage_context(ctx, 'elements')
         
-        elements = []
-        for contour in contours:
-            area = cv2.contourArea(contour)
-            if area > self.min_contour_area:
-                x, y, w, h = cv2.boundingRect(contour)
-                elements.append({
-                    'bbox': (x, y, w, h),
-                    'area': area,
-                    'center': (x + w//2, y + h//2)
-                })
+        return self._element_summary(work.native_bounding_boxes, work.native_contour_areas, ctx.width, ctx.height)
+    
+    def _element_summary(self, boxes, areas, width: int, height: int) -> Dict:
+        elements = ElementList.from_columns(boxes, areas)
         
         return {
             'total_elements': len(elements),
             'elements': elements,
-            'image_dimensions': (image.shape[1], image.shape[0])
+            'image_dimensions': (width, height)
         }
     
-    def analyze_layout(self, image: np.ndarray) -> Dict:
-        height, width = image.shape[:2]
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        horizontal_lines = self._detect_lines(gray, 'horizontal')
-        vertical_lines = self._detect_lines(gray, 'vertical')
-        
-        grid_score = self._calculate_grid_score(horizontal_lines, vertical_lines, width, height)
+    @_stage('analyze_layout')
+    def analyze_layout(self, image) -> Dict:
+        ctx = self.create_context(image).root
+        work = self._stage_context(ctx, 'layout')
+        height, width = ctx.height, ctx.width
+        
+        profiler = ctx.profiler
+        gray = work.gray
+        with profiler.span('lines'):
+            horizontal_lines = self._detect_lines(gray, 'horizontal', work.scale)
+            vertical_lines = self._detect_lines(gray, 'vertical', work.scale)
+        
+        grid_score = self._calculate_grid_score(len(horizontal_lines), len(vertical_lines), width, height)
+        
+        with profiler.span('alignment'):
+            alignment_score = self._calculate_alignment_score(work)
+        symmetry_ctx = self._stage_context(ctx, 'symmetry')
+        with profiler.span('symmetry'):
+            symmetry_score = self._calculate_symmetry_score(symmetry_ctx.image)
         
         return {
-            'layout_type': self._classify_layout(horizontal_lines, vertical_lines, grid_score),
+            'layout_type': self._classify_layout(len(horizontal_lines), len(vertical_lines), grid_score),
             'grid_score': grid_score,
-            'alignment_score': self._calculate_alignment_score(image),
-            'symmetry_score': self._calculate_symmetry_score(image)
+            'alignment_score': alignment_score,
+            'symmetry_score': symmetry_score
         }
     
-    def _detect_lines(self, gray: np.ndarray, direction: str) -> List:
+    def _detect_lines(self, gray: np.ndarray, direction: str, scale: float = 1.0) -> List:
+        # pixel-sized parameters shrink with the pyramid level
+        length = max(3, round(25 * scale))
         if direction == 'horizontal':
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (25, 1))
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (length, 1))
         else:
-            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, 25))
+            kernel = cv2.getStructuringElement(cv2.MORPH_RECT, (1, length))
         
         detected = cv2.morphologyEx(gray, cv2.MORPH_CLOSE, kernel)
-        lines = cv2.HoughLinesP(detected, 1, np.pi/180, threshold=100, minLineLength=50, maxLineGap=10)
+        lines = cv2.HoughLinesP(detected, 1, np.pi/180, threshold=max(10, round(100 * scale)),
+                                minLineLength=max(5, round(50 * scale)), maxLineGap=max(1, round(10 * scale)))
         
         return lines.tolist() if lines is not None else []
     
-    def _calculate_grid_score(self, h_lines: List, v_lines: List, width: int, height: int) -> float:
-        if not h_lines or not v_lines:
+    def _calculate_grid_score(self, h_count: int, v_count: int, width: int, height: int) -> float:
+        if not h_count or not v_count:
             return 0.0
         
-        h_count = len(h_lines)
-        v_count = len(v_lines)
         total_pixels = width * height
         
         score = min((h_count + v_count) / 20.0, 1.0)
         return round(score, 2)
     
-    def _classify_layout(self, h_lines: List, v_lines: List, grid_score: float) -> str:
+    def _classify_layout(self, h_count: int, v_count: int, grid_score: float) -> str:
         if grid_score > 0.7:
             return "grid-based"
-        elif len(h_lines) > len(v_lines) * 2:
+        elif h_count > v_count * 2:
             return "horizontal"
-        elif len(v_lines) > len(h_lines) * 2:
+        elif v_count > h_count * 2:
             return "vertical"
         else:
             return "freeform"
     
-    def _calculate_alignment_score(self, image: np.ndarray) -> float:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
+    def _calculate_alignment_score(self, image) -> float:
+        return self._alignment_score(len(self._alignment_lines(image)))
+    
+    def _alignment_lines(self, image, scale: float = None) -> List:
+        # scale of the pyramid level, given explicitly for a crop of one
+        ctx = self.create_context(image)
+        scale = ctx.scale if scale is None else scale
         
-        lines = cv2.HoughLinesP(edges, 1, np.pi/180, threshold=50, minLineLength=30, maxLineGap=5)
+        lines = cv2.HoughLinesP(ctx.edges, 1, np.pi/180, threshold=max(10, round(50 * scale)),
+                                minLineLength=max(5, round(30 * scale)), maxLineGap=max(1, round(5 * scale)))
         
-        if lines is None or len(lines) < 3:
+        return lines.tolist() if lines is not None else []
+    
+    def _alignment_score(self, line_count: int) -> float:
+        if line_count < 3:
             return 0.3
         
-        alignment_score = min(len(lines) / 30.0, 1.0)
+        alignment_score = min(line_count / 30.0, 1.0)
         return round(alignment_score, 2)
     
     def _calculate_symmetry_score(self, image: np.ndarray) -> float:
+        return self._symmetry_score(np.mean(self._symmetry_difference(image)))
+    
+    def _symmetry_difference(self, image: np.ndarray) -> np.ndarray:
         height, width = image.shape[:2]
         left_half = image[:, :width//2]
         right_half = cv2.flip(image[:, width//2:], 1)
@@ -110,51 +323,42 @@ class UIAnalyzer:
         if left_half.shape != right_half.shape:
             right_half = cv2.resize(right_half, (left_half.shape[1], left_half.shape[0]))
         
-        diff = cv2.absdiff(left_half, right_half)
-        similarity = 1.0 - (np.mean(diff) / 255.0)
-        
+        return cv2.absdiff(left_half, right_half)
+    
+    def _symmetry_score(self, mean_difference: float) -> float:
+        similarity = 1.0 - (mean_difference / 255.0)
         return round(max(0.0, similarity), 2)
     
-    def analyze_colors(self, image: np.ndarray) -> Dict:
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        pixels = image_rgb.reshape(-1, 3)
-        
-        unique_colors = np.unique(pixels, axis=0)
-        dominant_colors = self._extract_dominant_colors(pixels, k=5)
-        
-        contrast_score = self._calculate_contrast_score(image_rgb)
+    @_stage('analyze_colors')
+    def analyze_colors(self, image) -> Dict:
+        # colors are counted at native resolution: resampling blends pixels
+        # into new colors, and the packed histogram is cheap anyway
+        ctx = self._stage_context(image, 'colors')
+        color_stats = ctx.color_stats
+        
+        gray = ctx.gray
+        with ctx.profiler.span('contrast'):
+            contrast_score = self._calculate_contrast_score(gray)
+        
+        return self._color_summary(color_stats, contrast_score, ctx.profiler)
+    
+    def _color_summary(self, color_stats: ColorStats, contrast_score: float, profiler=NULL_PROFILER) -> Dict:
+        with profiler.span('palette'):
+            dominant_colors, coverage = extract_palette(color_stats, k=5)
         
         return {
-            'unique_colors': len(unique_colors),
+            'unique_colors': color_stats.unique_colors,
             'dominant_colors': dominant_colors,
+            'dominant_color_coverage': [round(share * 100, 1) for share in coverage],
             'contrast_score': contrast_score,
-            'color_diversity': min(len(unique_colors) / 100.0, 1.0)
+            'color_diversity': color_stats.color_diversity
         }
     
-    def _extract_dominant_colors(self, pixels: np.ndarray, k: int = 5) -> List[Tuple[int, int, int]]:
-        try:
-            from sklearn.cluster import KMeans
-            
-            sample_size = min(1000, len(pixels))
-            sample = pixels[np.random.choice(len(pixels), sample_size, replace=False)]
-            
-            kmeans = KMeans(n_clusters=k, random_state=42, n_init=10)
-            kmeans.fit(sample)
-            
-            colors = kmeans.cluster_centers_.astype(int)
-            return [tuple(color) for color in colors]
-        except (ImportError, ValueError):
-            # Fallback to simple histogram-based color extraction
-            quantized = (pixels // 64) * 64
-            unique_colors, counts = np.unique(quantized, axis=0, return_counts=True)
-            top_indices = np.argsort(counts)[-k:][::-1]
-            return [tuple(unique_colors[i]) for i in top_indices]
+    def _calculate_contrast_score(self, gray: np.ndarray) -> float:
+        return self._contrast_from_histogram(cv2.calcHist([gray], [0], None, [256], [0, 256]))
     
-    def _calculate_contrast_score(self, image_rgb: np.ndarray) -> float:
-        gray = cv2.cvtColor(image_rgb, cv2.COLOR_RGB2GRAY)
-        
-        hist = cv2.calcHist([gray], [0], None, [256], [0, 256])
-        hist = hist.flatten()
+    def _contrast_from_histogram(self, hist: np.ndarray) -> float:
+        hist = np.asarray(hist, dtype=np.float32).flatten()
         
         total_pixels = np.sum(hist)
         if total_pixels == 0:
@@ -168,64 +372,152 @@ class UIAnalyzer:
         contrast_score = min(std / 64.0, 1.0)
         return round(contrast_score, 2)
     
-    def analyze_spacing(self, image: np.ndarray) -> Dict:
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        edges = cv2.Canny(gray, 50, 150)
+    @_stage('analyze_spacing')
+    def analyze_spacing(self, image) -> Dict:
+        ctx = self.create_context(image).root
+        work = self._stage_context(ctx, 'elements')
         
-        contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        if len(contours) < 2:
+        return self._spacing_metrics(work.native_bounding_boxes, ctx.width, ctx.height, ctx.profiler)
+    
+    def _spacing_metrics(self, boxes, width: int, height: int, profiler=NULL_PROFILER) -> Dict:
+        if len(boxes) < 2:
             return {
                 'spacing_consistency': 0.5,
+                'nearest_gap_consistency': 0.5,
+                'median_nearest_gap': 0.0,
                 'whitespace_ratio': 0.3,
                 'element_density': 0.5
             }
         
-        bounding_boxes = [cv2.boundingRect(c) for c in contours if cv2.contourArea(c) > self.min_contour_area]
+        boxes = np.asarray(boxes, dtype=np.int64)
+        centers = boxes[:, :2] + boxes[:, 2:] // 2
         
-        if len(bounding_boxes) < 2:
-            return {
-                'spacing_consistency': 0.5,
-                'whitespace_ratio': 0.3,
-                'element_density': 0.5
-            }
-        
-        distances = []
-        for i, (x1, y1, w1, h1) in enumerate(bounding_boxes):
-            for x2, y2, w2, h2 in bounding_boxes[i+1:]:
-                center1 = (x1 + w1//2, y1 + h1//2)
-                center2 = (x2 + w2//2, y2 + h2//2)
-                dist = np.sqrt((center1[0] - center2[0])**2 + (center1[1] - center2[1])**2)
-                distances.append(dist)
+        with profiler.span('pairwise_distances'):
+            mean_dist, std_dist = pairwise_distance_stats(centers)
+        spacing_consistency = 1.0 - min(std_dist / mean_dist if mean_dist > 0 else 1.0, 1.0)
         
-        if not distances:
-            spacing_consistency = 0.5
-        else:
-            mean_dist = np.mean(distances)
-            std_dist = np.std(distances)
-            spacing_consistency = 1.0 - min(std_dist / mean_dist if mean_dist > 0 else 1.0, 1.0)
+        with profiler.span('nearest_neighbors'):
+            nearest, _ = SpatialGrid(centers).nearest_neighbors()
+            gaps = box_gaps(boxes, boxes[nearest])
+        mean_gap = gaps.mean()
+        gap_consistency = 1.0 - min(gaps.std() / mean_gap, 1.0) if mean_gap > 0 else 1.0
         
-        total_area = image.shape[0] * image.shape[1]
-        element_area = sum(w * h for _, _, w, h in bounding_boxes)
+        total_area = height * width
+        element_area = int((boxes[:, 2] * boxes[:, 3]).sum())
         whitespace_ratio = 1.0 - (element_area / total_area)
         
-        element_density = len(bounding_boxes) / (total_area / 10000.0)
+        element_density = len(boxes) / (total_area / 10000.0)
         element_density = min(element_density / 10.0, 1.0)
         
         return {
             'spacing_consistency': round(spacing_consistency, 2),
+            'nearest_gap_consistency': round(float(gap_consistency), 2),
+            'median_nearest_gap': round(float(np.median(gaps)), 1),
             'whitespace_ratio': round(whitespace_ratio, 2),
             'element_density': round(element_density, 2)
         }
     
-    def full_analysis(self, image_path: str) -> Dict:
-        image = self.load_image(image_path)
-        
-        elements = self.detect_elements(image)
-        layout = self.analyze_layout(image)
-        colors = self.analyze_colors(image)
-        spacing = self.analyze_spacing(image)
-        
+    def full_analysis(self, source, image_path: str = None, decoded: np.ndarray = None,
+                      profiler=None) -> Dict:
+        """Analyze an image given as a path, encoded bytes, a file-like object or a BGR array.
+        
+        ``image_path`` labels the result and defaults to ``source`` when that
+        is a path. Callers that already decoded ``source`` (for a preview,
+        say) can pass the array as ``decoded`` to skip a second decode.
+        
+        When profiling is on, or a ``Profiler`` is passed in, the result gets
+        a ``timings`` block with per-stage wall time, CPU time and optional
+        peak memory; a passed profiler also keeps the raw spans for
+        ``write_chrome_trace()``. Timings are never cached.
+        """
+        owned = profiler is None
+        if owned:
+            profiler = self.create_profiler()
+        try:
+            result = self._cached_analysis(source, image_path, decoded, profiler)
+        finally:
+            if owned:
+                profiler.stop()
+        if profiler.enabled:
+            result = dict(result, timings=profiler.summary())
+        return result
+    
+    def _cached_analysis(self, source, image_path: str, decoded: np.ndarray, profiler) -> Dict:
+        if image_path is None and is_path(source):
+            image_path = str(source)
+        # a stream can only be read once: loading, decode_scale and DPR detection share its bytes
+        source = self._encoded(source)
+        
+        if self.cache is None:
+            if decoded is None:
+                with profiler.span('load'):
+                    decoded = self.load_image(source)
+            return self._analyze(decoded, image_path, self._device_pixel_ratio_of(source), profiler,
+                                 self.decode_scale(source, decoded))
+        
+        with profiler.span('cache_lookup'):
+            if isinstance(source, np.ndarray):
+                data = np.ascontiguousarray(source)
+                key = self.cache.make_key(data, f"{self.fingerprint()}-{'x'.join(map(str, data.shape))}")
+            else:
+                data = read_image_bytes(source)
+                key = self.cache.make_key(data, self.fingerprint())
+            cached = self.cache.get(key)
+        if cached is not None:
+            cached['image_path'] = image_path
+            # JSON turned the tuples into lists
+            cached['elements']['elements'] = ElementList.from_dicts(cached['elements']['elements'])
+            cached['elements']['image_dimensions'] = tuple(cached['elements']['image_dimensions'])
+            cached['colors']['dominant_colors'] = [tuple(color) for color in cached['colors']['dominant_colors']]
+            return cached
+        
+        if decoded is None:
+            with profiler.span('load'):
+                decoded = data if isinstance(data, np.ndarray) else self.decode_image(data, image_path or "<bytes>")
+        result = self._analyze(decoded, image_path, self._device_pixel_ratio_of(data), profiler,
+                               self.decode_scale(data, decoded))
+        with profiler.span('cache_store'):
+            self.cache.put(key, result)
+        return result
+    
+    @staticmethod
+    def _encoded(source):
+        """``source`` as encoded bytes, unless it is a path or an array that can be read again."""
+        if isinstance(source, np.ndarray) or is_path(source):
+            return source
+        return read_image_bytes(source)
+    
+    def _device_pixel_ratio_of(self, source) -> float:
+        if self.device_pixel_ratio != 'auto':
+            return 1.0
+        return detect_device_pixel_ratio(source)
+    
+    def _analyze(self, image: np.ndarray, image_path: str, device_pixel_ratio: float = 1.0,
+                 profiler=None, decode_scale: float = 1.0) -> Dict:
+        # a Retina capture decoded at half size is already at 1x
+        ctx = self.create_context(image, max(device_pixel_ratio * decode_scale, 1.0), profiler, decode_scale)
+        tile_height = self.tile_height_for(ctx)
+        if tile_height is not None:
+            result = self._analyze_tiled(ctx, image_path, tile_height)
+            result['analysis_scale']['decode'] = round(decode_scale, 4)
+            return result
+        
+        if self.threads > 1:
+            pool = shared_thread_pool(self.threads)
+            futures = [(key, pool.submit(getattr(self, method), ctx)) for key, method in STAGES]
+            stages = {key: future.result() for key, future in futures}
+        else:
+            stages = {key: getattr(self, method)(ctx) for key, method in STAGES}
+        elements, layout, colors, spacing = (stages[key] for key, _ in STAGES)
+        analysis_scale = {
+            stage: round(self.stage_scale(ctx, stage), 4)
+            for stage in ('elements', 'layout', 'symmetry', 'colors')
+        }
+        analysis_scale['decode'] = round(decode_scale, 4)
+        return self._combine(image_path, elements, layout, colors, spacing, analysis_scale)
+    
+    def _combine(self, image_path: str, elements: Dict, layout: Dict, colors: Dict, spacing: Dict,
+                 analysis_scale: Dict) -> Dict:
         overall_score = (
             layout['grid_score'] * 0.3 +
             layout['alignment_score'] * 0.2 +
@@ -240,6 +532,399 @@ class UIAnalyzer:
             'layout': layout,
             'colors': colors,
             'spacing': spacing,
-            'overall_score': round(overall_score, 2)
+            'overall_score': round(overall_score, 2),
+            'analysis_scale': analysis_scale
+        }
+    
+    def tile_height_for(self, image):
+        """Rows per band for a tiled analysis of ``image``, or None when it fits in one band."""
+        ctx = self.create_context(image).root
+        if self.tile_height:
+            tile_height = self.tile_height
+        elif self.memory_budget_mb:
+            tile_height = tile_height_for_budget(ctx.width, self.memory_budget_mb * 2 ** 20)
+        else:
+            return None
+        if ctx.height <= tile_height + TILE_OVERLAP:
+            return None
+        return tile_height
+    
+    def _analyze_tiled(self, ctx: AnalysisContext, image_path: str, tile_height: int) -> Dict:
+        """Analyze the page band by band and merge the bands into one result.
+        
+        Each band sees ``TILE_OVERLAP`` extra rows on either side so that
+        elements crossing a seam can be stitched; page statistics (colors,
+        contrast, symmetry, line counts) only count the rows a band owns.
+        Bands run one after another, so peak memory follows the band size
+        rather than the page height. With a cache, band records are cached
+        by content, and re-analyzing an edited page recomputes only the
+        bands whose pixels changed. Lines that span several bands count once
+        per band, so line-based scores can differ from a whole-page run.
+        """
+        profiler = ctx.profiler
+        tiles = plan_tiles(ctx.height, tile_height)
+        boxes_per_tile, areas_per_tile = [], []
+        horizontal_lines, vertical_lines = [], []
+        alignment_lines = 0
+        gray_histogram = np.zeros(256, dtype=np.int64)
+        symmetry_total, symmetry_count = 0, 0
+        color_stats = None
+        for tile in tiles:
+            record = self._tile_record(ctx, tile)
+            boxes_per_tile.append([(x, y + tile.start, w, h) for x, y, w, h in record['boxes']])
+            areas_per_tile.append(record['areas'])
+            horizontal_lines += record['horizontal_lines']
+            vertical_lines += record['vertical_lines']
+            alignment_lines += record['alignment_lines']
+            gray_histogram += np.asarray(record['gray_histogram'], dtype=np.int64)
+            symmetry_total += record['symmetry'][0]
+            symmetry_count += record['symmetry'][1]
+            band_stats = ColorStats(decode_array(record['color_keys']), decode_array(record['color_counts']))
+            # merge as we go so only one band's histogram is held besides the total
+            color_stats = band_stats if color_stats is None else ColorStats.merge([color_stats, band_stats])
+            if tile.index == 0:
+                analysis_scale = dict(record['analysis_scale'])
+        
+        with profiler.span('stitch'):
+            # regions around seams are re-traced with at most one band's worth of pixels
+            trace = functools.partial(self._trace_region, ctx, tile_height * ctx.width)
+            boxes, areas = stitch_elements(tiles, boxes_per_tile, areas_per_tile, ctx.height, ctx.min_contour_area,
+                                           trace)
+        elements = self._element_summary(boxes, areas, ctx.width, ctx.height)
+        
+        grid_score = self._calculate_grid_score(len(horizontal_lines), len(vertical_lines), ctx.width, ctx.height)
+        layout = {
+            'layout_type': self._classify_layout(len(horizontal_lines), len(vertical_lines), grid_score),
+            'grid_score': grid_score,
+            'alignment_score': self._alignment_score(alignment_lines),
+            'symmetry_score': self._symmetry_score(symmetry_total / max(symmetry_count, 1))
+        }
+        
+        colors = self._color_summary(color_stats, self._contrast_from_histogram(gray_histogram), profiler)
+        
+        with profiler.span('spacing'):
+            spacing = self._spacing_metrics(elements['elements'].boxes, ctx.width, ctx.height, profiler)
+        
+        result = self._combine(image_path, elements, layout, colors, spacing, analysis_scale)
+        result['tiling'] = {'tile_height': tile_height, 'overlap': TILE_OVERLAP, 'tiles': len(tiles)}
+        return result
+    
+    def _tile_record(self, ctx: AnalysisContext, tile) -> Dict:
+        """Band record in band coordinates, from the cache when the band's pixels were seen before."""
+        band = ctx.image[tile.start:tile.end]
+        own = (tile.own_start - tile.start, tile.own_end - tile.start)
+        key = None
+        if self.cache is not None:
+            band = np.ascontiguousarray(band)
+            label = (f"{self.fingerprint()}-tile-{band.shape[1]}x{band.shape[0]}-{own[0]}-{own[1]}"
+                     f"-{ctx.device_pixel_ratio}-{ctx.min_contour_area}")
+            key = self.cache.make_key(band, label)
+            record = self.cache.get(key)
+            if record is not None:
+                return record
+        
+        with ctx.profiler.span('tile'):
+            band_ctx = AnalysisContext(band, ctx.min_contour_area, ctx.device_pixel_ratio, profiler=ctx.profiler)
+            try:
+                record = self._analyze_band(band_ctx, own)
+            finally:
+                band_ctx.release()
+        if key is not None:
+            self.cache.put(key, record)
+        return record
+    
+    def _trace_region(self, ctx: AnalysisContext, max_pixels: int, region: Tuple[int, int, int, int],
+                      candidates: List) -> Optional[List]:
+        """Elements of the page inside ``region``, replacing the band view ``candidates``."""
+        x, y, w, h = region
+        margin = 2 * SEAM_MARGIN
+        x0, y0 = max(x - margin, 0), max(y - margin, 0)
+        x1, y1 = min(x + w + margin, ctx.width), min(y + h + margin, ctx.height)
+        region_ctx = AnalysisContext(ctx.image[y0:y1, x0:x1], ctx.min_contour_area, ctx.device_pixel_ratio,
+                                     profiler=ctx.profiler)
+        try:
+            if (x1 - x0) * (y1 - y0) <= max_pixels:
+                work = self._stage_context(region_ctx, 'elements')
+                traced = []
+                for (bx, by, bw, bh), area in zip(work.native_bounding_boxes, work.native_contour_areas):
+                    # contours cut by the crop belong to neighbouring elements
+                    if ((bx <= SEAM_MARGIN and x0 > 0) or (by <= SEAM_MARGIN and y0 > 0)
+                            or (bx + bw >= x1 - x0 - SEAM_MARGIN and x1 < ctx.width)
+                            or (by + bh >= y1 - y0 - SEAM_MARGIN and y1 < ctx.height)):
+                        continue
+                    traced.append(((bx + x0, by + y0, bw, bh), area))
+                return traced
+            
+            # too large for the budget: find only the region's own outline, on a
+            # reduced copy, to learn its area and which candidates it encloses
+            work = region_ctx.at_scale(math.sqrt(max_pixels / ((x1 - x0) * (y1 - y0))))
+            fx, fy = region_ctx.width / work.width, region_ctx.height / work.height
+            tolerance = 2 * max(fx, fy) + SEAM_MARGIN
+            outline, outline_area = None, 0.0
+            for contour in work.contours:
+                bx, by, bw, bh = cv2.boundingRect(contour)
+                mapped = (bx * fx + x0, by * fy + y0, bw * fx, bh * fy)
+                area = cv2.contourArea(contour) * fx * fy
+                if all(abs(m - r) <= tolerance for m, r in zip(mapped, region)) and area > outline_area:
+                    outline, outline_area = contour, area
+            if outline is None:
+                return None
+            if outline_area <= ctx.min_contour_area:
+                # an open or thin outline: the page has no such element and hides nothing
+                return candidates
+            polygon = (outline.reshape(-1, 2) * (fx, fy) + (x0, y0)).astype(np.float32)
+            return [(region, outline_area)] + [
+                (box, area) for box, area in candidates
+                if cv2.pointPolygonTest(polygon, (box[0] + box[2] / 2, box[1] + box[3] / 2), False) < 0
+            ]
+        finally:
+            region_ctx.release()
+    
+    def _band_contours(self, work: AnalysisContext) -> Tuple[List, List]:
+        """Significant contours of a band plus any contour touching its top or bottom row, in native pixels."""
+        boxes = [list(box) for box in work.native_bounding_boxes]
+        areas = list(work.native_contour_areas)
+        fx, fy = work.root.width / work.width, work.root.height / work.height
+        for contour in work.contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            area = cv2.contourArea(contour)
+            if area <= work.min_contour_area and (y <= SEAM_MARGIN or y + h >= work.height - SEAM_MARGIN):
+                boxes.append([round(x * fx), round(y * fy), round(w * fx), round(h * fy)])
+                areas.append(area * fx * fy)
+        return boxes, areas
+    
+    def _analyze_band(self, band_ctx: AnalysisContext, own: Tuple[int, int]) -> Dict:
+        band = band_ctx.image
+        profiler = band_ctx.profiler
+        start, end = own
+        
+        elements = self._stage_context(band_ctx, 'elements')
+        boxes, areas = self._band_contours(elements)
+        
+        work = self._stage_context(band_ctx, 'layout')
+        fx, fy = band_ctx.width / work.width, band_ctx.height / work.height
+        
+        def owned_lines(lines):
+            # native band coordinates of the lines whose midpoint is in the owned rows
+            native = [[round(x1 * fx), round(y1 * fy), round(x2 * fx), round(y2 * fy)] for (x1, y1, x2, y2), in lines]
+            return [line for line in native if start <= (line[1] + line[3]) / 2 < end]
+        
+        with profiler.span('lines'):
+            horizontal_lines = owned_lines(self._detect_lines(work.gray, 'horizontal', work.scale))
+            vertical_lines = owned_lines(self._detect_lines(work.gray, 'vertical', work.scale))
+        with profiler.span('alignment'):
+            alignment_lines = len(owned_lines(self._alignment_lines(work)))
+        
+        symmetry_ctx = self._stage_context(band_ctx, 'symmetry')
+        sy = symmetry_ctx.height / band_ctx.height
+        with profiler.span('symmetry'):
+            diff = self._symmetry_difference(symmetry_ctx.image[round(start * sy):round(end * sy)])
+        
+        with profiler.span('color_stats'):
+            # the sort keeps memory proportional to the band; the dense
+            # histogram alone would be 128 MB
+            color_stats = ColorStats.from_bgr_image(band[start:end], dense=False)
+        gray_histogram = cv2.calcHist([band_ctx.gray[start:end]], [0], None, [256], [0, 256])
+        
+        return {
+            'boxes': boxes,
+            'areas': areas,
+            'horizontal_lines': horizontal_lines,
+            'vertical_lines': vertical_lines,
+            'alignment_lines': alignment_lines,
+            'gray_histogram': gray_histogram.flatten().astype(np.int64).tolist(),
+            'symmetry': [int(diff.sum(dtype=np.int64)), int(diff.size)],
+            'color_keys': encode_array(color_stats.keys),
+            'color_counts': encode_array(color_stats.counts),
+            'analysis_scale': {
+                stage: round(self.stage_scale(band_ctx, stage), 4)
+                for stage in ('elements', 'layout', 'symmetry', 'colors')
+            }
+        }
+    
+    def compare(self, before, after, before_path: str = None, after_path: str = None, profiler=None) -> Dict:
+        """Compare two versions of a screen, each given like a ``full_analysis`` source.
+        
+        The versions are diffed in blocks, after lining them up when one is
+        a shifted capture of the other. The old version is analyzed as one
+        whole-page band record, cached like a band when there is a cache.
+        The new version's analysis is that record updated for the changed
+        regions (the changed blocks plus a margin): lines are searched for
+        and gray and color histograms taken only there, replacing those of
+        the same regions of the old version. Line counts change by the
+        difference, so a line crossing a region's edge cancels out but
+        line-based scores can differ slightly from a fresh analysis; the
+        elements, colors and spacing are exact. Versions of different sizes
+        or offsets, and edits too large to be worth updating for, are
+        analyzed in full.
+        
+        Returns both analyses, ``metrics`` deltas, the ``changed_regions`` and
+        the ``elements`` that were added, removed, moved or modified.
+        """
+        owned = profiler is None
+        if owned:
+            profiler = self.create_profiler()
+        try:
+            result = self._compare(before, after, before_path, after_path, profiler)
+        finally:
+            if owned:
+                profiler.stop()
+        if profiler.enabled:
+            result['timings'] = profiler.summary()
+        return result
+    
+    def _compare(self, before, after, before_path: str, after_path: str, profiler) -> Dict:
+        contexts, decode_scales = [], []
+        for source in (before, after):
+            source = self._encoded(source)
+            with profiler.span('load'):
+                image = self.load_image(source)
+            decode_scale = self.decode_scale(source, image)
+            contexts.append(self.create_context(image, max(self._device_pixel_ratio_of(source) * decode_scale, 1.0),
+                                                profiler, decode_scale))
+            decode_scales.append(decode_scale)
+        before_ctx, after_ctx = contexts
+        before_path = str(before) if before_path is None and is_path(before) else before_path
+        after_path = str(after) if after_path is None and is_path(after) else after_path
+        
+        try:
+            with profiler.span('diff'):
+                shift = (0, 0)
+                blocks, changed = changed_blocks(before_ctx.image, after_ctx.image)
+                same_size = before_ctx.image.shape == after_ctx.image.shape
+                if not same_size or blocks.mean() > ALIGN_MIN_CHANGED:
+                    candidate, _ = estimate_shift(before_ctx.image, after_ctx.image)
+                    shifted_blocks, shifted_changed = changed_blocks(before_ctx.image, after_ctx.image, candidate)
+                    if shifted_changed < changed:
+                        shift, blocks, changed = candidate, shifted_blocks, shifted_changed
+                regions = block_regions(blocks, after_ctx.image.shape)
+            
+            with profiler.span('before'):
+                state = self._page_state(before_ctx)
+            pixels = after_ctx.width * after_ctx.height
+            share = sum(w * h for _, _, w, h in regions) / pixels
+            incremental = same_size and shift == (0, 0) and share <= INCREMENTAL_MAX_SHARE
+            if not regions:
+                after_state = state
+            elif incremental:
+                with profiler.span('regions'):
+                    after_state = self._update_state(before_ctx, after_ctx, state, regions)
+            else:
+                with profiler.span('after'):
+                    after_state = self._page_state(after_ctx)
+                share = 1.0
+            with profiler.span('match'):
+                elements = match_elements(state['boxes'], after_state['boxes'], before_ctx.gray, after_ctx.gray,
+                                          shift, blocks)
+            
+            before_analysis = self._page_result(before_ctx, before_path, state, decode_scales[0])
+            after_analysis = self._page_result(after_ctx, after_path, after_state, decode_scales[1])
+        finally:
+            before_ctx.release()
+            after_ctx.release()
+        
+        return {
+            'before': before_analysis,
+            'after': after_analysis,
+            'identical': changed == 0 and same_size,
+            'shift': shift,
+            'incremental': incremental,
+            'changed_pixels': changed,
+            'changed_ratio': round(changed / pixels, 6),
+            'changed_regions': [{'bbox': region} for region in regions],
+            'reanalyzed_ratio': round(share, 4),
+            'metrics': metric_deltas(before_analysis, after_analysis),
+            'elements': elements
+        }
+    
+    def _page_state(self, ctx: AnalysisContext) -> Dict:
+        """Whole-page band record of ``ctx`` with counts and histograms ready to update region by region."""
+        record = self._tile_record(ctx, Tile(0, 0, ctx.height, 0, ctx.height))
+        # a page has no seams: drop the small edge contours a band keeps for stitching
+        significant = [(tuple(box), area) for box, area in zip(record['boxes'], record['areas'])
+                       if area > ctx.min_contour_area]
+        return {
+            'boxes': [box for box, _ in significant],
+            'areas': [area for _, area in significant],
+            'horizontal_lines': len(record['horizontal_lines']),
+            'vertical_lines': len(record['vertical_lines']),
+            'alignment_lines': record['alignment_lines'],
+            'gray_histogram': np.asarray(record['gray_histogram'], dtype=np.int64),
+            'symmetry': tuple(record['symmetry']),
+            'color_stats': ColorStats(decode_array(record['color_keys']), decode_array(record['color_counts'])),
+            'analysis_scale': dict(record['analysis_scale'])
+        }
+    
+    def _page_result(self, ctx: AnalysisContext, image_path: str, state: Dict, decode_scale: float = 1.0) -> Dict:
+        elements = self._element_summary(state['boxes'], state['areas'], ctx.width, ctx.height)
+        grid_score = self._calculate_grid_score(state['horizontal_lines'], state['vertical_lines'],
+                                                ctx.width, ctx.height)
+        symmetry_total, symmetry_count = state['symmetry']
+        layout = {
+            'layout_type': self._classify_layout(state['horizontal_lines'], state['vertical_lines'], grid_score),
+            'grid_score': grid_score,
+            'alignment_score': self._alignment_score(state['alignment_lines']),
+            'symmetry_score': self._symmetry_score(symmetry_total / max(symmetry_count, 1))
+        }
+        colors = self._color_summary(state['color_stats'], self._contrast_from_histogram(state['gray_histogram']),
+                                     ctx.profiler)
+        spacing = self._spacing_metrics(elements['elements'].boxes, ctx.width, ctx.height, ctx.profiler)
+        analysis_scale = dict(state['analysis_scale'], decode=round(decode_scale, 4))
+        return self._combine(image_path, elements, layout, colors, spacing, analysis_scale)
+    
+    def _update_state(self, before_ctx: AnalysisContext, after_ctx: AnalysisContext, state: Dict,
+                      regions: List) -> Dict:
+        """Page state of ``after_ctx`` from ``state``, that of ``before_ctx``, with only ``regions`` analyzed again.
+        
+        Elements are traced on the whole new version: contours are cheap next
+        to line detection, and a change can reshape an outer contour far
+        beyond it, uncovering or hiding the ones inside.
+        """
+        updated = dict(state)
+        elements = self._stage_context(after_ctx, 'elements')
+        updated['boxes'] = [tuple(box) for box in elements.native_bounding_boxes]
+        updated['areas'] = list(elements.native_contour_areas)
+        
+        with after_ctx.profiler.span('region_stats'):
+            removed = [self._region_stats(before_ctx, region) for region in regions]
+            added = [self._region_stats(after_ctx, region) for region in regions]
+        for key in ('horizontal_lines', 'vertical_lines', 'alignment_lines'):
+            updated[key] = max(state[key] - sum(r[key] for r in removed) + sum(r[key] for r in added), 0)
+        updated['gray_histogram'] = (state['gray_histogram'] - sum(r['gray_histogram'] for r in removed)
+                                     + sum(r['gray_histogram'] for r in added))
+        updated['color_stats'] = ColorStats.merge([state['color_stats']] + [r['color_stats'] for r in added],
+                                                  subtract=[r['color_stats'] for r in removed])
+        # symmetry pairs every pixel with its mirror image, so it is redone for the
+        # whole page; at the symmetry stage's scale that is one subtraction
+        symmetry_ctx = self._stage_context(after_ctx, 'symmetry')
+        with after_ctx.profiler.span('symmetry'):
+            diff = self._symmetry_difference(symmetry_ctx.image)
+        updated['symmetry'] = (int(diff.sum(dtype=np.int64)), int(diff.size))
+        return updated
+    
+    def _region_stats(self, ctx: AnalysisContext, region: Tuple[int, int, int, int]) -> Dict:
+        """Line counts, gray histogram and colors of one region of ``ctx``."""
+        x, y, w, h = region
+        work = self._stage_context(ctx, 'layout')
+        fx, fy = work.width / ctx.width, work.height / ctx.height
+        x0, y0 = round(x * fx), round(y * fy)
+        x1, y1 = max(round((x + w) * fx), x0 + 1), max(round((y + h) * fy), y0 + 1)
+        layout_ctx = AnalysisContext(work.image[y0:y1, x0:x1], profiler=ctx.profiler)
+        try:
+            with ctx.profiler.span('lines'):
+                horizontal_lines = len(self._detect_lines(layout_ctx.gray, 'horizontal', work.scale))
+                vertical_lines = len(self._detect_lines(layout_ctx.gray, 'vertical', work.scale))
+            with ctx.profiler.span('alignment'):
+                alignment_lines = len(self._alignment_lines(layout_ctx, work.scale))
+        finally:
+            layout_ctx.release()
+        with ctx.profiler.span('color_stats'):
+            color_stats = ColorStats.from_bgr_image(ctx.image[y:y + h, x:x + w], dense=False)
+        return {
+            'horizontal_lines': horizontal_lines,
+            'vertical_lines': vertical_lines,
+            'alignment_lines': alignment_lines,
+            'gray_histogram': cv2.calcHist([ctx.gray[y:y + h, x:x + w]], [0], None, [256], [0, 256])
+                                 .flatten().astype(np.int64),
+            'color_stats': color_stats
         }
-
@@ -0,0 +1,106 @@
+from typing import Dict, Optional
+
+try:
+    from .frame_source import SAMPLE_FPS, FrameSource
+    from .image_io import is_path
+    from .perceptual_hash import dhash, hamming, hash_hex
+    from .suggestion_generator import SuggestionGenerator
+    from .ui_analyzer import UIAnalyzer
+except ImportError:
+    from frame_source import SAMPLE_FPS, FrameSource
+    from image_io import is_path
+    from perceptual_hash import dhash, hamming, hash_hex
+    from suggestion_generator import SuggestionGenerator
+    from ui_analyzer import UIAnalyzer
+
+# Largest difference-hash distance (of 256 bits) between frames of one screen.
+SAME_SCREEN_DISTANCE = 12
+# Shortest time a screen has to stay up to be analyzed; shorter runs of
+# frames are transitions, scrolling or animations.
+MIN_SCREEN_SECONDS = 0.5
+
+
+class UserFlowAnalyzer:
+    """Analyze a screen recording, or an animated GIF or WebP, as the sequence of screens a user went through.
+    
+    Frames are read lazily from a ``FrameSource`` and grouped into runs of
+    near-identical frames by difference hash. Only a run that stays up for
+    ``min_seconds`` and looks like no screen seen before is analyzed, on its
+    last (settled) frame, so a recording costs about as much as its
+    distinct screens. Runs that return to an earlier screen only extend the
+    timeline.
+    """
+    
+    def __init__(self, analyzer: UIAnalyzer = None, generator: SuggestionGenerator = None,
+                 sample_fps: Optional[float] = SAMPLE_FPS, max_distance: int = SAME_SCREEN_DISTANCE,
+                 min_seconds: float = MIN_SCREEN_SECONDS):
+        self.analyzer = analyzer or UIAnalyzer()
+        self.generator = generator or SuggestionGenerator()
+        self.sample_fps = sample_fps
+        self.max_distance = max_distance
+        self.min_seconds = min_seconds
+    
+    def analyze(self, source, source_path: str = None) -> Dict:
+        """Screens, timeline and flow suggestions of a recording given as a path, bytes or file-like object.
+        
+        Each screen carries its ``analysis`` and ``suggestions``; the
+        ``timeline`` lists ``{'screen', 'start', 'end'}`` spans in seconds.
+        """
+        if source_path is None and is_path(source):
+            source_path = str(source)
+        frames = FrameSource(source, self.sample_fps)
+        screens, timeline = [], []
+        transitions = 0
+        run = None
+        
+        def close(run, end, last=False):
+            nonlocal transitions
+            # a final run that is all there is still counts, e.g. a still image
+            if end - run['start'] < self.min_seconds and not (last and not screens):
+                transitions += 1
+                return
+            screen = next((s for s in screens if hamming(s['hash'], run['hash']) <= self.max_distance), None)
+            if screen is None:
+                screen = self._analyze_screen(run, len(screens), source_path)
+                screens.append(screen)
+            if timeline and timeline[-1]['screen'] == screen['screen']:
+                # the same screen on both sides of a transition
+                timeline[-1]['end'] = round(end, 3)
+            else:
+                timeline.append({'screen': screen['screen'], 'start': round(run['start'], 3), 'end': round(end, 3)})
+        
+        for frame in frames:
+            frame_hash = dhash(frame.image)
+            if run is not None and hamming(frame_hash, run['hash']) <= self.max_distance:
+                run['image'], run['index'] = frame.image, frame.index
+                continue
+            if run is not None:
+                close(run, frame.timestamp)
+            run = {'hash': frame_hash, 'start': frame.timestamp, 'image': frame.image, 'index': frame.index}
+        if run is not None:
+            close(run, max(frames.duration, run['start']), last=True)
+        
+        flow = {
+            'source': source_path,
+            'duration': round(frames.duration, 3),
+            'frames_read': frames.frames_read,
+            'transitions': transitions,
+            'screens': [{key: value for key, value in screen.items() if key != 'hash'} for screen in screens],
+            'timeline': timeline
+        }
+        flow['flow_suggestions'] = self.generator.generate_flow_suggestions(flow)
+        return flow
+    
+    def _analyze_screen(self, run: Dict, number: int, source_path: Optional[str]) -> Dict:
+        # media fragment syntax: the frame at this many seconds into the recording
+        label = f"{source_path or '<recording>'}#t={run['start']:.2f}"
+        analysis = self.analyzer.full_analysis(run['image'], image_path=label)
+        return {
+            'screen': number,
+            'hash': run['hash'],
+            'dhash': hash_hex(run['hash']),
+            'frame': run['index'],
+            'first_seen': round(run['start'], 3),
+            'analysis': analysis,
+            'suggestions': self.generator.generate_suggestions(analysis)
+        }
@@ -0,0 +1,234 @@
+import cv2
+import numpy as np
+from typing import Dict, List, Sequence, Tuple
+
+# Side of the square blocks two versions of a screen are compared in.
+BLOCK_SIZE = 16
+# Unchanged pixels re-analyzed around every changed block, so that edges,
+# contours and lines near a change are seen with their neighbourhood.
+REGION_MARGIN = 24
+# When more than this share of blocks differs in place, the versions are
+# checked for a global shift (a capture scrolled or offset by a few pixels).
+ALIGN_MIN_CHANGED = 0.25
+# Updating the analysis costs a pass over the changed regions of both
+# versions, so when they cover more than this share of the screen the new
+# version is analyzed in full instead.
+INCREMENTAL_MAX_SHARE = 0.4
+# Longest side the shift is estimated at.
+ALIGN_MAX_SIDE = 512
+# Boxes whose sides are at most this many pixels apart are the same element.
+POSITION_TOLERANCE = 2
+# Largest mean absolute gray difference between an element and a box of the
+# same size elsewhere for the pair to count as moved rather than removed and added.
+MOVE_MAX_DIFFERENCE = 12.0
+# Values compared between the two analyses, as paths into the result.
+COMPARED_METRICS = (
+    ('overall_score',),
+    ('elements', 'total_elements'),
+    ('layout', 'grid_score'),
+    ('layout', 'alignment_score'),
+    ('layout', 'symmetry_score'),
+    ('colors', 'unique_colors'),
+    ('colors', 'contrast_score'),
+    ('colors', 'color_diversity'),
+    ('spacing', 'spacing_consistency'),
+    ('spacing', 'nearest_gap_consistency'),
+    ('spacing', 'median_nearest_gap'),
+    ('spacing', 'whitespace_ratio'),
+    ('spacing', 'element_density')
+)
+
+
+def estimate_shift(before: np.ndarray, after: np.ndarray) -> Tuple[Tuple[int, int], float]:
+    """Translation ``(dx, dy)`` that best maps ``before`` onto ``after``, and its phase correlation peak.
+    
+    Runs on grayscale copies of the common top-left area reduced to at most
+    ``ALIGN_MAX_SIDE`` pixels, so the shift is accurate to a few pixels;
+    ``changed_blocks`` tells whether it actually lines the versions up.
+    """
+    height = min(before.shape[0], after.shape[0])
+    width = min(before.shape[1], after.shape[1])
+    scale = min(ALIGN_MAX_SIDE / max(height, width), 1.0)
+    size = (max(round(width * scale), 1), max(round(height * scale), 1))
+    
+    def prepare(image):
+        image = image[:height, :width]
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(image, size, interpolation=cv2.INTER_AREA).astype(np.float32)
+    
+    window = cv2.createHanningWindow(size, cv2.CV_32F)
+    (dx, dy), response = cv2.phaseCorrelate(prepare(before), prepare(after), window)
+    return (round(dx / scale), round(dy / scale)), float(response)
+
+
+def overlap(before_shape: Sequence[int], after_shape: Sequence[int], shift: Tuple[int, int]) -> Tuple[int, int, int, int]:
+    """``(x0, y0, x1, y1)`` of the part of ``after`` that ``before`` moved by ``shift`` covers."""
+    dx, dy = shift
+    x0, y0 = max(dx, 0), max(dy, 0)
+    x1 = min(before_shape[1] + dx, after_shape[1])
+    y1 = min(before_shape[0] + dy, after_shape[0])
+    return x0, y0, max(x1, x0), max(y1, y0)
+
+
+def changed_blocks(before: np.ndarray, after: np.ndarray, shift: Tuple[int, int] = (0, 0),
+                   block_size: int = BLOCK_SIZE) -> Tuple[np.ndarray, int]:
+    """Blocks of ``after`` with at least one pixel that differs from ``before`` moved by ``shift``.
+    
+    Returns the boolean block grid and the number of changed pixels.
+    Comparison is exact: the analysis counts every color, so any change
+    matters to it. Pixels of ``after`` that ``before`` does not cover count
+    as changed.
+    """
+    height, width = after.shape[:2]
+    x0, y0, x1, y1 = overlap(before.shape, after.shape, shift)
+    changed = np.ones((height, width), dtype=bool)
+    if x1 > x0 and y1 > y0:
+        dx, dy = shift
+        different = before[y0 - dy:y1 - dy, x0 - dx:x1 - dx] != after[y0:y1, x0:x1]
+        changed[y0:y1, x0:x1] = different.any(axis=2) if different.ndim == 3 else different
+    rows, cols = -(-height // block_size), -(-width // block_size)
+    padded = np.zeros((rows * block_size, cols * block_size), dtype=bool)
+    padded[:height, :width] = changed
+    blocks = padded.reshape(rows, block_size, cols, block_size).any(axis=(1, 3))
+    return blocks, int(np.count_nonzero(changed))
+
+
+def merge_rects(rects: Sequence[Tuple[int, int, int, int]]) -> List[Tuple[int, int, int, int]]:
+    """Replace overlapping or touching ``(x, y, w, h)`` rectangles by their bounding boxes until none overlap."""
+    merged = [list(rect) for rect in rects]
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(len(merged) - 1, i, -1):
+                ax, ay, aw, ah = merged[i]
+                bx, by, bw, bh = merged[j]
+                if ax <= bx + bw and bx <= ax + aw and ay <= by + bh and by <= ay + ah:
+                    x0, y0 = min(ax, bx), min(ay, by)
+                    merged[i] = [x0, y0, max(ax + aw, bx + bw) - x0, max(ay + ah, by + bh) - y0]
+                    del merged[j]
+                    changed = True
+    return sorted(tuple(int(v) for v in rect) for rect in merged)
+
+
+def block_regions(blocks: np.ndarray, shape: Sequence[int], block_size: int = BLOCK_SIZE,
+                  margin: int = REGION_MARGIN) -> List[Tuple[int, int, int, int]]:
+    """Disjoint ``(x, y, w, h)`` regions covering the changed blocks plus ``margin`` pixels around them."""
+    height, width = shape[:2]
+    count, _, stats, _ = cv2.connectedComponentsWithStats(blocks.astype(np.uint8), connectivity=8)
+    rects = []
+    for bx, by, bw, bh, _ in stats[1:count]:
+        x0, y0 = max(int(bx) * block_size - margin, 0), max(int(by) * block_size - margin, 0)
+        x1 = min(int(bx + bw) * block_size + margin, width)
+        y1 = min(int(by + bh) * block_size + margin, height)
+        rects.append((x0, y0, x1 - x0, y1 - y0))
+    return merge_rects(rects)
+
+
+def intersecting(boxes: np.ndarray, rects: Sequence[Tuple[int, int, int, int]]) -> np.ndarray:
+    """Which of the ``(n, 4)`` ``boxes`` overlap any of ``rects``."""
+    boxes = np.asarray(boxes, dtype=np.int64).reshape(-1, 4)
+    rects = np.asarray(rects, dtype=np.int64).reshape(-1, 4)
+    if len(boxes) == 0 or len(rects) == 0:
+        return np.zeros(len(boxes), dtype=bool)
+    bx, by, bw, bh = (boxes[:, i, None] for i in range(4))
+    rx, ry, rw, rh = (rects[None, :, i] for i in range(4))
+    return ((bx < rx + rw) & (rx < bx + bw) & (by < ry + rh) & (ry < by + bh)).any(axis=1)
+
+
+def _patch_difference(before_gray: np.ndarray, after_gray: np.ndarray, box_before, box_after) -> float:
+    w, h = min(box_before[2], box_after[2]), min(box_before[3], box_after[3])
+    first = before_gray[box_before[1]:box_before[1] + h, box_before[0]:box_before[0] + w]
+    second = after_gray[box_after[1]:box_after[1] + h, box_after[0]:box_after[0] + w]
+    if first.size == 0 or first.shape != second.shape:
+        return float('inf')
+    return float(cv2.absdiff(first, second).mean())
+
+
+def match_elements(before_boxes: Sequence, after_boxes: Sequence, before_gray: np.ndarray, after_gray: np.ndarray,
+                   shift: Tuple[int, int] = (0, 0), blocks: np.ndarray = None,
+                   block_size: int = BLOCK_SIZE) -> Dict:
+    """Pair the elements of two versions into unchanged, modified, moved, removed and added ones.
+    
+    Boxes in the same place (after ``shift``, within
+    ``POSITION_TOLERANCE``) are the same element; it is modified when one
+    of the changed ``blocks`` falls inside it. Of the rest, a removed and an
+    added box of the same size whose pixels look alike (mean gray
+    difference under ``MOVE_MAX_DIFFERENCE``) are a move, nearest first.
+    """
+    dx, dy = shift
+    before_boxes = [tuple(int(v) for v in box) for box in before_boxes]
+    after_boxes = [tuple(int(v) for v in box) for box in after_boxes]
+    unchanged, modified, moved = 0, [], []
+    
+    remaining_after = set(range(len(after_boxes)))
+    by_position = {}
+    for j, box in enumerate(after_boxes):
+        by_position.setdefault(box[:2], []).append(j)
+    unmatched = []
+    for box in before_boxes:
+        x, y, w, h = box
+        match = None
+        for ox in range(-POSITION_TOLERANCE, POSITION_TOLERANCE + 1):
+            for oy in range(-POSITION_TOLERANCE, POSITION_TOLERANCE + 1):
+                for j in by_position.get((x + dx + ox, y + dy + oy), ()):
+                    other = after_boxes[j]
+                    if (j in remaining_after and abs(other[2] - w) <= POSITION_TOLERANCE
+                            and abs(other[3] - h) <= POSITION_TOLERANCE):
+                        match = j
+                        break
+                if match is not None:
+                    break
+            if match is not None:
+                break
+        if match is None:
+            unmatched.append(box)
+            continue
+        remaining_after.discard(match)
+        other = after_boxes[match]
+        if blocks is not None and blocks[other[1] // block_size:-(-(other[1] + other[3]) // block_size),
+                                         other[0] // block_size:-(-(other[0] + other[2]) // block_size)].any():
+            modified.append({'bbox': other})
+        else:
+            unchanged += 1
+    
+    removed = []
+    # large elements first, so a small lookalike does not take a large one's place
+    for box in sorted(unmatched, key=lambda b: -b[2] * b[3]):
+        x, y, w, h = box
+        candidates = sorted(
+            (j for j in remaining_after
+             if abs(after_boxes[j][2] - w) <= POSITION_TOLERANCE and abs(after_boxes[j][3] - h) <= POSITION_TOLERANCE),
+            key=lambda j: (after_boxes[j][0] - x - dx) ** 2 + (after_boxes[j][1] - y - dy) ** 2)
+        for j in candidates:
+            if _patch_difference(before_gray, after_gray, box, after_boxes[j]) <= MOVE_MAX_DIFFERENCE:
+                remaining_after.discard(j)
+                other = after_boxes[j]
+                moved.append({'from': box, 'to': other, 'offset': (other[0] - x - dx, other[1] - y - dy)})
+                break
+        else:
+            removed.append({'bbox': box})
+    
+    return {
+        'unchanged': unchanged,
+        'modified': modified,
+        'moved': moved,
+        'removed': sorted(removed, key=lambda e: (e['bbox'][1], e['bbox'][0])),
+        'added': [{'bbox': after_boxes[j]} for j in sorted(remaining_after, key=lambda j: after_boxes[j][1::-1])]
+    }
+
+
+def metric_deltas(before: Dict, after: Dict) -> Dict:
+    """``{'section.key': {'before', 'after', 'delta'}}`` for each of ``COMPARED_METRICS``."""
+    deltas = {}
+    for path in COMPARED_METRICS:
+        values = []
+        for analysis in (before, after):
+            value = analysis
+            for key in path:
+                value = value[key]
+            values.append(value)
+        deltas['.'.join(path)] = {'before': values[0], 'after': values[1],
+                                  'delta': round(values[1] - values[0], 4)}
+    return deltas
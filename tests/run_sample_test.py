@@ -8,7 +8,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from src.ui_analyzer import UIAnalyzer
 from src.suggestion_generator import SuggestionGenerator
-from src.config import SCREENSHOTS_DIR
+from src.config import SCREENSHOTS_DIR, ensure_dir
 
 
 def create_sample_screenshot():
@@ -41,7 +41,7 @@ def create_sample_screenshot():
     draw.rectangle([200, 500, 800, 600], fill='#34495e', outline='#2c3e50')
     draw.text((220, 540), "Footer Content", fill='white')
     
-    sample_path = SCREENSHOTS_DIR / "sample_ui.png"
+    sample_path = ensure_dir(SCREENSHOTS_DIR) / "sample_ui.png"
     img.save(sample_path)
     return str(sample_path)
 
@@ -97,6 +97,8 @@ def run_sample_analysis():
             
             f.write("SPACING METRICS:\n")
             f.write(f"  Spacing Consistency: {analysis['spacing']['spacing_consistency']}\n")
+            f.write(f"  Nearest Gap Consistency: {analysis['spacing']['nearest_gap_consistency']}\n")
+            f.write(f"  Median Nearest Gap: {analysis['spacing']['median_nearest_gap']}\n")
             f.write(f"  Whitespace Ratio: {analysis['spacing']['whitespace_ratio']}\n")
             f.write(f"  Element Density: {analysis['spacing']['element_density']}\n\n")
             
@@ -0,0 +1,71 @@
+import sys
+import tempfile
+from pathlib import Path
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.analysis_cache import AnalysisCache
+from src.ui_analyzer import UIAnalyzer
+
+
+def test_full_analysis_uses_cache():
+    with tempfile.TemporaryDirectory() as tmp:
+        image = np.full((200, 300, 3), 255, dtype=np.uint8)
+        cv2.rectangle(image, (20, 20), (140, 120), (219, 152, 52), -1)
+        image_path = str(Path(tmp) / "screen.png")
+        cv2.imwrite(image_path, image)
+        
+        cache = AnalysisCache(Path(tmp) / "cache")
+        analyzer = UIAnalyzer(cache=cache)
+        first = analyzer.full_analysis(image_path)
+        second = analyzer.full_analysis(image_path)
+        
+        assert (cache.misses, cache.hits, cache.stores) == (1, 1, 1)
+        assert second == first
+        assert second['image_path'] == image_path
+        
+        analyzer.min_contour_area = 50
+        analyzer.full_analysis(image_path)
+        assert cache.misses == 2, "a parameter change must not reuse old results"
+        
+        tiled = UIAnalyzer(cache=AnalysisCache(Path(tmp) / "tiled"), tile_height=64)
+        assert tiled.full_analysis(image_path) == tiled.full_analysis(image_path)
+    print("✓ Analysis cache hit/miss test passed")
+
+
+def test_eviction_keeps_cache_bounded():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnalysisCache(tmp, max_bytes=4096)
+        payload = {'data': 'x' * 1000}
+        for i in range(10):
+            cache.put(AnalysisCache.make_key(bytes([i]), 'test'), payload)
+        
+        stats = cache.stats()
+        assert stats['bytes'] <= 4096
+        assert stats['evictions'] > 0
+        assert cache.get(AnalysisCache.make_key(bytes([9]), 'test')) == payload
+    print("✓ Analysis cache eviction test passed")
+
+
+def test_eviction_counts_other_processes_writes():
+    with tempfile.TemporaryDirectory() as tmp:
+        # two instances on one directory stand in for batch workers sharing a cache
+        workers = [AnalysisCache(tmp, max_bytes=20_000) for _ in range(2)]
+        payload = {'data': 'x' * 1000}
+        largest = 0
+        for i in range(80):
+            workers[i % 2].put(AnalysisCache.make_key(i.to_bytes(2, 'big'), 'test'), payload)
+            largest = max(largest, workers[0].stats()['bytes'])
+        
+        # neither instance sees the other's writes, yet the directory stays near the limit
+        assert largest <= 20_000 * (1 + 2 * 0.05) + 1100
+        assert workers[0].evictions + workers[1].evictions > 0
+    print("✓ Shared analysis cache eviction test passed")
+
+
+if __name__ == "__main__":
+    test_full_analysis_uses_cache()
+    test_eviction_keeps_cache_bounded()
+    test_eviction_counts_other_processes_writes()
@@ -1,10 +1,28 @@
+import io
+import os
+import struct
 import sys
+import zlib
+import tempfile
 from pathlib import Path
+import cv2
+import numpy as np
 
 sys.path.append(str(Path(__file__).parent.parent))
 
 from src.ui_analyzer import UIAnalyzer
 from src.suggestion_generator import SuggestionGenerator
+from src.analysis_cache import AnalysisCache
+from src.image_io import ImageTooLargeError, detect_device_pixel_ratio, read_image_size
+from src import ui_analyzer
+
+
+def make_test_image():
+    image = np.full((300, 400, 3), 255, dtype=np.uint8)
+    cv2.rectangle(image, (20, 20), (120, 100), (219, 152, 52), -1)
+    cv2.rectangle(image, (160, 20), (260, 100), (60, 76, 231), -1)
+    cv2.rectangle(image, (20, 150), (380, 280), (113, 204, 46), -1)
+    return image
 
 
 def test_analyzer_initialization():
@@ -20,8 +38,149 @@ def test_suggestion_generator():
     print("✓ Suggestion generator test passed")
 
 
+def test_context_is_shared_between_stages():
+    analyzer = UIAnalyzer()
+    image = make_test_image()
+    ctx = analyzer.create_context(image)
+    
+    assert analyzer.create_context(ctx) is ctx
+    assert ctx.edges is ctx.edges
+    assert analyzer.detect_elements(ctx) == analyzer.detect_elements(image)
+    assert analyzer.analyze_spacing(ctx) == analyzer.analyze_spacing(image)
+    print("✓ Shared analysis context test passed")
+
+
+def test_in_memory_sources_match_file_analysis():
+    with tempfile.TemporaryDirectory() as tmp:
+        image_path = str(Path(tmp) / "screen.png")
+        cv2.imwrite(image_path, make_test_image())
+        data = Path(image_path).read_bytes()
+        
+        cache = AnalysisCache(Path(tmp) / "cache")
+        analyzer = UIAnalyzer(cache=cache)
+        from_file = analyzer.full_analysis(image_path)
+        from_bytes = analyzer.full_analysis(data, image_path="upload.png")
+        
+        assert cache.hits == 1, "bytes of an analyzed file should hit the cache"
+        assert from_bytes['image_path'] == "upload.png"
+        assert from_bytes['overall_score'] == from_file['overall_score']
+        
+        plain = UIAnalyzer()
+        decoded = plain.load_image(io.BytesIO(data))
+        assert np.array_equal(decoded, plain.load_image(image_path))
+        assert plain.full_analysis(decoded)['overall_score'] == from_file['overall_score']
+        assert plain.full_analysis(data, decoded=decoded)['image_path'] is None
+    print("✓ In-memory analysis test passed")
+
+
+def test_oversized_images_decode_reduced():
+    image = cv2.resize(make_test_image(), (1600, 1200), interpolation=cv2.INTER_NEAREST)
+    jpeg = cv2.imencode('.jpg', image)[1].tobytes()
+    png = cv2.imencode('.png', image)[1].tobytes()
+    assert read_image_size(jpeg) == read_image_size(io.BytesIO(png)) == (1600, 1200)
+    
+    analyzer = UIAnalyzer(max_pixels=600_000)
+    decoded = analyzer.load_image(jpeg)
+    assert decoded.shape[:2] == (600, 800), "libjpeg should decode at half size"
+    result = analyzer.full_analysis(jpeg)
+    assert result['analysis_scale']['decode'] == 0.5
+    assert result['elements']['total_elements'] == UIAnalyzer().full_analysis(image)['elements']['total_elements']
+    
+    # a real file object is consumed by the first read
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'large.jpg')
+        with open(path, 'wb') as f:
+            f.write(jpeg)
+        with open(path, 'rb') as f:
+            from_file = analyzer.full_analysis(f)
+    assert from_file['analysis_scale']['decode'] == 0.5
+    assert from_file['elements'] == result['elements']
+    
+    try:
+        UIAnalyzer(max_pixels=400_000).load_image(png)
+    except ImageTooLargeError:
+        pass
+    else:
+        raise AssertionError("a PNG over 4x the pixel budget should be refused before decoding")
+    print("✓ Pixel budget test passed")
+
+
+def with_png_dpi(data: bytes, dpi: float) -> bytes:
+    pixels_per_meter = round(dpi / 0.0254)
+    body = b'pHYs' + struct.pack('>IIB', pixels_per_meter, pixels_per_meter, 1)
+    chunk = struct.pack('>I', 9) + body + struct.pack('>I', zlib.crc32(body))
+    # IHDR is always the first chunk: 8 byte signature + 25 byte chunk
+    return data[:33] + chunk + data[33:]
+
+
+def test_resolution_adaptive_analysis():
+    retina = cv2.resize(make_test_image(), None, fx=2, fy=2, interpolation=cv2.INTER_NEAREST)
+    data = cv2.imencode('.png', retina)[1].tobytes()
+    assert detect_device_pixel_ratio(data) == 1.0
+    data = with_png_dpi(data, 144)
+    assert detect_device_pixel_ratio(data) == 2.0
+    
+    native = UIAnalyzer().full_analysis(data)
+    auto = UIAnalyzer(device_pixel_ratio='auto').full_analysis(data)
+    assert auto['analysis_scale']['layout'] == 0.5
+    assert auto['analysis_scale']['elements'] == 1.0
+    assert auto['elements'] == native['elements']
+    assert auto['layout']['grid_score'] == native['layout']['grid_score']
+    
+    # the ratio comes from the same bytes the image was decoded from, not a drained stream
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'retina.png')
+        with open(path, 'wb') as f:
+            f.write(data)
+        with open(path, 'rb') as f:
+            assert UIAnalyzer(device_pixel_ratio='auto').full_analysis(f)['analysis_scale'] == auto['analysis_scale']
+        with open(path, 'rb') as before, open(path, 'rb') as after:
+            compared = UIAnalyzer(device_pixel_ratio='auto').compare(before, after)
+        assert compared['after']['analysis_scale'] == auto['analysis_scale']
+    
+    analyzer = UIAnalyzer(max_side=400)
+    original_floor = ui_analyzer.STAGE_MIN_SCALE['elements']
+    ui_analyzer.STAGE_MIN_SCALE['elements'] = 0.0
+    try:
+        reduced = analyzer.detect_elements(retina)
+    finally:
+        ui_analyzer.STAGE_MIN_SCALE['elements'] = original_floor
+    assert reduced['image_dimensions'] == (800, 600)
+    assert reduced['total_elements'] == native['elements']['total_elements']
+    # boxes found on the 400 px level are reported in native pixels
+    for found, expected in zip(sorted(e['bbox'] for e in reduced['elements']),
+                               sorted(tuple(e['bbox']) for e in native['elements']['elements'])):
+        assert np.allclose(found, expected, atol=4)
+    print("✓ Resolution-adaptive analysis test passed")
+
+
+def test_concurrent_stages_match_sequential():
+    image = cv2.resize(make_test_image(), None, fx=2, fy=2)
+    sequential = UIAnalyzer().full_analysis(image)
+    assert UIAnalyzer(threads=4).full_analysis(image) == sequential
+    
+    # every intermediate is computed once even when requested from many threads
+    ctx = UIAnalyzer().create_context(image)
+    calls = []
+    original = cv2.Canny
+    cv2.Canny = lambda *args, **kwargs: calls.append(1) or original(*args, **kwargs)
+    try:
+        pool = ui_analyzer.shared_thread_pool(8)
+        edges = [future.result() for future in [pool.submit(lambda: ctx.edges) for _ in range(16)]]
+    finally:
+        cv2.Canny = original
+    assert len(calls) == 1
+    assert all(e is edges[0] for e in edges)
+    print("✓ Concurrent stages test passed")
+
+
 if __name__ == "__main__":
     test_analyzer_initialization()
     test_suggestion_generator()
+    test_context_is_shared_between_stages()
+    test_in_memory_sources_match_file_analysis()
+    test_oversized_images_decode_reduced()
+    test_resolution_adaptive_analysis()
+    test_concurrent_stages_match_sequential()
     print("\nAll basic tests passed!")
 
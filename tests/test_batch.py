@@ -0,0 +1,164 @@
+import io
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "benchmarks"))
+
+from synthetic import make_flow
+from src.batch import _iter_results, collect_inputs, run_batch
+
+
+def write_images(folder):
+    paths = []
+    for i in range(2):
+        image = np.full((200, 300, 3), 255, dtype=np.uint8)
+        cv2.rectangle(image, (20 + i * 10, 20), (140, 120), (219, 152, 52), -1)
+        cv2.rectangle(image, (160, 40), (280, 180), (60, 76, 231), -1)
+        path = folder / f"screen_{i}.png"
+        cv2.imwrite(str(path), image)
+        paths.append(str(path))
+    broken = folder / "broken.png"
+    broken.write_bytes(b"not an image")
+    return paths, str(broken)
+
+
+def exit_on_crash(path):
+    # stands in for a worker killed mid-analysis
+    if 'crash' in path:
+        os._exit(1)
+    return {'image_path': path, 'status': 'ok'}
+
+
+def test_collect_inputs_from_dir_glob_and_manifest():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        paths, broken = write_images(folder)
+        (folder / "notes.txt").write_text("ignored")
+        manifest = folder / "manifest.txt"
+        manifest.write_text("# screens\nscreen_1.png\n\nextra.png\n")
+        
+        assert list(collect_inputs([tmp])) == sorted(paths + [broken])
+        assert list(collect_inputs([str(folder / "screen_*.png")])) == paths
+        assert list(collect_inputs([paths[1]], manifest=str(manifest))) == [paths[1], str(folder / "extra.png")]
+    print("✓ Batch input collection test passed")
+
+
+def test_batch_streams_records_and_resumes():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        paths, broken = write_images(folder)
+        output = str(folder / "results.jsonl")
+        log = io.StringIO()
+        
+        summary = run_batch([tmp], output, workers=2, log=log)
+        records = [json.loads(line) for line in open(output, encoding='utf-8')]
+        
+        assert summary['processed'] == 3 and summary['succeeded'] == 2 and summary['failed'] == 1
+        assert {r['image_path'] for r in records} == set(paths + [broken])
+        assert next(r for r in records if r['image_path'] == broken)['status'] == 'error'
+        assert all('overall_score' in r['analysis'] for r in records if r['status'] == 'ok')
+        
+        summary = run_batch([tmp], output, workers=1, resume=True, log=log)
+        assert summary['skipped'] == 2 and summary['processed'] == 1
+        assert len(open(output, encoding='utf-8').readlines()) == 4
+    print("✓ Batch streaming and resume test passed")
+
+
+def test_resume_after_truncated_last_line():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        paths, _ = write_images(folder)
+        output = str(folder / "results.jsonl")
+        run_batch(paths, output, workers=1, log=io.StringIO())
+        
+        # as if the run was killed while writing the second record
+        text = open(output, encoding='utf-8').read()
+        last = text.rstrip("\n").rfind("\n") + 1
+        Path(output).write_text(text[:last + 40], encoding='utf-8')
+        
+        summary = run_batch(paths, output, workers=1, resume=True, log=io.StringIO())
+        records = [json.loads(line) for line in open(output, encoding='utf-8')]
+        assert summary['skipped'] == 1 and summary['processed'] == 1
+        assert [r['image_path'] for r in records] == paths
+    print("✓ Batch resume after a truncated line test passed")
+
+
+def test_batch_dedupe_shares_analysis():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        first, second = make_flow((800, 500), screens=2)
+        badged = first.copy()
+        cv2.circle(badged, (760, 30), 10, (40, 40, 220), -1)
+        paths = []
+        for name, image in (("a_first.png", first), ("b_second.png", second), ("c_badged.png", badged)):
+            cv2.imwrite(str(folder / name), image)
+            paths.append(str(folder / name))
+        output = str(folder / "results.jsonl")
+        
+        summary = run_batch(paths, output, workers=1, dedupe=8, log=io.StringIO())
+        records = {r['image_path']: r for r in map(json.loads, open(output, encoding='utf-8'))}
+        
+        assert summary['succeeded'] == 3 and summary['duplicates'] == 1
+        duplicate = records[paths[2]]
+        assert duplicate['duplicate_of'] == paths[0] and 0 < duplicate['hash_distance'] <= 8
+        assert duplicate['analysis']['image_path'] == paths[2]
+        assert duplicate['analysis']['overall_score'] == records[paths[0]]['analysis']['overall_score']
+        assert 'duplicate_of' not in records[paths[1]]
+        
+        summary = run_batch(paths, output, workers=1, log=io.StringIO())
+        assert summary['duplicates'] == 0 and summary['succeeded'] == 3
+    print("✓ Batch dedupe test passed")
+
+
+def test_batch_dedupe_keeps_input_order_with_workers():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        screen = make_flow((800, 500), screens=1)[0]
+        paths = []
+        for i in range(6):
+            image = screen.copy()
+            cv2.circle(image, (700 + i * 10, 30), 6, (40, 40, 220), -1)
+            cv2.imwrite(str(folder / f"copy_{5 - i}.png"), image)
+            paths.append(str(folder / f"copy_{5 - i}.png"))
+        output = str(folder / "results.jsonl")
+        
+        # the first listed image is the representative however the workers finish
+        for _ in range(2):
+            summary = run_batch(paths, output, workers=2, dedupe=8, log=io.StringIO())
+            records = {r['image_path']: r for r in map(json.loads, open(output, encoding='utf-8'))}
+            assert summary['duplicates'] == 5
+            assert 'duplicate_of' not in records[paths[0]]
+            assert all(records[path]['duplicate_of'] == paths[0] for path in paths[1:])
+    print("✓ Batch dedupe input order test passed")
+
+
+def test_worker_crash_yields_error_records_and_continues():
+    paths = [f"screen_{i}.png" for i in range(40)]
+    paths[3] = "crash_1.png"
+    paths[25] = "crash_2.png"
+    
+    records = list(_iter_results(iter(paths), 2, (), task=exit_on_crash))
+    by_path = {record['image_path']: record for record in records}
+    
+    assert len(records) == len(paths) and set(by_path) == set(paths)
+    for path in ("crash_1.png", "crash_2.png"):
+        assert by_path[path]['status'] == 'error' and 'BrokenProcessPool' in by_path[path]['error']
+    # only jobs in flight with a crash fail; the rest run on the replacement pools
+    assert sum(record['status'] == 'ok' for record in records) >= len(paths) - 2 * 8
+    assert all(by_path[path]['status'] == 'ok' for path in paths[34:])
+    print("✓ Batch worker crash test passed")
+
+
+if __name__ == "__main__":
+    test_collect_inputs_from_dir_glob_and_manifest()
+    test_batch_streams_records_and_resumes()
+    test_resume_after_truncated_last_line()
+    test_batch_dedupe_shares_analysis()
+    test_batch_dedupe_keeps_input_order_with_workers()
+    test_worker_crash_yields_error_records_and_continues()
@@ -0,0 +1,40 @@
+import sys
+from pathlib import Path
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent / "benchmarks"))
+
+from synthetic import make_ui
+from bench_suite import compare
+
+
+def test_synthetic_ui_is_deterministic():
+    first = make_ui((640, 2000), elements=30, colors=4, noise=3.0, seed=7)
+    assert first.shape == (2000, 640, 3) and first.dtype == np.uint8
+    assert np.array_equal(first, make_ui((640, 2000), elements=30, colors=4, noise=3.0, seed=7))
+    assert not np.array_equal(first, make_ui((640, 2000), elements=30, colors=4, noise=3.0, seed=8))
+    print("✓ Synthetic UI test passed")
+
+
+def test_compare_applies_ratio_and_delta():
+    baseline = {
+        'thresholds': {'time_ratio': 1.3, 'min_time_delta': 0.02, 'memory_ratio': 1.2, 'min_memory_delta_mb': 2.0},
+        'cases': {'c': {'stages': {
+            'fast': {'seconds': 0.001, 'peak_mb': 1.0},
+            'slow': {'seconds': 1.0, 'peak_mb': 10.0},
+        }}}
+    }
+    current = {'c': {'stages': {
+        # 5x slower but only 4 ms: within the absolute delta
+        'fast': {'seconds': 0.005, 'peak_mb': 1.5},
+        'slow': {'seconds': 1.5, 'peak_mb': 20.0},
+    }}, 'new-case': {'stages': {'slow': {'seconds': 9.0, 'peak_mb': 99.0}}}}
+    
+    regressions = compare(current, baseline)
+    assert [(stage, metric) for _, stage, metric, _, _ in regressions] == [('slow', 'seconds'), ('slow', 'peak_mb')]
+    print("✓ Baseline comparison test passed")
+
+
+if __name__ == "__main__":
+    test_synthetic_ui_is_deterministic()
+    test_compare_applies_ratio_and_delta()
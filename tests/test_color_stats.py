@@ -0,0 +1,47 @@
+import sys
+from pathlib import Path
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src import color_stats
+from src.color_stats import ColorStats
+
+
+def make_pixels(n=5000, seed=0):
+    rng = np.random.default_rng(seed)
+    palette = rng.integers(0, 256, size=(40, 3), dtype=np.uint8)
+    return palette[rng.integers(0, len(palette), size=n)]
+
+
+def test_matches_np_unique():
+    pixels = make_pixels()
+    expected, expected_counts = np.unique(pixels, axis=0, return_counts=True)
+    stats = ColorStats.from_pixels(pixels)
+    
+    assert stats.unique_colors == len(expected)
+    assert np.array_equal(stats.colors, expected)
+    assert np.array_equal(stats.counts, expected_counts)
+    print("✓ Color stats match np.unique")
+
+
+def test_dense_and_sparse_paths_agree():
+    image = make_pixels(64 * 48).reshape(48, 64, 3)
+    sparse = ColorStats.from_bgr_image(image)
+    
+    original = color_stats.DENSE_HISTOGRAM_MIN_PIXELS
+    color_stats.DENSE_HISTOGRAM_MIN_PIXELS = 0
+    try:
+        dense = ColorStats.from_bgr_image(image)
+    finally:
+        color_stats.DENSE_HISTOGRAM_MIN_PIXELS = original
+    
+    assert np.array_equal(sparse.keys, dense.keys)
+    assert np.array_equal(sparse.counts, dense.counts)
+    assert sparse.total_pixels == 64 * 48
+    print("✓ Dense and sparse histograms agree")
+
+
+if __name__ == "__main__":
+    test_matches_np_unique()
+    test_dense_and_sparse_paths_agree()
@@ -0,0 +1,102 @@
+import io
+import json
+import sys
+import tempfile
+from pathlib import Path
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.batch import iter_records, load_completed, run_batch
+from src.columnar_results import ColumnarResults, ColumnarWriter
+from src.element_list import ElementList, json_default
+from src.ui_analyzer import UIAnalyzer
+
+
+def normalized(record):
+    return json.loads(json.dumps(record, default=json_default, sort_keys=True))
+
+
+def make_records(count):
+    image = np.full((300, 400, 3), 255, dtype=np.uint8)
+    cv2.rectangle(image, (20, 20), (180, 120), (219, 152, 52), -1)
+    cv2.rectangle(image, (220, 150), (380, 280), (60, 76, 231), -1)
+    analysis = UIAnalyzer().full_analysis(image)
+    records = []
+    for i in range(count):
+        if i % 5 == 4:
+            records.append({'image_path': f"broken_{i}.png", 'status': 'error', 'elapsed': 0.01,
+                            'error': "ValueError: unreadable"})
+            continue
+        elements = ElementList(analysis['elements']['elements'].data[:1 + i % 2])
+        records.append({
+            'image_path': f"screen_{i}.png", 'status': 'ok', 'elapsed': 0.5, 'cached': i % 3 == 0,
+            'analysis': dict(analysis, image_path=f"screen_{i}.png", overall_score=round(i / count, 2),
+                             elements=dict(analysis['elements'], elements=elements, total_elements=len(elements))),
+            'suggestions': [{'type': 'improvement', 'category': 'spacing', 'priority': 'high', 'message': f"tip {i}"}],
+            'wireframe_suggestions': {'recommendations': [], 'layout_suggestion': 'grid-based'}
+        })
+    return records
+
+
+def test_columnar_round_trip_and_filter():
+    records = make_records(23)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp) / "results"
+        with ColumnarWriter(directory, chunk_rows=10) as writer:
+            for record in records:
+                writer.write(record)
+        assert len(list(directory.glob('chunk-*'))) == 3
+        
+        results = ColumnarResults(directory)
+        assert len(results) == 23
+        assert [normalized(r) for r in results.iter_records()] == [normalized(r) for r in records]
+        assert [normalized(r) for r in iter_records(str(directory))] == [normalized(r) for r in records]
+        
+        low = np.flatnonzero(results.column('overall_score') < 0.25)
+        assert [results.record(int(row))['image_path'] for row in low] == [f"screen_{i}.png" for i in (0, 1, 2, 3, 5)]
+        assert np.isnan(results.column('overall_score')[4]) and results.column('cached')[4] == -1
+        assert results.elements(3) == records[3]['analysis']['elements']['elements']
+        colors, coverage = results.palette(0)
+        assert len(coverage) == len(colors)
+        assert colors.tolist() == [list(color) for color in records[0]['analysis']['colors']['dominant_colors']]
+        
+        with ColumnarWriter(directory, append=True, chunk_rows=10) as writer:
+            writer.write(records[0])
+        assert len(ColumnarResults(directory)) == 24
+        
+        (Path(tmp) / "other").mkdir()
+        (Path(tmp) / "other" / "notes.txt").write_text("keep")
+        try:
+            ColumnarWriter(Path(tmp) / "other")
+            assert False, "a folder that is not a result set must not be replaced"
+        except ValueError:
+            pass
+    print("✓ Columnar round trip test passed")
+
+
+def test_batch_writes_columnar_and_resumes():
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = Path(tmp)
+        for i in range(2):
+            image = np.full((200, 300, 3), 255, dtype=np.uint8)
+            cv2.rectangle(image, (20 + i * 10, 20), (140, 120), (219, 152, 52), -1)
+            cv2.imwrite(str(folder / f"screen_{i}.png"), image)
+        (folder / "broken.png").write_bytes(b"not an image")
+        output = str(folder / "results")
+        
+        summary = run_batch([str(folder / "*.png")], output, workers=1, output_format='columnar', log=io.StringIO())
+        assert summary['succeeded'] == 2 and summary['failed'] == 1
+        assert load_completed(output) == {str(folder / f"screen_{i}.png") for i in range(2)}
+        
+        summary = run_batch([str(folder / "*.png")], output, workers=1, resume=True, output_format='columnar',
+                            log=io.StringIO())
+        assert summary['skipped'] == 2 and summary['processed'] == 1
+        assert len(ColumnarResults(output)) == 4
+    print("✓ Columnar batch output test passed")
+
+
+if __name__ == "__main__":
+    test_columnar_round_trip_and_filter()
+    test_batch_writes_columnar_and_resumes()
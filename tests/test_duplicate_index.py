@@ -0,0 +1,65 @@
+import random
+import sys
+from pathlib import Path
+import cv2
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "benchmarks"))
+
+from synthetic import make_flow
+from src.duplicate_index import DuplicateIndex
+from src.perceptual_hash import BKTree, dhash, hamming
+
+
+def test_bk_tree_matches_brute_force():
+    rng = random.Random(0)
+    centers = [rng.getrandbits(256) for _ in range(200)]
+    keys = []
+    for center in centers:
+        for _ in range(4):
+            key = center
+            for bit in rng.sample(range(256), rng.randint(0, 6)):
+                key ^= 1 << bit
+            keys.append(key)
+    tree = BKTree()
+    for i, key in enumerate(keys):
+        tree.add(key, i)
+    assert len(tree) == len(keys)
+    
+    for query in keys[::7] + [rng.getrandbits(256) for _ in range(20)]:
+        expected = sorted(hamming(query, key) for key in keys if hamming(query, key) <= 8)
+        found = tree.search(query, 8)
+        assert [distance for distance, _ in found] == expected
+        assert all(hamming(query, keys[i]) == distance for distance, i in found)
+        nearest = tree.nearest(query, 8)
+        assert (nearest is None) == (not expected)
+        assert nearest is None or nearest[0] == expected[0]
+    assert BKTree().nearest(0, 8) is None and BKTree().search(0, 8) == []
+    print("✓ BK-tree test passed")
+
+
+def test_index_finds_near_duplicate_screens():
+    first, second = make_flow((1280, 800), screens=2)
+    index = DuplicateIndex()
+    index.add(first, 'first')
+    
+    variant = first.copy()
+    cv2.circle(variant, (1200, 40), 12, (40, 40, 220), -1)
+    cv2.putText(variant, "12:41", (20, 780), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (90, 90, 90), 1)
+    ok, encoded = cv2.imencode('.jpg', variant, [cv2.IMWRITE_JPEG_QUALITY, 80])
+    variant = cv2.imdecode(encoded, cv2.IMREAD_COLOR)
+    
+    distance, value = index.find(variant)
+    assert value == 'first' and distance <= index.max_distance
+    assert index.find(second) is None
+    assert index.find(dhash(first)) == (0, 'first')
+    
+    index.add(dhash(second), 'second')
+    assert len(index) == 2 and index.find(second)[1] == 'second'
+    assert DuplicateIndex(max_distance=0).find(variant) is None
+    print("✓ Duplicate index test passed")
+
+
+if __name__ == "__main__":
+    test_bk_tree_matches_brute_force()
+    test_index_finds_near_duplicate_screens()
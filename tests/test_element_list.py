@@ -0,0 +1,46 @@
+import json
+import pickle
+import sys
+from pathlib import Path
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.element_list import ElementList, json_default
+from src.ui_analyzer import UIAnalyzer
+
+
+def test_views_and_legacy_dicts():
+    elements = ElementList.from_columns([(10, 20, 30, 41), (0, 0, 5, 5)], [1200.5, 25.0])
+    assert len(elements) == 2
+    assert elements[0]['bbox'] == (10, 20, 30, 41) and elements[0]['center'] == (25, 40)
+    assert elements[1].area == 25.0 and dict(elements[1]) == {'bbox': (0, 0, 5, 5), 'area': 25.0, 'center': (2, 2)}
+    assert elements.to_dicts() == [e.to_dict() for e in elements]
+    assert elements == elements.to_dicts()
+    assert elements.boxes.tolist() == [[10, 20, 30, 41], [0, 0, 5, 5]]
+    assert elements.centers.tolist() == [[25, 40], [2, 2]]
+    assert len(elements[elements.areas > 100]) == 1
+    assert len(ElementList()) == 0 and ElementList.from_columns([], []) == ElementList()
+    print("✓ Element list view test passed")
+
+
+def test_serialization_keeps_legacy_format():
+    image = np.full((300, 400, 3), 255, dtype=np.uint8)
+    cv2.rectangle(image, (20, 20), (180, 120), (219, 152, 52), -1)
+    cv2.rectangle(image, (220, 150), (380, 280), (60, 76, 231), -1)
+    analysis = UIAnalyzer().full_analysis(image)
+    elements = analysis['elements']['elements']
+    assert isinstance(elements, ElementList) and len(elements) == analysis['elements']['total_elements'] == 2
+    
+    legacy = json.loads(json.dumps(analysis, default=json_default))['elements']['elements']
+    assert legacy == json.loads(json.dumps(elements.to_dicts()))
+    assert set(legacy[0]) == {'bbox', 'area', 'center'}
+    assert ElementList.from_dicts(legacy) == elements
+    assert pickle.loads(pickle.dumps(elements)) == elements
+    print("✓ Element list serialization test passed")
+
+
+if __name__ == "__main__":
+    test_views_and_legacy_dicts()
+    test_serialization_keeps_legacy_format()
@@ -0,0 +1,76 @@
+import sys
+import tempfile
+from pathlib import Path
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.metrics_store import MetricsStore, parse_condition
+from src.ui_analyzer import UIAnalyzer
+
+
+def make_analysis():
+    image = np.full((300, 400, 3), 255, dtype=np.uint8)
+    cv2.rectangle(image, (20, 20), (180, 120), (219, 152, 52), -1)
+    cv2.rectangle(image, (220, 150), (380, 280), (60, 76, 231), -1)
+    return UIAnalyzer().full_analysis(image)
+
+
+def test_ingest_and_query():
+    analysis = make_analysis()
+    records = []
+    for i in range(10):
+        varied = dict(analysis, image_path=f"screen_{i}.png", overall_score=i / 10,
+                      colors=dict(analysis['colors'], contrast_score=0.3 if i % 2 else 0.9),
+                      spacing=dict(analysis['spacing'], element_density=i / 9))
+        records.append({'image_path': varied['image_path'], 'status': 'ok', 'analysis': varied})
+    records.append({'image_path': "broken.png", 'status': 'error', 'error': "unreadable"})
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "metrics.db")
+        with MetricsStore(path) as store:
+            assert store.ingest(records) == 10 and len(store) == 10
+            # a plain analysis is accepted too, and replaces the earlier one
+            assert store.ingest([dict(records[3]['analysis'], overall_score=0.95)]) == 1
+        
+        with MetricsStore(path) as store:
+            assert len(store) == 10
+            conditions = [parse_condition("contrast_score<0.5"), parse_condition("element_density > 0.8")]
+            assert conditions[1] == ('element_density', '>', 0.8)
+            rows = store.query(conditions, columns=('image_path', 'overall_score'))
+            assert rows == [{'image_path': "screen_9.png", 'overall_score': 0.9}]
+            assert store.count([('contrast_score', '<', 0.5)]) == 5
+            best = store.query(order_by='overall_score', descending=True, limit=2, columns=('image_path',))
+            assert [row['image_path'] for row in best] == ["screen_3.png", "screen_9.png"]
+            same_layout = [('layout_type', '=', analysis['layout']['layout_type'])]
+            assert store.query(same_layout, columns=('width', 'height'))[0] == {'width': 400, 'height': 300}
+            
+            assert store.elements("screen_3.png") == analysis['elements']['elements']
+            assert len(store.elements("missing.png")) == 0
+            for bad in ([('image_path; DROP TABLE images', '=', 1)], [('overall_score', 'LIKE', 1)]):
+                try:
+                    store.query(bad)
+                    assert False, "unknown columns and operators must be rejected"
+                except ValueError:
+                    pass
+    print("✓ Metrics store test passed")
+
+
+def test_analyses_without_path_are_kept_apart():
+    analysis = make_analysis()
+    assert analysis['image_path'] is None
+    with MetricsStore() as store:
+        assert store.ingest([analysis, dict(analysis, overall_score=0.1)]) == 2
+        assert store.ingest([dict(analysis, overall_score=0.2)]) == 1
+        assert len(store) == 3
+        rows = store.query(order_by='overall_score', columns=('image_path', 'overall_score'))
+        assert [row['overall_score'] for row in rows][:2] == [0.1, 0.2]
+        assert all(row['image_path'] is None for row in rows)
+        assert store.ingest([dict(analysis, image_path="named.png")]) == 1 and len(store) == 4
+    print("✓ Metrics store path-less analysis test passed")
+
+
+if __name__ == "__main__":
+    test_ingest_and_query()
+    test_analyses_without_path_are_kept_apart()
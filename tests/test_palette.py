@@ -0,0 +1,45 @@
+import sys
+from pathlib import Path
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.color_stats import ColorStats
+from src.palette import extract_palette
+
+
+def make_noisy_image(seed=0):
+    rng = np.random.default_rng(seed)
+    image = np.full((120, 160, 3), 245, dtype=np.int16)
+    image[:40] = (180, 90, 30)
+    image[80:, :60] = (40, 40, 200)
+    image += rng.integers(-6, 7, size=image.shape, dtype=np.int16)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def test_palette_is_exact_for_flat_colors():
+    pixels = np.array([[255, 0, 0]] * 6 + [[0, 0, 255]] * 3 + [[0, 128, 0]], dtype=np.uint8)
+    colors, coverage = extract_palette(ColorStats.from_pixels(pixels), k=5)
+    
+    assert colors == [(255, 0, 0), (0, 0, 255), (0, 128, 0)]
+    assert np.allclose(coverage, [0.6, 0.3, 0.1])
+    print("✓ Flat color palette test passed")
+
+
+def test_palette_is_deterministic_and_ordered():
+    stats = ColorStats.from_bgr_image(make_noisy_image())
+    colors, coverage = extract_palette(stats, k=5)
+    
+    assert 3 <= len(colors) <= 5
+    assert abs(sum(coverage) - 1.0) < 1e-9
+    assert coverage == sorted(coverage, reverse=True)
+    assert extract_palette(ColorStats.from_bgr_image(make_noisy_image()), k=5) == (colors, coverage)
+    # the light background dominates, give or take the noise
+    assert np.allclose(colors[0], (245, 245, 245), atol=4)
+    assert any(np.allclose(color, (30, 90, 180), atol=4) for color in colors[1:])
+    print("✓ Deterministic palette test passed")
+
+
+if __name__ == "__main__":
+    test_palette_is_exact_for_flat_colors()
+    test_palette_is_deterministic_and_ordered()
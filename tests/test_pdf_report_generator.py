@@ -0,0 +1,43 @@
+import io
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.pdf_report_generator import PDFReportGenerator
+
+REPORT = {
+    'analysis': {
+        'overall_score': 0.72,
+        'layout': {'layout_type': 'grid', 'grid_score': 0.8, 'alignment_score': 0.7, 'symmetry_score': 0.6},
+        'elements': {'total_elements': 12},
+        'colors': {'unique_colors': 40, 'contrast_score': 0.5, 'color_diversity': 0.3},
+        'spacing': {'spacing_consistency': 0.6}
+    },
+    'suggestions': [{'priority': 'high', 'category': 'color_scheme', 'message': "Increase contrast"}],
+    'wireframe_suggestions': {'structure': {'header': True}, 'recommendations': ["Add a footer"]}
+}
+
+
+def test_pdf_written_to_bytes_path_and_file():
+    first, second = PDFReportGenerator(), PDFReportGenerator()
+    assert first.styles is second.styles, "the stylesheet should be built once per process"
+    
+    data = first.generate_pdf(REPORT)
+    assert data.startswith(b"%PDF") and b"%%EOF" in data[-32:]
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "report.pdf"
+        assert second.generate_pdf(REPORT, str(path)) is None
+        # the generation date is the only difference between two renders
+        assert path.read_bytes()[:8] == data[:8] and abs(path.stat().st_size - len(data)) < 64
+    
+    sink = io.BytesIO()
+    assert first.generate_pdf(REPORT, sink) is None
+    assert sink.getvalue().startswith(b"%PDF")
+    print("✓ PDF output test passed")
+
+
+if __name__ == "__main__":
+    test_pdf_written_to_bytes_path_and_file()
@@ -0,0 +1,87 @@
+import gc
+import io
+import json
+import sys
+import tempfile
+import weakref
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.batch import iter_records
+from src.portfolio_report import CorpusSummary, PortfolioReportGenerator, screen_summary
+
+
+def make_record(i, score):
+    return {
+        'image_path': f"screens/screen-{i:02d}.png",
+        'status': 'ok',
+        'analysis': {
+            'overall_score': score,
+            'layout': {'layout_type': 'grid', 'grid_score': 1 - score, 'alignment_score': 0.7, 'symmetry_score': 0.6},
+            'elements': {'total_elements': i},
+            'colors': {'unique_colors': 40, 'contrast_score': 0.5},
+            'spacing': {'spacing_consistency': 0.6, 'whitespace_ratio': 0.4}
+        },
+        'suggestions': [
+            {'priority': 'low', 'category': 'spacing', 'message': "Even out margins"},
+            {'priority': 'high', 'category': 'color_scheme', 'message': "Increase <text> & icon contrast"}
+        ]
+    }
+
+
+def test_portfolio_from_results_file():
+    scores = [0.9, 0.35, 0.65, 0.1, 0.45, 0.8, 0.2, 0.55]
+    with tempfile.TemporaryDirectory() as tmp:
+        results = Path(tmp) / "results.jsonl"
+        with open(results, 'w', encoding='utf-8') as f:
+            for i, score in enumerate(scores):
+                f.write(json.dumps(make_record(i, score)) + "\n")
+            f.write(json.dumps({'image_path': "broken.png", 'status': 'error', 'error': "unreadable"}) + "\n")
+            f.write('{"image_path": "trunc')
+        output = io.BytesIO()
+        result = PortfolioReportGenerator(worst_count=3).generate_pdf(iter_records(results), output)
+    
+    assert result['screens'] == 8 and result['skipped'] == 1
+    # contents and summary, then a page per screen
+    assert result['pages'] >= 2 + 8 and result['passes'] >= 2
+    data = output.getvalue()
+    # headings become (uncompressed) PDF outline entries
+    assert data.startswith(b"%PDF") and b"(4. screens/screen-03.png)" in data and b"(Portfolio Summary)" in data
+    
+    corpus = CorpusSummary(worst_count=3)
+    for i, score in enumerate(scores):
+        corpus.add(screen_summary(make_record(i, score), i))
+    assert corpus.worst_screens('overall') == [(0.1, "screens/screen-03.png"), (0.2, "screens/screen-06.png"),
+                                               (0.35, "screens/screen-01.png")]
+    assert corpus.worst_screens('grid')[0] == (1 - 0.9, "screens/screen-00.png")
+    assert corpus.bands == {'Excellent': 2, 'Good': 1, 'Fair': 2, 'Needs Improvement': 3}
+    # most urgent suggestion first
+    assert screen_summary(make_record(0, 0.5), 0)['suggestions'][0]['priority'] == 'high'
+    print("✓ Portfolio report test passed")
+
+
+def test_sections_are_rendered_while_the_pdf_is_built():
+    generator = PortfolioReportGenerator()
+    render = generator._screen_section
+    sections = []
+    alive = []
+    
+    def tracked(number, summary):
+        gc.collect()
+        alive.append(sum(ref() is not None for ref in sections))
+        flowables = render(number, summary)
+        sections.append(weakref.ref(flowables[2]))
+        return flowables
+    
+    generator._screen_section = tracked
+    result = generator.generate_pdf((make_record(i, i / 60) for i in range(60)), io.BytesIO())
+    assert result['screens'] == 60 and len(sections) == 60 * result['passes']
+    # only the sections around the current page exist, however many screens there are
+    assert max(alive) <= 3
+    print("✓ Portfolio streaming test passed")
+
+
+if __name__ == "__main__":
+    test_portfolio_from_results_file()
+    test_sections_are_rendered_while_the_pdf_is_built()
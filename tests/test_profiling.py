@@ -0,0 +1,73 @@
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.ui_analyzer import UIAnalyzer
+from src.analysis_cache import AnalysisCache
+from src.profiling import NULL_PROFILER, Profiler
+from tests.test_analyzer import make_test_image
+
+
+def test_timings_only_when_profiling():
+    image = make_test_image()
+    plain = UIAnalyzer().full_analysis(image)
+    assert 'timings' not in plain
+    
+    records = []
+    profiled = UIAnalyzer(profile=True, profile_hooks=[records.append]).full_analysis(image)
+    stages = profiled['timings']['stages']
+    for stage in ('detect_elements', 'detect_elements/edges', 'analyze_layout/lines',
+                  'analyze_colors/palette', 'analyze_spacing'):
+        assert stage in stages, stage
+        assert stages[stage]['wall_ms'] >= 0 and stages[stage]['calls'] == 1
+    assert 'peak_mb' not in stages['analyze_colors']
+    assert {r['path'] for r in records} == set(stages)
+    
+    timings = profiled.pop('timings')
+    assert profiled == plain
+    assert timings['total_ms'] >= stages['analyze_layout']['wall_ms']
+    print("✓ Timings block test passed")
+
+
+def test_memory_trace_and_cache():
+    image = make_test_image()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnalysisCache(Path(tmp) / "cache")
+        analyzer = UIAnalyzer(cache=cache)
+        profiler = Profiler(track_memory=True)
+        try:
+            first = analyzer.full_analysis(image, profiler=profiler)
+        finally:
+            profiler.stop()
+        assert first['timings']['stages']['analyze_colors/color_stats']['peak_mb'] > 0
+        
+        trace_path = Path(tmp) / "trace.json"
+        profiler.write_chrome_trace(trace_path)
+        events = json.loads(trace_path.read_text())['traceEvents']
+        assert {e['ph'] for e in events} == {'X'}
+        assert any(e['name'] == 'lines' and e['cat'] == 'analyze_layout' for e in events)
+        assert 'analyze_layout;lines ' in profiler.collapsed_stacks()
+        
+        # timings describe one run and are never served from the cache
+        second = analyzer.full_analysis(image)
+        assert cache.hits == 1 and 'timings' not in second
+        hit = analyzer.full_analysis(image, profiler=Profiler())
+        assert set(hit['timings']['stages']) == {'cache_lookup'}
+    print("✓ Memory profiling and trace export test passed")
+
+
+def test_null_profiler_is_shared_noop():
+    assert NULL_PROFILER.span('a') is NULL_PROFILER.span('b')
+    with NULL_PROFILER.span('stage'):
+        pass
+    assert UIAnalyzer().create_profiler() is NULL_PROFILER
+    print("✓ Null profiler test passed")
+
+
+if __name__ == "__main__":
+    test_timings_only_when_profiling()
+    test_memory_trace_and_cache()
+    test_null_profiler_is_shared_noop()
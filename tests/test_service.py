@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.service import AnalysisService, DeadlineExceededError, ServiceOverloadedError, request
+
+
+def make_png(shift=0):
+    image = np.full((200, 300, 3), 255, dtype=np.uint8)
+    cv2.rectangle(image, (20 + shift, 20), (140, 120), (219, 152, 52), -1)
+    cv2.rectangle(image, (160, 40), (280, 180), (60, 76, 231), -1)
+    return cv2.imencode('.png', image)[1].tobytes()
+
+
+def test_priorities_admission_and_deadlines():
+    async def scenario():
+        executor = ThreadPoolExecutor(1)
+        # keeps the only worker busy while the queue fills up
+        executor.submit(time.sleep, 0.3)
+        service = AnalysisService(workers=1, queue_size=2, executor=executor)
+        finished = []
+        
+        async def job(name, priority='interactive', deadline=None):
+            await service.submit('analyze', make_png(len(finished)), name, priority, deadline)
+            finished.append(name)
+        
+        running = asyncio.create_task(job('first'))
+        await asyncio.sleep(0.01)
+        queued = [asyncio.create_task(job('batch', 'batch')), asyncio.create_task(job('interactive'))]
+        await asyncio.sleep(0)
+        # batch jobs leave a quarter of the queue to interactive ones, and the queue is now full
+        for priority in ('batch', 'interactive'):
+            try:
+                await service.submit('analyze', make_png(), priority=priority)
+            except ServiceOverloadedError:
+                pass
+            else:
+                raise AssertionError(f"{priority} job should not be admitted to a full queue")
+        await asyncio.gather(running, *queued)
+        
+        try:
+            await service.submit('analyze', make_png(), deadline=service.service_time / 10)
+        except ServiceOverloadedError:
+            pass
+        else:
+            raise AssertionError("a job that cannot meet its deadline should be refused")
+        stats = service.stats()
+        await service.close()
+        service.executor.shutdown()
+        return finished, stats
+    
+    finished, stats = asyncio.run(scenario())
+    assert finished == ['first', 'interactive', 'batch']
+    assert stats['completed'] == 3 and stats['rejected'] == 3
+    assert stats['queued'] == {'interactive': 0, 'batch': 0}
+    print("✓ Service queue test passed")
+
+
+def test_deadline_drops_queued_job():
+    async def scenario():
+        executor = ThreadPoolExecutor(1)
+        executor.submit(time.sleep, 0.2)
+        service = AnalysisService(workers=1, executor=executor)
+        slow = asyncio.create_task(service.submit('analyze', make_png()))
+        await asyncio.sleep(0.01)
+        try:
+            await service.submit('analyze', make_png(5), deadline=0.01)
+        except DeadlineExceededError:
+            pass
+        else:
+            raise AssertionError("the queued job should miss its deadline")
+        # the expired job no longer counts against admission, though it is still in the queue
+        assert service.stats()['queued']['interactive'] == 0
+        await slow
+        await asyncio.sleep(0.01)
+        stats = service.stats()
+        await service.close()
+        service.executor.shutdown()
+        return stats
+    
+    stats = asyncio.run(scenario())
+    # the expired job is skipped instead of being analyzed after its caller gave up
+    assert stats['expired'] == 1 and stats['completed'] == 1
+    print("✓ Service deadline test passed")
+
+
+def test_worker_crash_replaces_pool():
+    async def scenario():
+        service = AnalysisService(workers=1)
+        await service.submit('analyze', make_png())
+        large = np.full((3000, 4000, 3), 255, dtype=np.uint8)
+        for x in range(0, 4000, 80):
+            cv2.rectangle(large, (x + 10, 100), (x + 60, 2900), (219, 152, 52), -1)
+        crashing = asyncio.create_task(service.submit('analyze', cv2.imencode('.png', large)[1].tobytes()))
+        await asyncio.sleep(0.3)
+        # stands in for the OOM killer or a crash in a native decoder
+        for pid in list(service.executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        try:
+            await crashing
+        except Exception as e:
+            error = e
+        else:
+            error = None
+        later = await service.submit('analyze', make_png(5))
+        stats = service.stats()
+        await service.close()
+        return error, later, stats
+    
+    error, later, stats = asyncio.run(scenario())
+    assert type(error).__name__ == 'BrokenProcessPool'
+    assert later['analysis']['overall_score'] >= 0
+    assert stats['pool_restarts'] == 1 and stats['failed'] == 1 and stats['completed'] == 2
+    print("✓ Service worker crash test passed")
+
+
+def test_http_api_over_unix_socket():
+    async def scenario(path):
+        service = AnalysisService(workers=1)
+        server = await service.serve(unix_socket=path)
+        try:
+            analyze = await request('POST', '/analyze?name=screen.png', make_png(), unix_socket=path)
+            report = await request('POST', '/report?priority=batch', make_png(), unix_socket=path)
+            broken = await request('POST', '/analyze', b"not an image", unix_socket=path)
+            bad = await request('POST', '/analyze?priority=urgent', make_png(), unix_socket=path)
+            missing = await request('GET', '/nope', unix_socket=path)
+            reader, writer = await asyncio.open_unix_connection(path)
+            writer.write(b"POST /analyze HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+            negative = await reader.read()
+            writer.close()
+            health = await request('GET', '/health', unix_socket=path)
+        finally:
+            server.close()
+            await service.close()
+        return analyze, report, broken, bad, missing, negative, health
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        analyze, report, broken, bad, missing, negative, health = asyncio.run(
+            scenario(str(Path(tmp) / "service.sock")))
+    
+    status, headers, body = analyze
+    record = json.loads(body)
+    assert status == 200 and headers['content-type'] == 'application/json'
+    assert record['analysis']['image_path'] == 'screen.png' and record['suggestions']
+    assert report[0] == 200 and report[2].startswith(b"%PDF")
+    assert broken[0] == 422 and bad[0] == 400 and missing[0] == 404
+    assert negative.startswith(b"HTTP/1.1 400 ")
+    assert json.loads(health[2])['completed'] == 2
+    print("✓ Service HTTP test passed")
+
+
+if __name__ == "__main__":
+    test_priorities_admission_and_deadlines()
+    test_deadline_drops_queued_job()
+    test_worker_crash_replaces_pool()
+    test_http_api_over_unix_socket()
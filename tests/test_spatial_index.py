@@ -0,0 +1,86 @@
+import sys
+import time
+from pathlib import Path
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src import spatial_index
+from src.spatial_index import SpatialGrid, box_gaps, pairwise_distance_stats
+
+
+def brute_force_distances(points):
+    diff = points[:, None, :] - points[None, :, :]
+    return np.hypot(diff[..., 0], diff[..., 1])
+
+
+def test_nearest_neighbors_match_brute_force():
+    rng = np.random.default_rng(0)
+    clustered = np.concatenate([rng.integers(0, 50, (100, 2)), rng.integers(1900, 2000, (5, 2))])
+    on_a_line = np.column_stack([rng.integers(0, 2000, 200), np.zeros(200)])
+    
+    for points in (rng.integers(0, 2000, (300, 2)), clustered, on_a_line):
+        points = points.astype(float)
+        _, distance = SpatialGrid(points).nearest_neighbors()
+        expected = brute_force_distances(points)
+        np.fill_diagonal(expected, np.inf)
+        assert np.allclose(distance, expected.min(axis=1))
+    print("✓ Grid nearest neighbors match brute force")
+
+
+def test_clustered_points_stay_near_linear():
+    rng = np.random.default_rng(2)
+    points = np.concatenate([rng.normal(500, 3, (1500, 2)), rng.uniform(0, 2000, (40, 2)),
+                             np.full((100, 2), 700.0)])
+    nearest, distance = SpatialGrid(points).nearest_neighbors()
+    expected = brute_force_distances(points)
+    np.fill_diagonal(expected, np.inf)
+    assert np.allclose(distance, expected.min(axis=1))
+    assert np.allclose(distance, np.hypot(*(points - points[nearest]).T)) and (nearest != np.arange(len(points))).all()
+    
+    def seconds(n):
+        # one dense cluster, as on a screen full of small icons
+        clustered = np.concatenate([rng.normal(500, 2, (n, 2)), rng.uniform(0, 2000, (n // 100, 2))])
+        best = float('inf')
+        for _ in range(3):
+            start = time.perf_counter()
+            SpatialGrid(clustered).nearest_neighbors()
+            best = min(best, time.perf_counter() - start)
+        return best
+    
+    # 8x the points: about 8x the time when near-linear, 64x when quadratic
+    assert seconds(40000) < 20 * seconds(5000)
+    print("✓ Clustered points stay near-linear")
+
+
+def test_pairwise_stats_exact_and_sampled():
+    rng = np.random.default_rng(1)
+    points = rng.integers(0, 1000, (400, 2)).astype(float)
+    upper = brute_force_distances(points)[np.triu_indices(len(points), 1)]
+    
+    mean, std = pairwise_distance_stats(points)
+    assert np.isclose(mean, upper.mean()) and np.isclose(std, upper.std())
+    
+    original = spatial_index.MAX_EXACT_POINTS
+    spatial_index.MAX_EXACT_POINTS = 10
+    try:
+        sampled_mean, sampled_std = pairwise_distance_stats(points)
+    finally:
+        spatial_index.MAX_EXACT_POINTS = original
+    assert abs(sampled_mean - mean) / mean < 0.01
+    assert abs(sampled_std - std) / std < 0.01
+    print("✓ Pairwise distance statistics are correct")
+
+
+def test_box_gaps():
+    boxes = np.array([[0, 0, 10, 10], [0, 0, 10, 10]])
+    other = np.array([[20, 0, 5, 5], [13, 14, 5, 5]])
+    assert np.allclose(box_gaps(boxes, other), [10.0, 5.0])
+    print("✓ Box gaps test passed")
+
+
+if __name__ == "__main__":
+    test_nearest_neighbors_match_brute_force()
+    test_clustered_points_stay_near_linear()
+    test_pairwise_stats_exact_and_sampled()
+    test_box_gaps()
@@ -0,0 +1,40 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+sys.path.append(str(ROOT))
+
+from benchmarks.bench_startup import HEAVY_MODULES, time_app
+
+CLI_PROBE = """
+import runpy, sys
+sys.argv = ['main.py', '--help']
+sys.path.insert(0, {src!r})
+try:
+    runpy.run_path({main!r}, run_name='__main__')
+except SystemExit:
+    pass
+print('loaded:' + ','.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+
+def test_cli_help_skips_heavy_imports():
+    probe = CLI_PROBE.format(src=str(ROOT / 'src'), main=str(ROOT / 'src' / 'main.py'), heavy=HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', probe], check=True, capture_output=True, text=True).stdout
+    loaded = output.strip().splitlines()[-1][len('loaded:'):]
+    assert 'usage:' in output
+    assert not loaded, f"main.py --help imported {loaded}"
+    print("✓ CLI startup test passed")
+
+
+def test_app_first_render_skips_heavy_imports():
+    result = time_app()
+    assert result['errors'] == 0
+    assert not result['loaded'], f"first render imported {result['loaded']}"
+    print("✓ App startup test passed")
+
+
+if __name__ == "__main__":
+    test_cli_help_skips_heavy_imports()
+    test_app_first_render_skips_heavy_imports()
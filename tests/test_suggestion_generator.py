@@ -0,0 +1,100 @@
+import sys
+from pathlib import Path
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.suggestion_generator import SuggestionGenerator
+
+
+def make_analyses(count, seed=0):
+    rng = np.random.default_rng(seed)
+    analyses = []
+    for _ in range(count):
+        grid, alignment, contrast, diversity, consistency, whitespace, overall = rng.random(7).tolist()
+        analyses.append({
+            'layout': {'grid_score': grid, 'alignment_score': alignment},
+            'colors': {'contrast_score': contrast, 'color_diversity': diversity},
+            'spacing': {'spacing_consistency': consistency, 'whitespace_ratio': whitespace},
+            'overall_score': overall
+        })
+    return analyses
+
+
+def legacy_checks(analysis):
+    # the if-chain the rule table replaced: (category, priority, fixed message or None)
+    layout, colors, spacing = analysis['layout'], analysis['colors'], analysis['spacing']
+    checks = [
+        (layout['grid_score'] < 0.5, 'layout', 'high', None),
+        (layout['alignment_score'] < 0.5, 'layout', 'medium', "Elements could be better aligned for a cleaner look"),
+        (colors['contrast_score'] < 0.5, 'color_scheme', 'high', None),
+        (colors['color_diversity'] > 0.8, 'color_scheme', 'medium',
+         "Consider reducing the number of colors for a more cohesive design"),
+        (spacing['spacing_consistency'] < 0.6, 'spacing', 'high', None),
+        (spacing['whitespace_ratio'] < 0.2, 'spacing', 'medium',
+         "Adding more whitespace could improve readability and visual appeal"),
+        (analysis['overall_score'] < 0.5, 'general', 'medium', None)
+    ]
+    fired = [check[1:] for check in checks if check[0]]
+    return sorted(fired, key=lambda check: {'high': 3, 'medium': 2}[check[1]], reverse=True)
+
+
+def test_rules_match_legacy_checks_and_are_deterministic():
+    analyses = make_analyses(300)
+    generator = SuggestionGenerator()
+    batch = generator.generate_batch(generator.metric_table(analyses))
+    
+    for analysis, suggestions in zip(analyses, batch):
+        assert suggestions == generator.generate_suggestions(analysis)
+        assert suggestions == SuggestionGenerator().generate_suggestions(analysis)
+        expected = legacy_checks(analysis)
+        if not expected:
+            assert [s['priority'] for s in suggestions] == ['low']
+            continue
+        assert [(s['category'], s['priority']) for s in suggestions] == [check[:2] for check in expected]
+        for suggestion, (category, _, message) in zip(suggestions, expected):
+            if message is not None:
+                assert suggestion['message'] == message
+            else:
+                templates = generator.templates['best_practices' if category == 'general' else category]
+                assert suggestion['message'] in templates
+    
+    # templates vary across analyses and seeds, not between calls
+    layout = [s['message'] for suggestions in batch for s in suggestions if s['category'] == 'layout'
+              and s['priority'] == 'high']
+    assert len(set(layout)) > 1
+    reseeded = SuggestionGenerator(seed=1).generate_batch(generator.metric_table(analyses))
+    assert reseeded != batch
+    print("✓ Suggestion rule table test passed")
+
+
+def test_threshold_change_and_columns():
+    analyses = make_analyses(200, seed=1)
+    generator = SuggestionGenerator()
+    table = generator.metric_table(analyses)
+    
+    stricter = generator.with_thresholds(contrast_score=0.7)
+    fired, _ = stricter.evaluate(table)
+    contrast = [i for i, rule in enumerate(stricter.rules) if rule.metric == 'contrast_score'][0]
+    assert np.array_equal(fired[:, contrast], table['contrast_score'] < 0.7)
+    assert stricter.rules[contrast].threshold == 0.7 and generator.rules[contrast].threshold == 0.5
+    
+    # NaN in a column (a metric missing from columnar results) reads as the default, like an absent key
+    columns = {name: table[name].copy() for name in generator.metrics}
+    columns['whitespace_ratio'][:50] = np.nan
+    missing = [dict(a, spacing={'spacing_consistency': a['spacing']['spacing_consistency']}) for a in analyses[:50]]
+    batch = generator.generate_batch(columns)
+    assert batch[:50] == [generator.generate_suggestions(analysis) for analysis in missing]
+    assert batch[50:] == generator.generate_batch(table)[50:]
+    
+    try:
+        generator.with_thresholds(typography_score=0.5)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    print("✓ Suggestion threshold change test passed")
+
+
+if __name__ == "__main__":
+    test_rules_match_legacy_checks_and_are_deterministic()
+    test_threshold_change_and_columns()
@@ -0,0 +1,89 @@
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.analysis_cache import AnalysisCache
+from src.color_stats import ColorStats
+from src.tiling import TILE_OVERLAP, plan_tiles, tile_height_for_budget
+from src.ui_analyzer import UIAnalyzer
+
+
+def make_tall_page(height=2400, width=480):
+    image = np.full((height, width, 3), 250, dtype=np.uint8)
+    # a side panel running the full height of the page
+    cv2.rectangle(image, (10, 10), (110, height - 10), (80, 60, 40), 2)
+    for i, y in enumerate(range(40, height - 200, 150)):
+        # cards of varying height, some of them crossing band seams
+        cv2.rectangle(image, (150, y), (450, y + 60 + (i % 4) * 70), (40 + 20 * (i % 8), 120, 200), -1)
+    return image
+
+
+def test_plan_tiles_cover_page_once():
+    tiles = plan_tiles(1000, 300)
+    assert [(t.own_start, t.own_end) for t in tiles] == [(0, 300), (300, 600), (600, 900), (900, 1000)]
+    assert tiles[0].start == 0 and tiles[1].start == 300 - TILE_OVERLAP
+    assert tiles[-1].end == 1000
+    assert tile_height_for_budget(1000, 10) >= 256
+    print("✓ Tile plan test passed")
+
+
+def test_tiled_analysis_matches_whole_page():
+    image = make_tall_page()
+    whole = UIAnalyzer().full_analysis(image)
+    tiled = UIAnalyzer(tile_height=400).full_analysis(image)
+    
+    assert tiled['tiling']['tiles'] == 6
+    boxes = sorted(e['bbox'] for e in whole['elements']['elements'])
+    assert sorted(e['bbox'] for e in tiled['elements']['elements']) == boxes
+    assert tiled['colors'] == whole['colors']
+    assert tiled['spacing'] == whole['spacing']
+    assert tiled['layout']['symmetry_score'] == whole['layout']['symmetry_score']
+    
+    stats = ColorStats.merge([ColorStats.from_bgr_image(image[:700]), ColorStats.from_bgr_image(image[700:])])
+    expected = ColorStats.from_bgr_image(image)
+    assert np.array_equal(stats.keys, expected.keys) and np.array_equal(stats.counts, expected.counts)
+    print("✓ Tiled analysis test passed")
+
+
+def test_memory_budget_bounds_peak():
+    image = make_tall_page(height=6000)
+    analyzer = UIAnalyzer(memory_budget_mb=8)
+    tracemalloc.start()
+    try:
+        result = analyzer.full_analysis(image)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    
+    assert result['tiling']['tiles'] > 1
+    # a single pass over the whole page needs over 100 MB for the color histogram alone
+    assert peak < 8 * 2 ** 20
+    print("✓ Memory budget test passed")
+
+
+def test_edited_page_recomputes_changed_bands_only():
+    image = make_tall_page()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = AnalysisCache(Path(tmp))
+        analyzer = UIAnalyzer(cache=cache, tile_height=400)
+        analyzer.full_analysis(image)
+        stored = cache.stores
+        
+        edited = image.copy()
+        cv2.putText(edited, "new", (200, 1990), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        analyzer.full_analysis(edited)
+        # the whole-page entry plus the band owning the edit and the one overlapping it
+        assert cache.stores - stored == 3
+        print("✓ Tile cache test passed")
+
+
+if __name__ == "__main__":
+    test_plan_tiles_cover_page_once()
+    test_tiled_analysis_matches_whole_page()
+    test_memory_budget_bounds_peak()
+    test_edited_page_recomputes_changed_bands_only()
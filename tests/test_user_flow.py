@@ -0,0 +1,74 @@
+import io
+import sys
+import tempfile
+from pathlib import Path
+import numpy as np
+from PIL import Image
+
+sys.path.append(str(Path(__file__).parent.parent))
+sys.path.append(str(Path(__file__).parent.parent / "benchmarks"))
+
+from synthetic import make_flow, write_recording
+from src.frame_source import FrameSource
+from src.perceptual_hash import dhash, hamming
+from src.ui_analyzer import UIAnalyzer
+from src.user_flow import SAME_SCREEN_DISTANCE, UserFlowAnalyzer
+
+
+def make_gif(screens, durations) -> bytes:
+    frames = [Image.fromarray(np.ascontiguousarray(screen[:, :, ::-1])) for screen in screens]
+    output = io.BytesIO()
+    frames[0].save(output, format='GIF', save_all=True, append_images=frames[1:], duration=durations, loop=0)
+    return output.getvalue()
+
+
+def test_dhash_tells_screens_apart():
+    first, second = make_flow((800, 500), screens=2)
+    noisy = np.clip(first + np.random.default_rng(0).normal(0, 3, first.shape), 0, 255).astype(np.uint8)
+    assert hamming(dhash(first), dhash(noisy)) <= SAME_SCREEN_DISTANCE
+    assert hamming(dhash(first), dhash(second)) > SAME_SCREEN_DISTANCE
+    assert hamming(dhash(first), dhash(first[::2, ::2])) <= SAME_SCREEN_DISTANCE
+    print("✓ Difference hash test passed")
+
+
+def test_gif_frames_and_sampling():
+    screens = make_flow((240, 160), screens=3)
+    data = make_gif(screens, [200, 300, 1000])
+    
+    every = FrameSource(data, sample_fps=None)
+    frames = list(every)
+    assert [(f.index, f.timestamp) for f in frames] == [(0, 0.0), (1, 0.2), (2, 0.5)]
+    assert frames[1].image.shape == (160, 240, 3) and every.duration == 1.5
+    # two frames per second: the frame at 0.2s falls between samples
+    assert [f.index for f in FrameSource(data, sample_fps=2)] == [0, 2]
+    # the first frame also loads as a still image, although OpenCV cannot read GIFs
+    assert UIAnalyzer().full_analysis(data)['elements']['image_dimensions'] == (240, 160)
+    print("✓ GIF frame source test passed")
+
+
+def test_recording_analyzes_each_screen_once():
+    screens = make_flow((800, 500), screens=3)
+    analyzer = UIAnalyzer()
+    analyzed = []
+    full_analysis = analyzer.full_analysis
+    analyzer.full_analysis = lambda image, **kwargs: analyzed.append(kwargs['image_path']) or full_analysis(image)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "flow.avi")
+        write_recording(path, screens, [0, 1, 0, 2], seconds=1.5, fps=10, transition=0.3)
+        flow = UserFlowAnalyzer(analyzer).analyze(path)
+    
+    assert len(analyzed) == 3 and analyzed[0] == f"{path}#t=0.00"
+    assert [span['screen'] for span in flow['timeline']] == [0, 1, 0, 2]
+    assert flow['timeline'][0]['start'] == 0 and flow['timeline'][-1]['end'] == flow['duration'] == 6.9
+    assert flow['frames_read'] == 69 and [s['first_seen'] for s in flow['screens']][0] == 0
+    assert all(s['suggestions'] for s in flow['screens'])
+    # one return to the first screen
+    assert any(s['category'] == 'user_flow' for s in flow['flow_suggestions'])
+    print("✓ User flow test passed")
+
+
+if __name__ == "__main__":
+    test_dhash_tells_screens_apart()
+    test_gif_frames_and_sampling()
+    test_recording_analyzes_each_screen_once()
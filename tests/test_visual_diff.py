@@ -0,0 +1,102 @@
+import sys
+from pathlib import Path
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from src.color_stats import ColorStats
+from src.ui_analyzer import UIAnalyzer
+from src.visual_diff import block_regions, changed_blocks, estimate_shift
+
+
+def make_screen(width=640, height=480):
+    image = np.full((height, width, 3), 250, dtype=np.uint8)
+    cv2.rectangle(image, (0, 0), (width, 50), (80, 60, 40), -1)
+    for row in range(3):
+        for col in range(3):
+            x, y = 40 + col * 200, 90 + row * 120
+            cv2.rectangle(image, (x, y), (x + 150, y + 80), (40 + 60 * col, 120, 60 + 50 * row), -1)
+    return image
+
+
+def element_set(analysis):
+    return sorted((e['bbox'], e['area']) for e in analysis['elements']['elements'])
+
+
+def test_incremental_analysis_matches_full():
+    before = make_screen()
+    after = before.copy()
+    # recolor one card and add a badge beside another
+    cv2.rectangle(after, (240, 210), (390, 290), (20, 20, 200), -1)
+    cv2.rectangle(after, (600, 100), (630, 130), (0, 160, 0), -1)
+    
+    analyzer = UIAnalyzer()
+    diff = analyzer.compare(before, after)
+    full = analyzer.full_analysis(after)
+    
+    assert diff['incremental'] and not diff['identical'] and diff['shift'] == (0, 0)
+    assert 0 < diff['reanalyzed_ratio'] < 0.5
+    assert diff['before'] == analyzer.full_analysis(before)
+    assert element_set(diff['after']) == element_set(full)
+    assert diff['after']['colors'] == full['colors'] and diff['after']['spacing'] == full['spacing']
+    
+    elements = diff['elements']
+    assert [e['bbox'] for e in elements['added']] == [(599, 99, 32, 32)]
+    assert [e['bbox'] for e in elements['modified']] == [(239, 209, 152, 82)]
+    assert not elements['removed'] and not elements['moved'] and elements['unchanged'] == 8
+    assert diff['metrics']['elements.total_elements']['delta'] == 1
+    print("✓ Incremental diff test passed")
+
+
+def test_identical_and_moved():
+    before = make_screen()
+    analyzer = UIAnalyzer()
+    same = analyzer.compare(before, before.copy())
+    assert same['identical'] and same['changed_pixels'] == 0 and same['reanalyzed_ratio'] == 0
+    assert same['after']['overall_score'] == same['before']['overall_score']
+    assert all(entry['delta'] == 0 for entry in same['metrics'].values())
+    
+    # the bottom right card slides 40 pixels to the left
+    after = before.copy()
+    after[330:411, 400:591] = 250
+    after[330:411, 400:551] = before[330:411, 440:591]
+    elements = analyzer.compare(before, after)['elements']
+    assert [(e['from'], e['to']) for e in elements['moved']] == [((439, 329, 152, 82), (399, 329, 152, 82))]
+    assert not elements['added'] and not elements['removed']
+    print("✓ Identical and moved diff test passed")
+
+
+def test_shifted_capture_is_aligned():
+    before = make_screen()
+    after = np.full_like(before, 250)
+    after[12:, 6:] = before[:-12, :-6]
+    assert estimate_shift(before, after)[0] == (6, 12)
+    
+    diff = UIAnalyzer().compare(before, after)
+    assert diff['shift'] == (6, 12) and not diff['incremental']
+    assert diff['elements']['unchanged'] == diff['before']['elements']['total_elements']
+    assert not diff['elements']['added'] and not diff['elements']['removed']
+    print("✓ Shifted diff test passed")
+
+
+def test_blocks_and_color_subtraction():
+    before = make_screen()
+    after = before.copy()
+    after[100:104, 300:302] = 0
+    blocks, changed = changed_blocks(before, after)
+    assert changed == 8 and blocks.sum() == 1
+    assert block_regions(blocks, after.shape, margin=8) == [(280, 88, 32, 32)]
+    
+    whole = ColorStats.from_bgr_image(after)
+    part = ColorStats.from_bgr_image(after[100:104, 300:302])
+    rest = ColorStats.merge([whole], subtract=[part])
+    assert rest.total_pixels == whole.total_pixels - 8 and 0 not in rest.keys.tolist()
+    print("✓ Block diff test passed")
+
+
+if __name__ == "__main__":
+    test_incremental_analysis_matches_full()
+    test_identical_and_moved()
+    test_shifted_capture_is_aligned()
+    test_blocks_and_color_subtraction()
@@ -1,16 +1,70 @@
 import streamlit as st
+import hashlib
+import os
 import sys
 from pathlib import Path
 import json
-from PIL import Image
-import io
 
 sys.path.append(str(Path(__file__).parent.parent))
 
-from src.ui_analyzer import UIAnalyzer
-from src.suggestion_generator import SuggestionGenerator
-from src.pdf_report_generator import PDFReportGenerator
-from src.config import SCREENSHOTS_DIR, ALLOWED_EXTENSIONS, MAX_IMAGE_SIZE
+from src.config import ALLOWED_EXTENSIONS, MAX_IMAGE_SIZE
+
+
+@st.cache_resource(show_spinner=False)
+def get_engines():
+    """Analyzer and suggestion generator shared by every session of the process.
+    
+    Created on the first upload, so OpenCV and NumPy are only imported once
+    an image is uploaded and the landing page renders without them. Neither
+    keeps per-image state, so sessions can use them concurrently.
+    """
+    from src.ui_analyzer import UIAnalyzer
+    from src.suggestion_generator import SuggestionGenerator
+    from src.analysis_cache import AnalysisCache
+    
+    # let the stages of each upload use several cores
+    return UIAnalyzer(cache=AnalysisCache(), threads=min(4, os.cpu_count() or 1)), SuggestionGenerator()
+
+
+@st.cache_resource(show_spinner=False)
+def get_pdf_generator():
+    # reportlab is only imported when someone asks for a PDF
+    from src.pdf_report_generator import PDFReportGenerator
+    
+    return PDFReportGenerator()
+
+
+@st.cache_resource(show_spinner=False)
+def get_result_cache():
+    from src.memo_cache import MemoCache
+    
+    return MemoCache()
+
+
+def get_report(image_bytes: bytes, digest: str, image):
+    """Analysis, suggestions and JSON download of an upload, computed once for every session uploading it.
+    
+    Results are shared by content, so they do not carry the uploaded file name.
+    """
+    analyzer, generator = get_engines()
+    
+    from src.element_list import json_default
+    
+    def compute():
+        analysis = analyzer.full_analysis(image_bytes, decoded=image)
+        report = {
+            'analysis': analysis,
+            'suggestions': generator.generate_suggestions(analysis),
+            'wireframe_suggestions': generator.generate_wireframe_suggestions(analysis)
+        }
+        return report, json.dumps(report, indent=2, default=json_default)
+    return get_result_cache().get_or_compute(('report', digest, analyzer.fingerprint()), compute,
+                                             size_of=lambda entry: len(entry[1]))
+
+
+def get_pdf(report: dict, digest: str) -> bytes:
+    key = ('pdf', digest, get_engines()[0].fingerprint())
+    return get_result_cache().get_or_compute(key, lambda: get_pdf_generator().generate_pdf(report), size_of=len)
 
 
 st.set_page_config(
@@ -25,10 +79,12 @@ st.markdown("""
     """, unsafe_allow_html=True)
 st.markdown("Upload a screenshot or wireframe to get AI-powered design analysis and suggestions")
 
-if 'analyzer' not in st.session_state:
-    st.session_state.analyzer = UIAnalyzer()
-    st.session_state.generator = SuggestionGenerator()
-    st.session_state.pdf_generator = PDFReportGenerator()
+with st.sidebar:
+    stats = get_result_cache().stats()
+    st.subheader("Shared result cache")
+    st.caption(f"{stats['entries']} results, {stats['bytes'] / (1024*1024):.1f} MB, "
+               f"{stats['hit_rate']:.0%} hit rate")
+    st.json(stats, expanded=False)
 
 uploaded_file = st.file_uploader(
     "Choose an image file",
@@ -47,17 +103,26 @@ if uploaded_file is not None:
         if len(image_bytes) > MAX_IMAGE_SIZE:
             st.error(f"File too large. Maximum size: {MAX_IMAGE_SIZE / (1024*1024):.1f} MB")
         else:
-            image = Image.open(io.BytesIO(image_bytes))
+            analyzer = get_engines()[0]
+            digest = hashlib.sha256(image_bytes).hexdigest()
+            try:
+                # decoded once and shared by the preview and the analysis
+                image = analyzer.load_image(image_bytes)
+            except ValueError as e:
+                from src.image_io import ImageTooLargeError
+                if isinstance(e, ImageTooLargeError):
+                    st.error(f"{e}. Please upload a smaller screenshot.")
+                else:
+                    st.error("Could not read this image. Please upload a valid image file.")
+                st.stop()
             
             col1, col2 = st.columns([1, 1])
             
             with col1:
                 st.subheader("Uploaded Image")
-                st.image(image)
-                
-                temp_path = SCREENSHOTS_DIR / uploaded_file.name
-                with open(temp_path, 'wb') as f:
-                    f.write(image_bytes)
+                st.image(image, channels="BGR")
+                if analyzer.decode_scale(image_bytes, image) < 1.0:
+                    st.info("This image is very large, so it was analyzed at reduced size.")
             
             with col2:
                 st.subheader("Analysis")
@@ -65,17 +130,13 @@ if uploaded_file is not None:
                 if st.button("Analyze Design", type="primary"):
                     with st.spinner("Analyzing your design... please wait this may take a few minutes"):
                         try:
-                            analysis = st.session_state.analyzer.full_analysis(str(temp_path))
-                            suggestions = st.session_state.generator.generate_suggestions(analysis)
-                            wireframe_info = st.session_state.generator.generate_wireframe_suggestions(analysis)
+                            get_report(image_bytes, digest, image)
                             
-                            st.session_state.analysis = analysis
-                            st.session_state.suggestions = suggestions
-                            st.session_state.wireframe_info = wireframe_info
+                            # the session keeps only the upload's hash; results live in the shared cache
+                            st.session_state.report_digest = digest
                             st.session_state.analysis_complete = True
                             st.session_state.should_scroll = True
                             st.session_state.pdf_ready = False
-                            st.session_state.pdf_bytes = None
                             
                             st.success("Analysis completed successfully! Thank you for your patience. Scroll down to see results.")
                             
@@ -83,14 +144,16 @@ if uploaded_file is not None:
                             st.error(f"Error during analysis: {str(e)}")
                             st.session_state.analysis_complete = False
             
-            if 'analysis' in st.session_state:
+            if st.session_state.get('report_digest') == digest:
                 st.divider()
                 
                 st.markdown('<div id="analysis-results"></div>', unsafe_allow_html=True)
                 
-                analysis = st.session_state.analysis
-                suggestions = st.session_state.suggestions
-                wireframe_info = st.session_state.wireframe_info
+                # recomputed here only if the shared cache has dropped it since
+                report, report_json = get_report(image_bytes, digest, image)
+                analysis = report['analysis']
+                suggestions = report['suggestions']
+                wireframe_info = report['wireframe_suggestions']
                 
                 if st.session_state.get('should_scroll', False):
                     st.markdown("""
@@ -164,12 +227,16 @@ if uploaded_file is not None:
                     st.write(f"**Contrast Score:** {colors['contrast_score']:.2f}")
                     st.write(f"**Color Diversity:** {colors['color_diversity']:.2f}")
                     st.write("**Dominant Colors:**")
+                    coverage = colors.get('dominant_color_coverage', [])
                     for i, color in enumerate(colors['dominant_colors'][:5], 1):
-                        st.color_picker(f"Color {i}", f"#{color[0]:02x}{color[1]:02x}{color[2]:02x}", disabled=True)
+                        label = f"Color {i} ({coverage[i - 1]:.1f}%)" if i <= len(coverage) else f"Color {i}"
+                        st.color_picker(label, f"#{color[0]:02x}{color[1]:02x}{color[2]:02x}", disabled=True)
                 
                 with tab3:
                     spacing = analysis['spacing']
                     st.write(f"**Spacing Consistency:** {spacing['spacing_consistency']:.2f}")
+                    st.write(f"**Nearest-Neighbor Gap Consistency:** {spacing.get('nearest_gap_consistency', 0):.2f}")
+                    st.write(f"**Median Nearest-Neighbor Gap:** {spacing.get('median_nearest_gap', 0):.1f} px")
                     st.write(f"**Whitespace Ratio:** {spacing['whitespace_ratio']:.2f}")
                     st.write(f"**Element Density:** {spacing['element_density']:.2f}")
                 
@@ -212,12 +279,6 @@ if uploaded_file is not None:
                 col1, col2 = st.columns(2)
                 
                 with col1:
-                    report = {
-                        'analysis': analysis,
-                        'suggestions': suggestions,
-                        'wireframe_suggestions': wireframe_info
-                    }
-                    report_json = json.dumps(report, indent=2, default=str)
                     st.download_button(
                         label="📄 Download JSON Report",
                         data=report_json,
@@ -228,12 +289,11 @@ if uploaded_file is not None:
                 with col2:
                     if 'pdf_ready' not in st.session_state:
                         st.session_state.pdf_ready = False
-                        st.session_state.pdf_bytes = None
                     
                     if st.button("Generate PDF Report", key="generate_pdf_btn"):
                         with st.spinner("Generating PDF report... Please wait"):
                             try:
-                                st.session_state.pdf_bytes = st.session_state.pdf_generator.generate_pdf(report)
+                                get_pdf(report, digest)
                                 st.session_state.pdf_ready = True
                                 st.success("PDF report ready for download!")
                                 st.rerun()
@@ -242,10 +302,10 @@ if uploaded_file is not None:
                                 st.info("Please ensure reportlab is installed: pip install reportlab")
                                 st.session_state.pdf_ready = False
                     
-                    if st.session_state.pdf_ready and st.session_state.pdf_bytes:
+                    if st.session_state.pdf_ready:
                         st.download_button(
                             label="📑 Download PDF Report",
-                            data=st.session_state.pdf_bytes,
+                            data=get_pdf(report, digest),
                             file_name="design_analysis_report.pdf",
                             mime="application/pdf"
                         )